@@ -49,6 +49,9 @@ async def change_stream_quality(
     camera['rtsp_url'] = new_url
     camera['active_stream'] = quality_change.quality
     
+    # A manual choice turns off automatic sub-stream selection
+    camera['settings'] = {**(camera.get('settings') or {}), 'stream_selection': 'fixed'}
+    
     # Update database
     from core.database import SessionLocal, Camera
     db = SessionLocal()
@@ -56,6 +59,7 @@ async def change_stream_quality(
         db_cam = db.query(Camera).filter(Camera.id == camera_id).first()
         if db_cam:
             db_cam.active_stream = quality_change.quality
+            db_cam.settings = camera['settings']
             db.commit()
     finally:
         db.close()
@@ -356,6 +356,15 @@ async def get_component_status():
             "setupSteps": [],
             "message": "Detection zone filtering - polygon-based spatial filtering"
         },
+        "motionGate": {
+            "status": "ready",
+            "badge": "production",
+            "implementation": "full",
+            "dependencies": [],
+            "dependenciesMet": True,
+            "setupSteps": [],
+            "message": "Skip inference on static scenes - background subtraction per frame or zone"
+        },
         "parkingViolation": {
             "status": "beta",
             "badge": "beta",
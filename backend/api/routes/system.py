@@ -77,6 +77,14 @@ async def get_system_metrics(request: Request):
         }
     }
     
+    # Models shared by workflows
+    from models import get_model_pool
+    model_pool = get_model_pool()
+    metrics['models'] = {
+        'loaded': model_pool.get_stats(),
+        'memory_bytes': model_pool.total_bytes()
+    }
+    
     # Add overlay network metrics (Comment 8)
     if federation_manager and federation_manager.overlay_provider:
         overlay_status = await federation_manager.overlay_provider.status()
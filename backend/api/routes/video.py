@@ -4,11 +4,14 @@ Serves video frames as MJPEG stream
 """
 import asyncio
 import logging
-from fastapi import APIRouter, Request, HTTPException
+import uuid
+from typing import Optional
+from fastapi import APIRouter, Request, HTTPException, Query
 from fastapi.responses import StreamingResponse
 import cv2
 
 from stream.fast_processor import get_processor
+from stream.frame_pyramid import PYRAMID_LEVELS
 
 
 router = APIRouter()
@@ -18,7 +21,15 @@ logger = logging.getLogger('overwatch.api.video')
 frame_processor = get_processor()
 
 
-async def generate_mjpeg_stream(camera_id: str, stream_manager):
+def _latest_frame(stream, level: str):
+    """Get the latest frame at a pyramid level ('full' skips the pyramid)"""
+    if level == 'full':
+        return stream.get_latest_frame()
+    pyramid = stream.get_latest_pyramid()
+    return pyramid.get(level) if pyramid is not None else None
+
+
+async def generate_mjpeg_stream(camera_id: str, stream_manager, level: str = 'full'):
     """Generate MJPEG stream from camera frames using buffered frames"""
     if camera_id not in stream_manager.streams:
         raise HTTPException(status_code=404, detail="Camera stream not found")
@@ -30,10 +41,25 @@ async def generate_mjpeg_stream(camera_id: str, stream_manager):
     
     frame_interval = 1.0 / 30.0  # Target 30 FPS
     
+    # Viewers need full-rate decoding while connected; small previews are
+    # served from the low sub-stream
+    consumer_id = f"mjpeg:{uuid.uuid4().hex[:8]}"
+    quality = 'low' if level in ('preview', 'thumbnail') else 'medium'
+    stream_manager.register_consumer(camera_id, consumer_id, 30, quality)
+    
+    try:
+        async for chunk in _mjpeg_frames(camera_id, stream, frame_interval, level):
+            yield chunk
+    finally:
+        stream_manager.release_consumer(camera_id, consumer_id)
+
+
+async def _mjpeg_frames(camera_id: str, stream, frame_interval: float, level: str = 'full'):
+    """Yield MJPEG parts from the stream's latest frames"""
     while True:
         try:
             # Get latest frame from buffer instead of reading directly
-            frame = stream.get_latest_frame()
+            frame = _latest_frame(stream, level)
             
             if frame is None:
                 # No frame available yet, wait and retry
@@ -62,12 +88,20 @@ async def generate_mjpeg_stream(camera_id: str, stream_manager):
 
 
 @router.get("/{camera_id}/mjpeg")
-async def get_mjpeg_stream(camera_id: str, request: Request):
+async def get_mjpeg_stream(
+    camera_id: str,
+    request: Request,
+    size: Optional[str] = Query(None, description="Frame size: full, inference, preview or thumbnail")
+):
     """Get MJPEG stream for a camera"""
     stream_manager = request.app.state.stream_manager
     
+    level = size or 'full'
+    if level != 'full' and level not in PYRAMID_LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown frame size: {size}")
+        
     return StreamingResponse(
-        generate_mjpeg_stream(camera_id, stream_manager),
+        generate_mjpeg_stream(camera_id, stream_manager, level),
         media_type="multipart/x-mixed-replace; boundary=frame"
     )
     
@@ -469,6 +469,8 @@ async def workflow_status():
 async def get_performance_stats():
     """Get global performance statistics for all workflows"""
     from workflows.performance import get_profiler
+    from workflows.realtime_executor import _running_workflows
+    from workflows.scheduler import get_inference_scheduler
     
     profiler = get_profiler()
     stats = profiler.get_all_stats()
@@ -481,7 +483,15 @@ async def get_performance_stats():
         "bottlenecks": [
             {"operation": op, "avg_ms": round(ms, 2)}
             for op, ms in bottlenecks
-        ]
+        ],
+        # Rates chosen by the adaptive fps controller, per workflow and input node
+        "adaptive_fps": {
+            workflow_id: executor.fps_controller.get_stats()
+            for workflow_id, executor in _running_workflows.items()
+            if executor.fps_controller is not None
+        },
+        # Priority classes, grants and shed model runs per workflow
+        "scheduler": get_inference_scheduler().get_stats()
     }
 
 
@@ -496,6 +506,22 @@ async def reset_performance_stats():
     return {"message": "Performance stats reset"}
 
 
+@router.get("/{workflow_id}/trace")
+async def get_workflow_trace(workflow_id: str, limit: int = 500, event: Optional[str] = None):
+    """Dump a running workflow's hot-path trace ring (newest `limit` entries)"""
+    from workflows.trace import get_trace_ring
+    
+    ring = get_trace_ring(workflow_id)
+    if ring is None:
+        raise HTTPException(status_code=404, detail="Workflow is not running")
+        
+    return {
+        "workflow_id": workflow_id,
+        "stats": ring.get_stats(),
+        "entries": ring.dump(limit=limit, event=event)
+    }
+
+
 @router.get("/{workflow_id}/status")
 async def get_workflow_status(workflow_id: str):
     """Get detailed real-time status for a specific workflow"""
@@ -9,6 +9,9 @@ from typing import Set, Dict, List
 from collections import deque
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from stream.frame_meta import acknowledge
+from workflows.trace import trace
+
 
 logger = logging.getLogger('overwatch.websocket')
 websocket_router = APIRouter()
@@ -107,14 +110,13 @@ class ConnectionManager:
     async def broadcast(self, message: dict, topic: str = None):
         """Broadcast message to subscribed clients with optional rate limiting"""
         if not self.connections:
-            logger.warning(f"No WebSocket connections to broadcast to. Message type: {message.get('type')}")
+            # Workflows keep publishing with no UI open; count it, don't log it
+            trace(message.get('workflow_id'), 'broadcast_no_clients', message.get('node_id'), detail=message.get('type'))
             return
             
         if topic:
             message['type'] = topic
         
-        logger.info(f"📤 Broadcasting: type={message.get('type')}, node_id={message.get('node_id')}, clients={len(self.connections)}")
-        
         # Apply rate limiting for drone detection topics
         is_drone_topic = topic in ('drone_detection', 'drone_detections')
         current_time = asyncio.get_event_loop().time()
@@ -161,7 +163,7 @@ class ConnectionManager:
         for connection in dead_connections:
             self.disconnect(connection)
         
-        logger.info(f"✅ Broadcast complete: sent={sent_count}, filtered={filtered_count}")
+        trace(message.get('workflow_id'), 'broadcast', message.get('node_id'), sent_count, message.get('type'))
             
     async def cleanup_idle_connections(self, timeout: int = 300):
         """Cleanup idle connections (default 5 min timeout)"""
@@ -230,6 +232,12 @@ async def websocket_endpoint(websocket: WebSocket):
                         'drone_filters': connection.drone_filters
                     }))
                     
+                elif msg_type == 'frame_ack':
+                    # Client displayed a frame: closes capture-to-display latency
+                    frame_id = message.get('frame_id')
+                    if frame_id:
+                        acknowledge(str(frame_id))
+                        
             except json.JSONDecodeError:
                 logger.warning("Invalid JSON received")
                 
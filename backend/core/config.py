@@ -38,6 +38,10 @@ class Settings(BaseSettings):
         env="ULTRALYTICS_MODEL_PATH"
     )
     DEVICE: str = Field(default="auto", env="DEVICE")  # auto, cuda, mps, or cpu
+    MODEL_POOL_IDLE_TIMEOUT: float = Field(default=300.0, env="MODEL_POOL_IDLE_TIMEOUT")  # Seconds an unused model stays loaded
+    MODEL_POOL_MAX_BYTES: int = Field(default=0, env="MODEL_POOL_MAX_BYTES")  # Evict idle models above this (0 = no limit)
+    INFERENCE_MAX_BATCH: int = Field(default=8, env="INFERENCE_MAX_BATCH")  # Frames per batched forward pass (1 = no batching)
+    INFERENCE_MAX_WAIT_MS: float = Field(default=10.0, env="INFERENCE_MAX_WAIT_MS")  # Longest a frame waits for its batch to fill
     
     # Storage
     SNAPSHOT_DIR: str = Field(default="./data/snapshots", env="SNAPSHOT_DIR")
@@ -57,6 +61,34 @@ class Settings(BaseSettings):
     MAX_CONCURRENT_STREAMS: int = Field(default=16, env="MAX_CONCURRENT_STREAMS")
     FRAME_BUFFER_SIZE: int = Field(default=30, env="FRAME_BUFFER_SIZE")
     PROCESSING_THREADS: int = Field(default=4, env="PROCESSING_THREADS")
+    STREAM_BACKEND: str = Field(default="opencv", env="STREAM_BACKEND")  # opencv or pyav
+    IDLE_DECODE_FPS: float = Field(default=1.0, env="IDLE_DECODE_FPS")  # Decode rate when no consumer needs frames
+    KEYFRAME_ONLY_MAX_FPS: float = Field(default=1.0, env="KEYFRAME_ONLY_MAX_FPS")  # Decode I-frames only at or below this demand
+    STREAM_AUTO_QUALITY: bool = Field(default=True, env="STREAM_AUTO_QUALITY")  # Pick low/medium/high sub-stream by consumer needs
+    STREAM_DOWNGRADE_DELAY: float = Field(default=30.0, env="STREAM_DOWNGRADE_DELAY")  # Seconds lower demand must last before switching down
+    STREAM_SWITCH_TIMEOUT: float = Field(default=10.0, env="STREAM_SWITCH_TIMEOUT")  # Seconds to wait for a new sub-stream's first frame
+    CPU_HIGH_PERCENT: float = Field(default=85.0, env="CPU_HIGH_PERCENT")  # Step streams down above this CPU load
+    CPU_LOW_PERCENT: float = Field(default=60.0, env="CPU_LOW_PERCENT")  # ...and allow them back up below this
+    WORKFLOW_MODEL_CONCURRENCY: int = Field(default=1, env="WORKFLOW_MODEL_CONCURRENCY")  # Inputs one model node may run on at once
+    YOUTUBE_URL_TTL: float = Field(default=3600.0, env="YOUTUBE_URL_TTL")  # Seconds a resolved YouTube media URL is reused
+    ADAPTIVE_FPS: bool = Field(default=True, env="ADAPTIVE_FPS")  # Move workflow input fps between minFps and maxFps by measured load
+    ADAPTIVE_FPS_MAX_AGE: float = Field(default=0.5, env="ADAPTIVE_FPS_MAX_AGE")  # Seconds a frame may wait before its input slows down
+    INFERENCE_SCHEDULER_SLOTS: int = Field(default=8, env="INFERENCE_SCHEDULER_SLOTS")  # Model runs at once across all realtime workflows
+    INFERENCE_SCHEDULER_MAX_WAIT: float = Field(default=1.0, env="INFERENCE_SCHEDULER_MAX_WAIT")  # Seconds a run waits for a slot before it is shed
+    TRACE_RING_SIZE: int = Field(default=4096, env="TRACE_RING_SIZE")  # Hot-path trace entries kept per workflow
+    TRACE_LOG_INTERVAL: float = Field(default=10.0, env="TRACE_LOG_INTERVAL")  # Seconds between aggregated trace log lines (0 = off)
+    TRACE_LOG_SAMPLE: int = Field(default=0, env="TRACE_LOG_SAMPLE")  # Log every Nth trace entry per event at DEBUG (0 = off)
+    
+    # Multi-process ingest (0 = decode all cameras in the main process)
+    INGEST_WORKERS: int = Field(default=0, env="INGEST_WORKERS")
+    INGEST_SHM_SLOTS: int = Field(default=3, env="INGEST_SHM_SLOTS")
+    INGEST_MAX_FRAME_BYTES: int = Field(default=1920 * 1080 * 3, env="INGEST_MAX_FRAME_BYTES")
+    INGEST_POLL_INTERVAL: float = Field(default=0.005, env="INGEST_POLL_INTERVAL")  # Seconds between shared ring polls
+    
+    # CPU kernel process pool (0 workers = run all kernels in threads)
+    CPU_POOL_WORKERS: int = Field(default=0, env="CPU_POOL_WORKERS")
+    CPU_POOL_KERNELS: str = Field(default="fire_color,heatmap", env="CPU_POOL_KERNELS")  # Comma-separated kernels sent to the processes
+    CPU_POOL_MAX_FRAME_BYTES: int = Field(default=1920 * 1080 * 3, env="CPU_POOL_MAX_FRAME_BYTES")  # Larger frames run in threads
     
     # Security
     JWT_SECRET: str = Field(default="change-this-jwt-secret", env="JWT_SECRET")
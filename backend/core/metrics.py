@@ -32,6 +32,19 @@ frames_dropped = Counter(
     ['camera_id', 'workflow_id', 'reason']
 )
 
+motion_gate_frames = Counter(
+    'overwatch_motion_gate_frames_total',
+    'Frames checked by motion gates (hit = motion, keepalive = passed without motion, miss = inference skipped)',
+    ['camera_id', 'workflow_id', 'result']
+)
+
+frame_stage_latency = Histogram(
+    'overwatch_frame_stage_latency_seconds',
+    'Time from frame ingest until a pipeline stage finished with it',
+    ['camera_id', 'stage'],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+)
+
 # Detection Metrics
 detections_total = Counter(
     'overwatch_detections_total',
@@ -53,6 +66,45 @@ model_load_duration = Histogram(
     ['model_id']
 )
 
+model_pool_references = Gauge(
+    'overwatch_model_pool_references',
+    'Workflows holding a pooled model',
+    ['model_id']
+)
+
+model_pool_memory = Gauge(
+    'overwatch_model_pool_memory_bytes',
+    'Estimated weight memory of pooled models',
+    ['model_id']
+)
+
+inference_batch_fill = Histogram(
+    'overwatch_inference_batch_fill_ratio',
+    'Frames per batched forward pass relative to the maximum batch size',
+    ['model_id'],
+    buckets=[0.125, 0.25, 0.375, 0.5, 0.625, 0.75, 0.875, 1.0]
+)
+
+inference_queue_delay = Histogram(
+    'overwatch_inference_queue_delay_seconds',
+    'Time frames wait for their inference batch',
+    ['model_id'],
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25]
+)
+
+cpu_kernel_duration = Histogram(
+    'overwatch_cpu_kernel_duration_seconds',
+    'Time to run a CPU kernel, including handoff to a worker process (mode = process or thread)',
+    ['kernel', 'mode'],
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5]
+)
+
+workflow_inferences_shed = Counter(
+    'overwatch_workflow_inferences_shed_total',
+    'Model runs the inference scheduler dropped (quota = over the workflow budget, wait = no slot in time)',
+    ['workflow_id', 'reason']
+)
+
 # Event Metrics
 events_created = Counter(
     'overwatch_events_created_total',
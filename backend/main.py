@@ -239,6 +239,12 @@ class Overwatch:
         if self.workflow_engine:
             await self.workflow_engine.cleanup()
             
+        from models import get_model_pool
+        await get_model_pool().shutdown()
+        
+        from stream.cpu_pool import get_cpu_pool
+        get_cpu_pool().shutdown()
+        
         if self.event_manager:
             await self.event_manager.cleanup()
             
@@ -18,6 +18,7 @@ from .weapon_detection import WeaponDetectionModel
 from .panns_audio import PANNsModel
 from .fire_detection import FireDetectionModel
 from .ppe_detection import PPEDetectionModel
+from .pool import PooledModel, get_model_pool
 
 
 logger = logging.getLogger('overwatch.models')
@@ -96,3 +97,16 @@ async def get_model(model_id: str, config: dict) -> Optional[BaseModel]:
     
     return model
 
+
+async def acquire_model(model_id: str, config: dict) -> Optional[PooledModel]:
+    """
+    Get a shared model from the process-wide pool
+    
+    Call cleanup() on the returned handle to release it.
+    """
+    if model_id not in MODEL_REGISTRY:
+        logger.error(f"Unknown model: {model_id}")
+        return None
+        
+    return await get_model_pool().acquire(model_id, config, MODEL_REGISTRY[model_id])
+
@@ -37,6 +37,21 @@ class Detection:
 class BaseModel(ABC):
     """Base class for AI model plugins"""
     
+    # Frame pyramid level to run detect() on (e.g. 'inference'), or None
+    # for the full frame. Only for models that resize to a fixed input size
+    # anyway and return plain [x1, y1, x2, y2] boxes.
+    input_level = None
+    
+    # Config keys that change the loaded model, for ModelPool sharing
+    # (None: the whole config). Plugins keeping per-stream state between
+    # detect() calls set shared = False to get their own instance.
+    pool_config_keys = None
+    shared = True
+    
+    # Frames detect_batch() can run in one forward pass; above 1 the pool
+    # batches detect() calls from all workflows sharing the model
+    max_batch = 1
+    
     def __init__(self, model_id: str, config: dict):
         self.model_id = model_id
         self.config = config
@@ -60,6 +75,15 @@ class BaseModel(ABC):
         """
         pass
         
+    async def detect_batch(self, frames: List[np.ndarray]) -> List[List[dict]]:
+        """
+        Run detection on several frames
+        
+        Returns:
+            One detection list per frame, in order
+        """
+        return [await self.detect(frame) for frame in frames]
+        
     @abstractmethod
     async def cleanup(self):
         """Cleanup model resources"""
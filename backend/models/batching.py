@@ -0,0 +1,142 @@
+"""
+Batching Inference Server
+Collects single-frame detect() calls into batched forward passes
+
+One server runs per pooled model. Frames submitted by any camera or workflow
+are queued; the server takes up to max_batch of them, waiting at most
+max_wait_ms after the first one for the batch to fill, runs one
+detect_batch() call and hands each caller its own results.
+"""
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from core.metrics import inference_batch_fill, inference_queue_delay
+
+
+logger = logging.getLogger('overwatch.models.batching')
+
+
+class BatchingInferenceServer:
+    """Dynamic batching in front of one model"""
+    
+    def __init__(self, model, max_batch: int = 8, max_wait_ms: float = 10.0):
+        self.model = model
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Requests taken off the queue and not answered yet
+        self._inflight: List[Tuple[np.ndarray, asyncio.Future, float]] = []
+        
+        # Statistics
+        self.batches = 0
+        self.frames = 0
+        
+    @property
+    def model_id(self) -> str:
+        return getattr(self.model, 'model_id', 'unknown')
+        
+    async def detect(self, frame: np.ndarray) -> List[dict]:
+        """Queue a frame for the next batch and wait for its detections"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._serve())
+            
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((frame, future, time.monotonic()))
+        return await future
+        
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future, float]]:
+        """Wait for a first frame, then for more until the batch is full or max_wait passes"""
+        batch = self._inflight = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+                
+        return batch
+        
+    async def _serve(self):
+        while True:
+            batch = await self._collect()
+            
+            # Callers that gave up (e.g. their workflow stopped) are skipped
+            batch = self._inflight = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+                
+            started = time.monotonic()
+            for _, _, queued_at in batch:
+                inference_queue_delay.labels(model_id=self.model_id).observe(started - queued_at)
+            inference_batch_fill.labels(model_id=self.model_id).observe(len(batch) / self.max_batch)
+            self.batches += 1
+            self.frames += len(batch)
+            
+            try:
+                results = await self.model.detect_batch([frame for frame, _, _ in batch])
+            except Exception as e:
+                logger.error(f"Batched inference failed for {self.model_id}: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self._inflight = []
+                continue
+                
+            if len(results) != len(batch):
+                logger.error(
+                    f"Batched inference for {self.model_id} returned {len(results)} results "
+                    f"for {len(batch)} frames"
+                )
+            for index, (_, future, _) in enumerate(batch):
+                if future.done():
+                    continue
+                if index < len(results):
+                    future.set_result(results[index])
+                else:
+                    future.set_exception(RuntimeError(f"No result from {self.model_id} for this frame"))
+            self._inflight = []
+                    
+    def get_stats(self) -> dict:
+        return {
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait * 1000,
+            'batches': self.batches,
+            'avg_batch_size': round(self.frames / self.batches, 2) if self.batches else 0.0,
+            'queued': self._queue.qsize() if self._queue else 0
+        }
+        
+    async def stop(self):
+        """Stop serving; callers still waiting get a RuntimeError"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            
+        pending = self._inflight
+        self._inflight = []
+        while self._queue and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+            
+        error = RuntimeError(f"Inference server for {self.model_id} stopped")
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(error)
@@ -6,9 +6,9 @@ import asyncio
 import logging
 from typing import List, Optional
 import numpy as np
-import cv2
 
 from ultralytics import YOLO
+from stream.cpu_pool import get_cpu_pool
 from .base import BaseModel
 
 
@@ -123,76 +123,13 @@ class FireDetectionModel(BaseModel):
     
     async def _color_based_detection(self, frame: np.ndarray) -> List[dict]:
         """Color-based fire detection (red/orange/yellow regions)"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._process_color_detection,
-            frame
-        )
-    
-    def _process_color_detection(self, frame: np.ndarray) -> List[dict]:
-        """Process color-based fire detection (blocking)"""
         try:
-            # Convert to HSV for better color detection
-            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-            
-            # Define fire color ranges (red, orange, yellow)
-            lower_red1 = np.array([0, 100, 100])
-            upper_red1 = np.array([10, 255, 255])
-            lower_red2 = np.array([160, 100, 100])
-            upper_red2 = np.array([180, 255, 255])
-            lower_yellow = np.array([20, 100, 100])
-            upper_yellow = np.array([40, 255, 255])
-            
-            # Create masks
-            mask1 = cv2.inRange(hsv, lower_red1, upper_red1)
-            mask2 = cv2.inRange(hsv, lower_red2, upper_red2)
-            mask3 = cv2.inRange(hsv, lower_yellow, upper_yellow)
-            
-            # Combine masks
-            fire_mask = mask1 | mask2 | mask3
-            
-            # Apply morphological operations to reduce noise
-            kernel = np.ones((5, 5), np.uint8)
-            fire_mask = cv2.morphologyEx(fire_mask, cv2.MORPH_CLOSE, kernel)
-            fire_mask = cv2.morphologyEx(fire_mask, cv2.MORPH_OPEN, kernel)
-            
-            # Find contours
-            contours, _ = cv2.findContours(fire_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            detections = []
-            min_area = self.config.get('min_fire_area', 500)  # Minimum pixel area
-            
-            for contour in contours:
-                area = cv2.contourArea(contour)
-                
-                if area > min_area:
-                    # Get bounding box
-                    x, y, w, h = cv2.boundingRect(contour)
-                    bbox = [float(x), float(y), float(x + w), float(y + h)]
-                    
-                    # Calculate confidence based on color intensity and area
-                    roi = fire_mask[y:y+h, x:x+w]
-                    fill_ratio = np.sum(roi > 0) / (w * h) if w * h > 0 else 0
-                    
-                    confidence = min(0.9, fill_ratio * 1.2)
-                    
-                    # Only return high confidence detections
-                    if confidence > 0.6:
-                        detection = {
-                            'class_id': 999,  # Custom ID
-                            'class_name': 'fire_color_based',
-                            'confidence': confidence,
-                            'bbox': bbox,
-                            'area': float(area),
-                            'detection_type': 'fire_color',
-                            'severity': 'high' if area > 5000 else 'medium'
-                        }
-                        
-                        detections.append(detection)
-            
-            return detections
-            
+            # HSV masks and morphology; a worker process if the CPU pool has one
+            return await get_cpu_pool().run(
+                'fire_color',
+                frame,
+                min_area=self.config.get('min_fire_area', 500)  # Minimum pixel area
+            )
         except Exception as e:
             logger.error(f"Color-based fire detection error: {e}")
             return []
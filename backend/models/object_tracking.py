@@ -21,6 +21,9 @@ class ObjectTrackingModel(BaseModel):
     Provides persistent object IDs across frames for tracking movement
     """
     
+    # Track state is per stream
+    shared = False
+    
     def __init__(self, model_id: str, config: dict):
         super().__init__(model_id, config)
         self.track_history = {}  # Store track paths
@@ -0,0 +1,309 @@
+"""
+Model Pool
+Process-wide, reference-counted sharing of loaded models
+
+Workflows acquire models from the pool instead of constructing plugins, so ten
+workflows using the same weights on the same device share one loaded copy.
+Models load lazily on first acquire; once the last holder releases one it
+stays warm for MODEL_POOL_IDLE_TIMEOUT seconds before it is unloaded, and idle
+models are evicted early when the pool exceeds MODEL_POOL_MAX_BYTES.
+
+Models that can run batched forward passes get a BatchingInferenceServer, so
+detect() calls from all holders are batched together.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.config import settings
+from core.metrics import model_load_duration, model_pool_memory, model_pool_references
+from .batching import BatchingInferenceServer
+
+
+logger = logging.getLogger('overwatch.models.pool')
+
+
+PoolKey = Tuple[str, str, str]
+
+
+def _estimate_bytes(model) -> int:
+    """Size of a plugin's torch weights (parameters and buffers), 0 if unknown"""
+    net = getattr(model, 'model', None)
+    try:
+        tensors = list(net.parameters()) + list(net.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except Exception:
+        return 0
+
+
+class _PoolEntry:
+    """One loaded model and who is using it"""
+    
+    def __init__(self, key: PoolKey):
+        self.key = key
+        # Per-holder copy of a non-shared plugin; nobody can reacquire it
+        self.private = False
+        self.model = None
+        self.batcher: Optional[BatchingInferenceServer] = None
+        self.refs = 0
+        self.memory_bytes = 0
+        self.loaded_at: Optional[float] = None
+        self.idle_since: Optional[float] = None
+        self.lock = asyncio.Lock()
+        self.evict_task: Optional[asyncio.Task] = None
+        
+    @property
+    def model_id(self) -> str:
+        return self.key[0]
+
+
+class PooledModel:
+    """
+    A workflow's handle on a pooled model
+    
+    Behaves like the model plugin itself (detect(), input_level, ...), except
+    that cleanup() releases this handle instead of unloading the shared model.
+    """
+    
+    def __init__(self, pool: 'ModelPool', entry: _PoolEntry):
+        self._pool = pool
+        self._entry = entry
+        self._released = False
+        
+    def __getattr__(self, name):
+        return getattr(self._entry.model, name)
+        
+    async def detect(self, frame):
+        """Run detection, batched with other callers when the model supports it"""
+        if self._entry.batcher is not None:
+            return await self._entry.batcher.detect(frame)
+        return await self._entry.model.detect(frame)
+        
+    async def cleanup(self):
+        """Release this handle"""
+        if not self._released:
+            self._released = True
+            await self._pool.release(self._entry)
+
+
+class ModelPool:
+    """Shares loaded models across workflows"""
+    
+    def __init__(
+        self,
+        loader: Callable[[str, dict], Awaitable],
+        idle_timeout: float = 300.0,
+        max_bytes: int = 0,
+        max_batch: int = 1,
+        max_wait_ms: float = 10.0
+    ):
+        """
+        Args:
+            loader: Coroutine creating and initializing a model, get_model()
+            idle_timeout: Seconds an unused model stays loaded
+            max_bytes: Evict idle models beyond this much weight memory (0 = no limit)
+            max_batch: Frames per batched forward pass (1 disables batching)
+            max_wait_ms: Longest a frame waits for its batch to fill
+        """
+        self.loader = loader
+        self.idle_timeout = idle_timeout
+        self.max_bytes = max_bytes
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._entries: Dict[PoolKey, _PoolEntry] = {}
+        self._private_ids = itertools.count(1)
+        
+    @staticmethod
+    def make_key(model_id: str, config: Optional[dict], model_class=None) -> PoolKey:
+        """
+        Key models by id, device and the config the plugin actually reads
+        
+        Plugins list the config keys that change the loaded model in
+        pool_config_keys; without it the whole config is significant.
+        """
+        config = config or {}
+        keys = getattr(model_class, 'pool_config_keys', None)
+        if keys is not None:
+            config = {k: config[k] for k in keys if k in config}
+        return model_id, settings.DEVICE, json.dumps(config, sort_keys=True, default=str)
+        
+    async def acquire(self, model_id: str, config: Optional[dict] = None, model_class=None) -> Optional[PooledModel]:
+        """
+        Get a handle on a model, loading it if no workflow has it yet
+        
+        Args:
+            model_id: Registry id, e.g. 'ultralytics-yolov8n'
+            config: Model config
+            model_class: Plugin class, used for its pool_config_keys
+            
+        Returns:
+            Handle whose cleanup() releases it, or None if the model failed to load
+        """
+        key = self.make_key(model_id, config, model_class)
+        private = not getattr(model_class, 'shared', True)
+        if private:
+            # Stateful plugins (e.g. trackers) get a copy per holder
+            key = (key[0], key[1], f"{key[2]}#{next(self._private_ids)}")
+            
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _PoolEntry(key)
+            entry.private = private
+            self._entries[key] = entry
+            
+        # Hold a reference while loading so the entry is not evicted meanwhile
+        entry.refs += 1
+        self._mark_busy(entry)
+        try:
+            async with entry.lock:
+                if entry.model is None:
+                    await self._load(entry, config or {})
+        except Exception:
+            await self.release(entry)
+            raise
+            
+        if entry.model is None:
+            await self.release(entry)
+            return None
+            
+        model_pool_references.labels(model_id=model_id).set(self._references(model_id))
+        return PooledModel(self, entry)
+        
+    async def _load(self, entry: _PoolEntry, config: dict):
+        started = time.time()
+        model = await self.loader(entry.model_id, config)
+        if model is None:
+            return
+            
+        entry.model = model
+        entry.loaded_at = time.time()
+        entry.memory_bytes = _estimate_bytes(model)
+        
+        max_batch = min(self.max_batch, getattr(model, 'max_batch', 1))
+        if max_batch > 1:
+            entry.batcher = BatchingInferenceServer(model, max_batch, self.max_wait_ms)
+            
+        model_load_duration.labels(model_id=entry.model_id).observe(entry.loaded_at - started)
+        self._update_memory(entry.model_id)
+        logger.info(
+            f"Loaded {entry.model_id} into pool "
+            f"({entry.memory_bytes / 1024**2:.1f} MB, {self.total_bytes() / 1024**2:.1f} MB total)"
+        )
+        
+        await self._enforce_memory_limit()
+        
+    async def release(self, entry: _PoolEntry):
+        """Drop one reference; unused models are unloaded after idle_timeout (private copies at once)"""
+        entry.refs = max(0, entry.refs - 1)
+        model_pool_references.labels(model_id=entry.model_id).set(self._references(entry.model_id))
+        if entry.refs > 0:
+            return
+            
+        entry.idle_since = time.monotonic()
+        if entry.model is None or entry.private or self.idle_timeout <= 0:
+            await self._unload(entry)
+        else:
+            entry.evict_task = asyncio.create_task(self._evict_when_idle(entry))
+            
+    def _mark_busy(self, entry: _PoolEntry):
+        entry.idle_since = None
+        if entry.evict_task:
+            entry.evict_task.cancel()
+            entry.evict_task = None
+            
+    async def _evict_when_idle(self, entry: _PoolEntry):
+        await asyncio.sleep(self.idle_timeout)
+        entry.evict_task = None
+        if entry.refs == 0:
+            await self._unload(entry)
+            
+    async def _enforce_memory_limit(self):
+        """Unload idle models, longest idle first, while over max_bytes"""
+        if not self.max_bytes:
+            return
+        idle = sorted(
+            (e for e in self._entries.values() if e.refs == 0 and e.model is not None),
+            key=lambda e: e.idle_since or 0
+        )
+        for entry in idle:
+            if self.total_bytes() <= self.max_bytes:
+                break
+            self._mark_busy(entry)
+            await self._unload(entry)
+            
+    async def _unload(self, entry: _PoolEntry):
+        if self._entries.get(entry.key) is entry:
+            del self._entries[entry.key]
+        model, entry.model = entry.model, None
+        self._update_memory(entry.model_id)
+        if model is None:
+            return
+            
+        if entry.batcher:
+            await entry.batcher.stop()
+            entry.batcher = None
+            
+        try:
+            await model.cleanup()
+        except Exception as e:
+            logger.warning(f"Error unloading {entry.model_id}: {e}")
+        logger.info(f"Unloaded {entry.model_id} from pool")
+        
+    def _references(self, model_id: str) -> int:
+        return sum(e.refs for e in self._entries.values() if e.model_id == model_id)
+        
+    def _update_memory(self, model_id: str):
+        model_pool_memory.labels(model_id=model_id).set(sum(
+            e.memory_bytes for e in self._entries.values()
+            if e.model_id == model_id and e.model is not None
+        ))
+        
+    def total_bytes(self) -> int:
+        """Estimated weight memory of all loaded models"""
+        return sum(e.memory_bytes for e in self._entries.values() if e.model is not None)
+        
+    def get_stats(self) -> List[dict]:
+        """Loaded models, their holders and memory"""
+        now = time.monotonic()
+        return [
+            {
+                'model_id': entry.model_id,
+                'device': entry.key[1],
+                'references': entry.refs,
+                'memory_bytes': entry.memory_bytes,
+                'idle_seconds': round(now - entry.idle_since, 1) if entry.idle_since else None,
+                'batching': entry.batcher.get_stats() if entry.batcher else None
+            }
+            for entry in self._entries.values()
+            if entry.model is not None
+        ]
+        
+    async def shutdown(self):
+        """Unload every model regardless of references"""
+        for entry in list(self._entries.values()):
+            self._mark_busy(entry)
+            await self._unload(entry)
+
+
+# Global pool instance
+_model_pool: Optional[ModelPool] = None
+
+
+def get_model_pool() -> ModelPool:
+    """Get global model pool instance"""
+    global _model_pool
+    
+    if _model_pool is None:
+        from . import get_model
+        _model_pool = ModelPool(
+            get_model,
+            idle_timeout=settings.MODEL_POOL_IDLE_TIMEOUT,
+            max_bytes=settings.MODEL_POOL_MAX_BYTES,
+            max_batch=settings.INFERENCE_MAX_BATCH,
+            max_wait_ms=settings.INFERENCE_MAX_WAIT_MS
+        )
+        
+    return _model_pool
@@ -1,6 +1,9 @@
 """
 Audio Extractor
 Extracts audio track from video streams using PyAV
+
+When given a running RTSPStream, the extractor attaches to the stream's own
+connection (pyav backend) instead of opening a second session to the camera.
 """
 import asyncio
 import logging
@@ -26,7 +29,8 @@ class AudioExtractor:
         rtsp_url: str,
         sample_rate: int = 16000,
         channels: int = 1,
-        buffer_duration: float = 5.0
+        buffer_duration: float = 5.0,
+        stream=None
     ):
         """
         Initialize audio extractor
@@ -36,8 +40,10 @@ class AudioExtractor:
             sample_rate: Target sample rate in Hz
             channels: Number of audio channels (1=mono, 2=stereo)
             buffer_duration: Duration of audio buffer in seconds
+            stream: Optional RTSPStream to share the connection with
         """
         self.rtsp_url = rtsp_url
+        self.stream = stream
         self.sample_rate = sample_rate
         self.channels = channels
         self.buffer_duration = buffer_duration
@@ -62,6 +68,13 @@ class AudioExtractor:
             return
             
         self.running = True
+        
+        if self.stream is not None:
+            # Demux audio from the stream's existing connection
+            self.audio_buffer = await self.stream.enable_audio(self.sample_rate, self.channels)
+            logger.info(f"Audio extraction attached to stream {self.stream.camera_id}")
+            return
+            
         self.task = asyncio.create_task(self._extraction_loop())
         logger.info(f"Audio extraction started for {self.rtsp_url}")
         
@@ -72,6 +85,11 @@ class AudioExtractor:
             
         self.running = False
         
+        if self.stream is not None:
+            self.stream.release_audio()
+            logger.info("Audio extraction detached")
+            return
+            
         if self.task:
             self.task.cancel()
             try:
@@ -285,6 +303,9 @@ class AudioExtractor:
         Returns:
             Tuple of (audio_data, sample_rate, timestamp) or None
         """
+        if self.stream is not None:
+            self.has_audio = self.stream.has_audio
+            
         if not self.has_audio:
             return None
             
@@ -292,6 +313,9 @@ class AudioExtractor:
         
     def get_status(self) -> dict:
         """Get audio extraction status"""
+        if self.stream is not None:
+            self.has_audio = self.stream.has_audio
+            
         return {
             'running': self.running,
             'has_audio': self.has_audio,
@@ -300,7 +324,8 @@ class AudioExtractor:
             'error_count': self.error_count,
             'buffer_size': self.audio_buffer.size(),
             'sample_rate': self.sample_rate,
-            'channels': self.channels
+            'channels': self.channels,
+            'shared_connection': self.stream is not None
         }
 
 
@@ -0,0 +1,191 @@
+"""
+CPU Pool
+Runs CPU-heavy OpenCV/numpy kernels in worker processes
+
+Kernels (see stream.kernels) run in the default thread pool unless they are
+listed in CPU_POOL_KERNELS and CPU_POOL_WORKERS > 0. Listed kernels run in a
+shared pool of spawned processes, each under its own GIL. Their input frame
+is copied once into a SharedFrameRing and read back by sequence number in the
+worker, rather than being pickled through a pipe. Only the arguments after
+the frame and the result are pickled.
+
+Each kernel in flight holds its own ring from a free list, so a frame is
+never overwritten while a worker may still read it. If a frame does not fit
+a ring slot, or the pool breaks, the kernel runs in a thread instead.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from core.config import settings
+from core.metrics import cpu_kernel_duration
+from .kernels import KERNELS
+from .shm_ring import SharedFrameRing
+
+
+logger = logging.getLogger('overwatch.stream.cpu_pool')
+
+
+# Worker side: rings attached by this process, by name
+_attached: Dict[str, SharedFrameRing] = {}
+
+
+def _run_kernel(ring_name: str, seq: int, kernel: str, args: tuple, kwargs: dict):
+    """Worker process entry point: read the frame from shared memory and run the kernel"""
+    ring = _attached.get(ring_name)
+    if ring is None:
+        ring = _attached[ring_name] = SharedFrameRing.attach(ring_name)
+    frame = ring.read(seq)
+    if frame is None:
+        raise LookupError(f"Frame {seq} left ring {ring_name} before it was read")
+    return KERNELS[kernel](frame, *args, **kwargs)
+
+
+class CpuPool:
+    """Shared process pool for CPU-heavy kernels, with shared memory frame handoff"""
+    
+    def __init__(
+        self,
+        workers: int = 0,
+        kernels: Iterable[str] = (),
+        max_frame_bytes: int = 1920 * 1080 * 3
+    ):
+        """
+        Args:
+            workers: Worker processes (0 = every kernel runs in threads)
+            kernels: Names of kernels to run in the worker processes
+            max_frame_bytes: Largest frame handed over through shared memory
+        """
+        self.workers = max(0, workers)
+        self.kernels = {name for name in kernels if name}
+        unknown = self.kernels - set(KERNELS)
+        if unknown:
+            raise ValueError(f"Unknown CPU kernels: {', '.join(sorted(unknown))}")
+        self.max_frame_bytes = max_frame_bytes
+        
+        # Two kernels queued per worker keeps them busy
+        self.max_in_flight = self.workers * 2
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._rings: List[SharedFrameRing] = []
+        self._free_rings: Optional[asyncio.Queue] = None
+        self._broken = False
+        
+        # Per kernel: runs by mode and fallbacks to threads
+        self._stats: Dict[str, Dict[str, int]] = {}
+        
+    def _start(self):
+        """Spawn workers and allocate the frame rings (on first use)"""
+        if self._executor is not None:
+            return
+        self._free_rings = asyncio.Queue()
+        for _ in range(self.max_in_flight):
+            ring = SharedFrameRing.create(2, self.max_frame_bytes)
+            self._rings.append(ring)
+            self._free_rings.put_nowait(ring)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        logger.info(f"CPU pool started with {self.workers} workers for {', '.join(sorted(self.kernels))}")
+        
+    def uses_process(self, kernel: str, frame: np.ndarray) -> bool:
+        """Whether run() would send this kernel and frame to a worker process"""
+        return (
+            self.workers > 0
+            and not self._broken
+            and kernel in self.kernels
+            and frame.dtype == np.uint8
+            and frame.nbytes <= self.max_frame_bytes
+        )
+        
+    async def run(self, kernel: str, frame: np.ndarray, *args, **kwargs):
+        """
+        Run a kernel on a frame, in a worker process or a thread
+        
+        Args:
+            kernel: Name in stream.kernels.KERNELS
+            frame: Frame the kernel reads (not modified)
+            *args, **kwargs: Further kernel arguments (picklable)
+            
+        Returns:
+            The kernel's result
+        """
+        function = KERNELS[kernel]
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        
+        if self.uses_process(kernel, frame):
+            self._start()
+            ring = await self._free_rings.get()
+            try:
+                seq = ring.write(frame)
+                result = await loop.run_in_executor(
+                    self._executor, _run_kernel, ring.name, seq, kernel, args, kwargs
+                )
+                self._record(kernel, 'process', started)
+                return result
+            except BrokenProcessPool as e:
+                logger.error(f"CPU pool broken, running kernels in threads from now on: {e}")
+                self._broken = True
+            except LookupError as e:
+                logger.warning(f"CPU kernel {kernel} lost its frame, retrying in a thread: {e}")
+            finally:
+                self._free_rings.put_nowait(ring)
+            self._count(kernel, 'fallback')
+            
+        result = await loop.run_in_executor(None, partial(function, frame, *args, **kwargs))
+        self._record(kernel, 'thread', started)
+        return result
+        
+    def _count(self, kernel: str, key: str):
+        stats = self._stats.setdefault(kernel, {'process': 0, 'thread': 0, 'fallback': 0})
+        stats[key] += 1
+        
+    def _record(self, kernel: str, mode: str, started: float):
+        self._count(kernel, mode)
+        cpu_kernel_duration.labels(kernel=kernel, mode=mode).observe(time.perf_counter() - started)
+        
+    def shutdown(self):
+        """Stop the workers and free the frame rings"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        for ring in self._rings:
+            ring.close()
+        self._rings = []
+        self._free_rings = None
+        
+    def get_stats(self) -> dict:
+        """Pool configuration and per-kernel run counts"""
+        return {
+            'workers': self.workers,
+            'process_kernels': sorted(self.kernels),
+            'started': self._executor is not None,
+            'broken': self._broken,
+            'kernels': {kernel: dict(stats) for kernel, stats in self._stats.items()}
+        }
+
+
+# Global CPU pool instance
+_cpu_pool: Optional[CpuPool] = None
+
+
+def get_cpu_pool() -> CpuPool:
+    """Get global CPU pool instance"""
+    global _cpu_pool
+    
+    if _cpu_pool is None:
+        _cpu_pool = CpuPool(
+            workers=settings.CPU_POOL_WORKERS,
+            kernels=[name.strip() for name in settings.CPU_POOL_KERNELS.split(',')],
+            max_frame_bytes=settings.CPU_POOL_MAX_FRAME_BYTES
+        )
+        
+    return _cpu_pool
@@ -0,0 +1,634 @@
+"""
+Stream Decoder
+Long-lived per-camera reader threads that publish into a FrameBuffer
+
+Each camera gets its own thread that owns the capture, so blocking reads never
+compete with model inference for the event loop's default executor. Async
+consumers wait on the decoder and are woken when a new frame lands in the ring.
+
+When a target fps is set, frames nobody needs are only grab()bed to advance the
+stream and never decoded; only frames that are due are retrieve()d.
+
+PyAVDecodeThread is an alternative backend that demuxes video and audio from a
+single container, so audio consumers share the camera connection and both
+tracks are stamped from the same PTS clock. It can also keep compressed video
+packets in a PacketRing for pre-event recording, and decode keyframes only
+(skip_frame='NONKEY') when every consumer is happy with a slow frame rate.
+
+A decoder started in standby connects and decodes but leaves the ring alone
+until promote(), so a camera can move to another stream without a gap: the
+replacement is already delivering frames when the old decoder is stopped.
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import av
+import cv2
+import numpy as np
+
+from core.metrics import frames_dropped, frame_stage_latency
+from .audio_buffer import AudioBuffer
+from .frame_buffer import FrameBuffer
+from .packet_ring import PacketRing
+
+
+logger = logging.getLogger('overwatch.stream.decoder')
+
+
+# Live decoder threads, for process-wide thread counts
+_decoders: "weakref.WeakSet[DecodeThread]" = weakref.WeakSet()
+
+
+def get_decoder_stats() -> dict:
+    """Get process-wide decoder thread statistics"""
+    decoders = list(_decoders)
+    return {
+        'threads': len(decoders),
+        'alive': sum(1 for d in decoders if d.is_alive()),
+        'waiters': sum(d.notifier.waiter_count() for d in decoders)
+    }
+
+
+class FrameNotifier:
+    """Wakes asyncio waiters from a producer thread"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        
+    def add_waiter(self) -> asyncio.Future:
+        """Register a future that resolves on the next notify()"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            self._waiters.append((loop, future))
+        return future
+        
+    def remove_waiter(self, future: asyncio.Future):
+        """Forget a waiter that timed out or was cancelled"""
+        with self._lock:
+            self._waiters = [(l, f) for l, f in self._waiters if f is not future]
+            
+    def notify(self):
+        """Wake all current waiters (safe to call from any thread)"""
+        with self._lock:
+            if not self._waiters:
+                return
+            waiters, self._waiters = self._waiters, []
+            
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                # Loop already closed
+                pass
+                
+    def waiter_count(self) -> int:
+        with self._lock:
+            return len(self._waiters)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class DecodeThread(threading.Thread):
+    """Dedicated reader thread for one camera"""
+    
+    def __init__(
+        self,
+        camera_id: str,
+        rtsp_url: str,
+        frame_buffer: FrameBuffer,
+        reconnect_delay: float = 3.0,
+        max_reconnect_delay: float = 30.0,
+        max_consecutive_failures: int = 30
+    ):
+        super().__init__(name=f"decode-{camera_id}", daemon=True)
+        self.camera_id = camera_id
+        self.rtsp_url = rtsp_url
+        self.frame_buffer = frame_buffer
+        self.notifier = FrameNotifier()
+        
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_consecutive_failures = max_consecutive_failures
+        
+        # Decode pacing (None = decode every frame)
+        self.target_fps: Optional[float] = None
+        self._next_due = 0.0
+        self._pending_skips = 0
+        self._dropped_metric = frames_dropped.labels(
+            camera_id=camera_id, workflow_id='', reason='decode_skip'
+        )
+        self._decode_latency = frame_stage_latency.labels(camera_id=camera_id, stage='decode')
+        
+        self.capture = None
+        self._stop_event = threading.Event()
+        
+        # Standby: decode but do not publish until promote(); ready is set
+        # once the first frame has been decoded
+        self.standby = False
+        self.ready = threading.Event()
+        
+        # Stats
+        self.connected = False
+        self.fps = 0.0
+        self.frames_decoded = 0
+        self.frames_skipped = 0
+        self.error_count = 0
+        self.reconnects = 0
+        self.width = 0
+        self.height = 0
+        self.source_fps = 0.0
+        self._fps_frames = 0
+        self._fps_window_start = time.time()
+        
+        _decoders.add(self)
+        
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+        
+    def set_target_fps(self, fps: Optional[float]):
+        """Decode at most fps frames per second (None = every frame)"""
+        self.target_fps = fps if fps and fps > 0 else None
+        
+    def promote(self):
+        """Start publishing into the frame buffer (after the old writer stopped)"""
+        self._next_due = 0.0
+        self.standby = False
+        
+    def stop(self, timeout: Optional[float] = 5.0):
+        """
+        Signal the thread to exit and wait for it (blocking)
+        
+        Args:
+            timeout: Seconds to wait, None to wait until the thread is gone.
+                Callers handing the frame buffer to another decoder should
+                allow for the capture timeout; a read can block that long.
+        """
+        self._stop_event.set()
+        # Wake consumers so they notice the stream is gone
+        self.notifier.notify()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+            if self.is_alive():
+                logger.warning(f"Decoder thread for {self.camera_id} still blocked in a read")
+            
+    def run(self):
+        """Connect, read until failure, reconnect with backoff"""
+        consecutive_failures = 0
+        
+        while not self.stopped:
+            try:
+                self._connect()
+                consecutive_failures = 0
+                self._read_frames()
+                
+            except Exception as e:
+                self.error_count += 1
+                consecutive_failures += 1
+                logger.error(
+                    f"Stream {self.camera_id} error (attempt {consecutive_failures}): {e}"
+                )
+                
+            finally:
+                self._release()
+                
+            if not self.stopped:
+                # Exponential backoff for reconnection
+                delay = min(
+                    self.reconnect_delay * max(consecutive_failures, 1),
+                    self.max_reconnect_delay
+                )
+                logger.info(f"Reconnecting {self.camera_id} in {delay}s...")
+                self.reconnects += 1
+                self._stop_event.wait(delay)
+                
+        self._release()
+        logger.info(f"Decoder thread for {self.camera_id} exited")
+        
+    def _create_capture(self):
+        """Create capture with settings tuned for reliability"""
+        cap = cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
+        
+        # Configure for better stability
+        # Higher buffer for high-res streams, lower for low-res
+        buffer_size = 3 if '1920' in self.rtsp_url or 'high' in self.rtsp_url.lower() else 1
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'H264'))
+        
+        # Set RTSP transport to TCP for reliability with secure streams
+        cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 30000)  # 30 second timeout
+        cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 30000)
+        
+        return cap
+        
+    def _connect(self):
+        """Open the capture (blocking)"""
+        logger.info(f"Connecting to {self.camera_id}...")
+        self.capture = self._create_capture()
+        
+        if not self.capture.isOpened():
+            raise ConnectionError(f"Failed to open stream: {self.rtsp_url}")
+            
+        self.source_fps = self.capture.get(cv2.CAP_PROP_FPS) or 0.0
+        self.width = int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.connected = True
+        
+        logger.info(
+            f"Connected to {self.camera_id}: "
+            f"{self.width}x{self.height} @ {self.source_fps}fps"
+        )
+        
+    def _release(self):
+        self.connected = False
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+            
+    def _read_frames(self):
+        """Read frames into the ring until the stream fails"""
+        consecutive_failures = 0
+        
+        while not self.stopped and self.capture.isOpened():
+            # Advance the stream without decoding
+            ret = self.capture.grab()
+            ingest_time = time.monotonic()
+            frame = None
+            
+            if ret:
+                if not self._frame_due():
+                    # Not needed by any consumer, never decoded
+                    consecutive_failures = 0
+                    continue
+                    
+                # Decode straight into the next ring slot; a stopped
+                # thread no longer owns the ring
+                slot = self.frame_buffer.acquire_slot() if not (self.standby or self.stopped) else None
+                ret, frame = self.capture.retrieve(slot)
+                del slot
+                
+            if not ret or frame is None:
+                consecutive_failures += 1
+                
+                if consecutive_failures >= self.max_consecutive_failures:
+                    logger.warning(
+                        f"Failed to read {consecutive_failures} frames from {self.camera_id}, reconnecting..."
+                    )
+                    return
+                    
+                # Small delay before retry
+                self._stop_event.wait(0.1)
+                continue
+                
+            consecutive_failures = 0
+            position_ms = self.capture.get(cv2.CAP_PROP_POS_MSEC)
+            self._publish(
+                frame,
+                timestamp=position_ms / 1000.0 if position_ms > 0 else None,
+                ingest_time=ingest_time
+            )
+            del frame
+            
+    def _frame_due(self) -> bool:
+        """Decide whether the frame just demuxed should be decoded"""
+        target_fps = self.target_fps
+        if not target_fps:
+            return True
+            
+        now = time.monotonic()
+        if now < self._next_due:
+            self._count_skip()
+            return False
+            
+        # Schedule the next decode, without bursting to catch up
+        self._next_due += 1.0 / target_fps
+        if self._next_due <= now:
+            self._next_due = now + 1.0 / target_fps
+        return True
+        
+    def _count_skip(self):
+        """Account for a frame that was not decoded"""
+        self.frames_skipped += 1
+        self._pending_skips += 1
+        if self._pending_skips >= 30:
+            self._flush_skips()
+            
+    def _flush_skips(self):
+        if self._pending_skips:
+            self._dropped_metric.inc(self._pending_skips)
+            self._pending_skips = 0
+            
+    def _publish(
+        self,
+        frame: np.ndarray,
+        timestamp: Optional[float] = None,
+        ingest_time: Optional[float] = None
+    ) -> int:
+        """Publish a decoded frame and wake waiting consumers"""
+        if self.standby:
+            # The ring still belongs to the decoder being replaced
+            self.ready.set()
+            return 0
+        if self.stopped:
+            # Unblocked after stop(); the ring may belong to a new decoder
+            return 0
+            
+        seq = self.frame_buffer.put(frame, timestamp=timestamp, ingest_time=ingest_time)
+        if ingest_time is not None:
+            self._decode_latency.observe(time.monotonic() - ingest_time)
+        self.frames_decoded += 1
+        self.notifier.notify()
+        self._flush_skips()
+        
+        # Calculate FPS
+        self._fps_frames += 1
+        if self._fps_frames % 30 == 0:
+            elapsed = time.time() - self._fps_window_start
+            self.fps = self._fps_frames / elapsed if elapsed > 0 else 0.0
+            self._fps_frames = 0
+            self._fps_window_start = time.time()
+            
+        return seq
+        
+    async def wait_for_frame(
+        self,
+        after_seq: int = 0,
+        timeout: Optional[float] = None
+    ) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Wait until a frame newer than after_seq is published
+        
+        Returns:
+            (sequence, read-only frame view), or (after_seq, None) on timeout
+            or when the decoder stops
+        """
+        while not self.stopped:
+            future = self.notifier.add_waiter()
+            
+            # Re-check after registering so a frame published in between
+            # is not missed
+            seq, frame = self.frame_buffer.get_latest_with_seq()
+            if seq > after_seq:
+                self.notifier.remove_waiter(future)
+                return seq, frame
+                
+            try:
+                await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                self.notifier.remove_waiter(future)
+                return after_seq, None
+                
+        return after_seq, None
+        
+    def get_status(self) -> dict:
+        """Get decoder status"""
+        return {
+            'thread': self.name,
+            'backend': 'opencv',
+            'alive': self.is_alive(),
+            'connected': self.connected,
+            'fps': round(self.fps, 2),
+            'source_fps': round(self.source_fps, 2),
+            'resolution': f"{self.width}x{self.height}" if self.width else None,
+            'target_fps': self.target_fps,
+            'frames_decoded': self.frames_decoded,
+            'frames_skipped': self.frames_skipped,
+            'reconnects': self.reconnects,
+            'standby': self.standby,
+            'waiters': self.notifier.waiter_count()
+        }
+
+
+class PyAVDecodeThread(DecodeThread):
+    """Reader thread that demuxes video and audio from one PyAV container"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.container = None
+        
+        # Audio output, set by attach_audio()
+        self.audio_buffer: Optional[AudioBuffer] = None
+        self.audio_sample_rate = 16000
+        self.audio_channels = 1
+        self._resampler = None
+        
+        # Compressed video packets for clip recording
+        self.packet_ring: Optional[PacketRing] = None
+        
+        # Keyframe-only decoding, applied from the decoder thread
+        self.keyframe_only = False
+        self._applied_keyframe_only = False
+        self._await_keyframe = False
+        
+        # Pacing: skip_frame mode set on the codec, and whether the next
+        # decoded frame is due for publishing
+        self._skip_frame = 'DEFAULT'
+        self._want_frame = False
+        
+        # Shared clock: (first pts in seconds, wall time it was received)
+        self._clock_origin: Optional[Tuple[float, datetime]] = None
+        
+        # Stats
+        self.has_audio = False
+        self.audio_chunks = 0
+        
+    def attach_audio(self, audio_buffer: AudioBuffer, sample_rate: int = 16000, channels: int = 1):
+        """
+        Start decoding the audio track into audio_buffer
+        
+        Args:
+            audio_buffer: Buffer to receive resampled audio
+            sample_rate: Target sample rate in Hz
+            channels: Number of audio channels (1=mono, 2=stereo)
+        """
+        self.audio_sample_rate = sample_rate
+        self.audio_channels = channels
+        self._resampler = None
+        self.audio_buffer = audio_buffer
+        
+    def detach_audio(self):
+        """Stop decoding the audio track"""
+        self.audio_buffer = None
+        
+    def set_keyframe_only(self, enabled: bool):
+        """Decode only keyframes (I-frames) while enabled"""
+        self.keyframe_only = enabled
+        
+    def pts_to_datetime(self, pts: Optional[float]) -> datetime:
+        """Map a presentation time in seconds to wall clock time"""
+        if pts is None:
+            return datetime.now()
+        if self._clock_origin is None:
+            self._clock_origin = (pts, datetime.now())
+        origin_pts, origin_time = self._clock_origin
+        return origin_time + timedelta(seconds=pts - origin_pts)
+        
+    def _connect(self):
+        """Open the container (blocking)"""
+        logger.info(f"Connecting to {self.camera_id} (pyav)...")
+        self.container = av.open(
+            self.rtsp_url,
+            options={
+                'rtsp_transport': 'tcp',
+                'timeout': '30000000',  # 30 second timeout in microseconds
+            }
+        )
+        
+        if not self.container.streams.video:
+            raise ConnectionError(f"No video track in stream: {self.rtsp_url}")
+            
+        video_stream = self.container.streams.video[0]
+        video_stream.thread_type = 'AUTO'
+        
+        self.has_audio = bool(self.container.streams.audio)
+        self.source_fps = float(video_stream.average_rate or 0)
+        self.width = video_stream.codec_context.width
+        self.height = video_stream.codec_context.height
+        self._clock_origin = None
+        self._applied_keyframe_only = False
+        self._await_keyframe = False
+        self._skip_frame = 'DEFAULT'
+        self._want_frame = False
+        self.connected = True
+        
+        logger.info(
+            f"Connected to {self.camera_id}: "
+            f"{self.width}x{self.height} @ {self.source_fps}fps, "
+            f"audio={'yes' if self.has_audio else 'no'}"
+        )
+        
+    def _release(self):
+        self.connected = False
+        self._resampler = None
+        if self.packet_ring is not None:
+            # Buffered packets belong to this connection's timeline
+            self.packet_ring.reset()
+        if self.container is not None:
+            self.container.close()
+            self.container = None
+            
+    def _read_frames(self):
+        """Demux both tracks until the stream ends or fails"""
+        video_stream = self.container.streams.video[0]
+        streams = [video_stream]
+        if self.has_audio:
+            streams.append(self.container.streams.audio[0])
+            
+        for packet in self.container.demux(*streams):
+            if self.stopped:
+                return
+                
+            if packet.stream is video_stream:
+                ingest_time = time.monotonic()
+                packet_ring = self.packet_ring
+                if packet_ring is not None and packet.size:
+                    if packet_ring.template is None:
+                        packet_ring.set_template(video_stream)
+                    packet_ring.push(packet)
+                    
+                if not self._keyframe_gate(video_stream, packet):
+                    self._count_skip()
+                    continue
+                    
+                # Pace before decoding. Frames are decoded in reference
+                # order, so a frame that falls due is published from the
+                # next decoder output; until then libavcodec drops the
+                # frames no later frame references without decoding them
+                if self._frame_due():
+                    self._want_frame = True
+                if not self.keyframe_only:
+                    self._set_skip_frame(video_stream, 'DEFAULT' if self._want_frame else 'NONREF')
+                    
+                for frame in packet.decode():
+                    if not self._want_frame:
+                        continue
+                    self._want_frame = False
+                    self._publish_video(frame, ingest_time)
+                    
+            elif self.audio_buffer is not None:
+                for frame in packet.decode():
+                    self._publish_audio(frame)
+                    
+        logger.warning(f"Stream {self.camera_id} ended, reconnecting...")
+        
+    def _keyframe_gate(self, video_stream, packet) -> bool:
+        """Apply the decode mode; False if the packet should not be decoded"""
+        keyframe_only = self.keyframe_only
+        if keyframe_only != self._applied_keyframe_only:
+            self._set_skip_frame(video_stream, 'NONKEY' if keyframe_only else 'DEFAULT')
+            self._applied_keyframe_only = keyframe_only
+            # Back to full decoding: P/B frames need a fresh reference picture
+            self._await_keyframe = not keyframe_only
+            logger.info(
+                f"{self.camera_id}: {'keyframe-only' if keyframe_only else 'full'} decoding"
+            )
+            
+        if keyframe_only or self._await_keyframe:
+            if not packet.is_keyframe:
+                return False
+            self._await_keyframe = False
+        return True
+        
+    def _set_skip_frame(self, video_stream, mode: str):
+        if mode != self._skip_frame:
+            video_stream.codec_context.skip_frame = mode
+            self._skip_frame = mode
+            
+    def _publish_video(self, frame, ingest_time: float):
+        """
+        Convert a decoded frame to BGR and publish it from the next ring slot
+        
+        PyAV cannot convert into a caller's buffer: swscale writes into a
+        frame it allocates (to_ndarray() is a view of it), and that image is
+        copied once into the slot.
+        """
+        image = frame.to_ndarray(format='bgr24')
+        slot = self.frame_buffer.acquire_slot() if not (self.standby or self.stopped) else None
+        if slot is not None and slot.shape == image.shape:
+            np.copyto(slot, image)
+            image = slot
+        del slot
+        self._publish(image, timestamp=frame.time, ingest_time=ingest_time)
+        
+    def _publish_audio(self, frame):
+        """Resample an audio frame and add it to the audio buffer"""
+        audio_buffer = self.audio_buffer
+        if audio_buffer is None:
+            return
+            
+        if self._resampler is None:
+            self._resampler = av.AudioResampler(
+                format='fltp',
+                layout='mono' if self.audio_channels == 1 else 'stereo',
+                rate=self.audio_sample_rate
+            )
+            
+        timestamp = self.pts_to_datetime(frame.time)
+        for resampled in self._resampler.resample(frame):
+            audio_data = resampled.to_ndarray()
+            if self.audio_channels == 1:
+                audio_data = audio_data[0]
+            audio_buffer.put(audio_data, self.audio_sample_rate, timestamp)
+            self.audio_chunks += 1
+            
+    def get_status(self) -> dict:
+        """Get decoder status"""
+        status = super().get_status()
+        status['backend'] = 'pyav'
+        status['decode_mode'] = 'keyframe' if self.keyframe_only else 'full'
+        status['has_audio'] = self.has_audio
+        status['audio_attached'] = self.audio_buffer is not None
+        status['audio_chunks'] = self.audio_chunks
+        if self.packet_ring is not None:
+            status['packet_ring'] = self.packet_ring.get_stats()
+        return status
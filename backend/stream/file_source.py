@@ -0,0 +1,255 @@
+"""
+File Frame Source
+Background-thread reader for video files and YouTube streams
+
+Workflow inputs that are not camera streams (uploaded video files, YouTube
+videos) used to read and resize frames on the event loop. FileFrameSource
+opens the capture, reads, and scales frames in its own thread, keeping a
+small prefetch queue that read() takes from without blocking. YouTube page
+URLs are resolved to media URLs with yt-dlp asynchronously and cached for a
+while, since resolving takes seconds.
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from core.config import settings
+
+
+logger = logging.getLogger('overwatch.stream.file_source')
+
+
+class FileFrameSource:
+    """Reads frames from a file or URL in a background thread"""
+    
+    def __init__(
+        self,
+        source_id: str,
+        url: str,
+        scale: float = 1.0,
+        loop_playback: bool = True,
+        live: bool = False,
+        prefetch: int = 4,
+        retry_delay: float = 5.0
+    ):
+        """
+        Args:
+            source_id: Name for logs (e.g. the workflow node id)
+            url: File path or media URL OpenCV can open
+            scale: Resize factor applied in the reader thread (1.0 = as is)
+            loop_playback: Restart from the beginning at end of file
+            live: Keep only the newest frames when the consumer falls behind,
+                instead of pausing the reader (for live streams)
+            prefetch: Frames decoded ahead of the consumer
+            retry_delay: Seconds between attempts to open the source
+        """
+        self.source_id = source_id
+        self.url = url
+        self.scale = scale
+        self.loop_playback = loop_playback
+        self.live = live
+        self.retry_delay = retry_delay
+        
+        self._frames: queue.Queue = queue.Queue(maxsize=max(1, prefetch))
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        # Set when the source cannot be read any more (live stream ended,
+        # file unreadable after a restart); the owner should replace it
+        self.finished = False
+        self._error: Optional[str] = None
+        self._error_lock = threading.Lock()
+        
+        # Statistics
+        self.frames_read = 0
+        self.frames_dropped = 0
+        
+    def start(self):
+        """Start reading"""
+        self._thread = threading.Thread(
+            target=self._run, name=f"file-source-{self.source_id}", daemon=True
+        )
+        self._thread.start()
+        
+    def stop(self, timeout: float = 2.0):
+        """Stop reading and release the capture"""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+            
+    def read(self) -> Optional[np.ndarray]:
+        """Take the next prefetched frame, or None if none is ready"""
+        try:
+            return self._frames.get_nowait()
+        except queue.Empty:
+            return None
+            
+    def take_error(self) -> Optional[str]:
+        """Get (and clear) the last error, for reporting it once"""
+        with self._error_lock:
+            error, self._error = self._error, None
+        return error
+        
+    def _set_error(self, message: str):
+        logger.error(f"{self.source_id}: {message}")
+        with self._error_lock:
+            self._error = message
+            
+    def _open(self) -> Optional[cv2.VideoCapture]:
+        capture = cv2.VideoCapture(self.url)
+        if capture.isOpened():
+            logger.info(f"{self.source_id}: opened {self.url if not self.live else 'stream'}")
+            return capture
+        capture.release()
+        return None
+        
+    def _run(self):
+        capture = None
+        try:
+            while not self._stop_event.is_set():
+                if capture is None:
+                    capture = self._open()
+                    if capture is None:
+                        self._set_error(f"Failed to open video source: {self.url}")
+                        if self.live:
+                            break
+                        self._stop_event.wait(self.retry_delay)
+                        continue
+                        
+                ret, frame = capture.read()
+                if not ret and self.loop_playback and not self.live:
+                    # End of file - loop back to start
+                    logger.info(f"{self.source_id}: end of video reached, looping back to start")
+                    capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    ret, frame = capture.read()
+                if not ret:
+                    if not self.live and self.loop_playback:
+                        self._set_error(f"Failed to read from video source after reset: {self.url}")
+                    break
+                    
+                self._publish(self._scale(frame))
+        finally:
+            if capture is not None:
+                capture.release()
+            self.finished = True
+            
+    def _scale(self, frame: np.ndarray) -> np.ndarray:
+        if self.scale >= 1.0:
+            return frame
+        width = max(1, int(frame.shape[1] * self.scale))
+        height = max(1, int(frame.shape[0] * self.scale))
+        return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        
+    def _publish(self, frame: np.ndarray):
+        self.frames_read += 1
+        if self.live:
+            # Newest frames win; drop the oldest prefetched one
+            while True:
+                try:
+                    self._frames.put_nowait(frame)
+                    return
+                except queue.Full:
+                    try:
+                        self._frames.get_nowait()
+                        self.frames_dropped += 1
+                    except queue.Empty:
+                        pass
+                        
+        # Files play in order at the consumer's pace
+        while not self._stop_event.is_set():
+            try:
+                self._frames.put(frame, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+                
+    def get_status(self) -> dict:
+        return {
+            'alive': bool(self._thread and self._thread.is_alive()),
+            'finished': self.finished,
+            'frames_read': self.frames_read,
+            'frames_dropped': self.frames_dropped,
+            'prefetched': self._frames.qsize()
+        }
+
+
+# Seconds before retrying a YouTube URL yt-dlp could not resolve
+YOUTUBE_RETRY_DELAY = 30.0
+
+# YouTube page URL -> (media URL or None if resolving failed, resolved at)
+_youtube_urls: Dict[str, Tuple[Optional[str], float]] = {}
+_youtube_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _cached_youtube_url(url: str) -> Tuple[bool, Optional[str]]:
+    cached = _youtube_urls.get(url)
+    if cached is None:
+        return False, None
+    media_url, resolved_at = cached
+    ttl = settings.YOUTUBE_URL_TTL if media_url else YOUTUBE_RETRY_DELAY
+    return time.monotonic() - resolved_at < ttl, media_url
+
+
+async def resolve_youtube_url(url: str, timeout: float = 10.0) -> Optional[str]:
+    """
+    Resolve a YouTube URL to a media URL OpenCV can open
+    
+    Runs yt-dlp without blocking the event loop. Results are cached for
+    YOUTUBE_URL_TTL seconds (media URLs expire), failures for
+    YOUTUBE_RETRY_DELAY, and concurrent callers for the same URL share one
+    yt-dlp run.
+    
+    Returns:
+        Media URL, or None if yt-dlp failed
+    """
+    fresh, media_url = _cached_youtube_url(url)
+    if fresh:
+        return media_url
+        
+    lock = _youtube_locks.setdefault(url, asyncio.Lock())
+    async with lock:
+        fresh, media_url = _cached_youtube_url(url)
+        if fresh:
+            return media_url
+            
+        media_url = await _run_yt_dlp(url, timeout)
+        _youtube_urls[url] = (media_url, time.monotonic())
+        return media_url
+
+
+async def _run_yt_dlp(url: str, timeout: float) -> Optional[str]:
+    try:
+        process = await asyncio.create_subprocess_exec(
+            'yt-dlp', '-f', 'best', '-g', url,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError:
+        logger.error("yt-dlp is not installed")
+        return None
+        
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        logger.error(f"yt-dlp timed out resolving {url}")
+        return None
+        
+    if process.returncode != 0:
+        logger.error(f"yt-dlp failed: {stderr.decode(errors='replace').strip()}")
+        return None
+        
+    lines = stdout.decode().strip().splitlines()
+    return lines[0] if lines else None
+
+
+def invalidate_youtube_url(url: str):
+    """Forget a cached media URL (e.g. after it stopped working)"""
+    _youtube_urls.pop(url, None)
@@ -1,49 +1,236 @@
 """
 Frame Buffer
-Circular buffer for video frames to smooth out stream interruptions
+Preallocated ring of frame slots shared between the decoder and its consumers
+
+The producer decodes (or copies) each frame into a reusable slot and stamps it
+with a monotonically increasing sequence number. Consumers receive read-only
+views of the slot instead of copies; anything that needs to draw on a frame
+must ask for a private copy (``get_latest(writable=True)``). Downscaled
+versions of a frame come from its shared FramePyramid (``get_pyramid(seq)``),
+built lazily once per sequence number. Each slot also records the frame's
+capture PTS and monotonic ingest time (``get_meta(seq)``).
+
+A slot is only reused once no consumer holds a view of it. If a slow consumer
+still pins the slot the producer wants next, a fresh array is swapped in so the
+consumer's view is never overwritten underneath it.
 """
+import sys
 import threading
+import time
 import numpy as np
-from collections import deque
-from typing import Optional
+from typing import List, Optional, Tuple
+
+from .frame_meta import FrameMeta
+from .frame_pyramid import FramePyramid
 
 
 class FrameBuffer:
-    """Thread-safe circular frame buffer"""
+    """Thread-safe ring of preallocated frame slots with sequence numbers"""
     
-    def __init__(self, max_size: int = 10):
-        self.buffer = deque(maxlen=max_size)
+    def __init__(self, max_size: int = 10, camera_id: str = ''):
+        self.camera_id = camera_id
+        
+        # At least two slots so the producer never writes into the slot
+        # that holds the latest published frame
+        self.max_size = max(2, max_size)
         self.lock = threading.Lock()
-        self.last_frame = None
         
-    def put(self, frame: np.ndarray):
-        """Add frame to buffer"""
+        self._slots: List[Optional[np.ndarray]] = [None] * self.max_size
+        self._slot_seq: List[int] = [0] * self.max_size
+        self._slot_time: List[Optional[float]] = [None] * self.max_size
+        self._slot_ingest: List[float] = [0.0] * self.max_size
+        self._slot_pyramid: List[Optional[FramePyramid]] = [None] * self.max_size
+        
+        # Sequence number of the most recently published frame (0 = none yet)
+        self.sequence = 0
+        # Sequence number of the last frame handed out by get()
+        self._read_seq = 0
+        
+        # Stats
+        self.slot_allocations = 0
+        self.pinned_swaps = 0
+        
+    def _index(self, seq: int) -> int:
+        return seq % self.max_size
+        
+    def _writable_slot(self, index: int, shape: tuple, dtype) -> np.ndarray:
+        """Get the slot at index, (re)allocating if missing, resized or pinned"""
+        # The cached pyramid views the old frame; consumers still holding it
+        # keep the slot pinned below
+        self._slot_pyramid[index] = None
+        slot = self._slots[index]
+        
+        if slot is not None and (slot.shape != shape or slot.dtype != dtype):
+            slot = None
+        elif slot is not None and sys.getrefcount(slot) > 3:
+            # Referenced by more than the slot list, this local and
+            # getrefcount's argument: a consumer still holds a view
+            self.pinned_swaps += 1
+            slot = None
+            
+        if slot is None:
+            slot = np.empty(shape, dtype=dtype)
+            self._slots[index] = slot
+            self.slot_allocations += 1
+            
+        return slot
+        
+    def acquire_slot(self) -> Optional[np.ndarray]:
+        """
+        Get the slot the next put() will publish into
+        
+        Decoders can read directly into it (e.g. ``capture.read(slot)``) so the
+        subsequent put() publishes without copying. Returns None until the
+        frame shape is known from the first put().
+        """
         with self.lock:
-            self.buffer.append(frame.copy())
-            self.last_frame = frame.copy()
+            index = self._index(self.sequence)
+            latest = self._slots[index]
+            if not self.sequence or self._slot_seq[index] != self.sequence:
+                return None
+                
+            # The slot still holds frame sequence + 1 - max_size; the decoder
+            # writes into it outside the lock, so stop handing that frame out
+            next_index = self._index(self.sequence + 1)
+            self._slot_seq[next_index] = 0
+            self._slot_time[next_index] = None
+            self._slot_ingest[next_index] = 0.0
+            return self._writable_slot(next_index, latest.shape, latest.dtype)
             
-    def get_latest(self) -> Optional[np.ndarray]:
-        """Get most recent frame"""
+    def put(
+        self,
+        frame: np.ndarray,
+        timestamp: Optional[float] = None,
+        ingest_time: Optional[float] = None
+    ) -> int:
+        """
+        Publish frame into the next slot
+        
+        Frames decoded into the slot returned by acquire_slot() are published
+        without a copy; anything else is copied once into the slot.
+        
+        Args:
+            frame: Decoded frame
+            timestamp: Presentation time in seconds on the stream clock, if
+                the decoder knows it
+            ingest_time: time.monotonic() when the frame was read from the
+                source (defaults to now)
+                
+        Returns:
+            Sequence number assigned to the frame
+        """
         with self.lock:
-            if self.buffer:
-                return self.buffer[-1].copy()
-            return self.last_frame.copy() if self.last_frame is not None else None
+            seq = self.sequence + 1
+            index = self._index(seq)
+            
+            if frame is not self._slots[index]:
+                slot = self._writable_slot(index, frame.shape, frame.dtype)
+                np.copyto(slot, frame)
+                
+            self._slot_seq[index] = seq
+            self._slot_time[index] = timestamp
+            self._slot_ingest[index] = ingest_time if ingest_time is not None else time.monotonic()
+            self._slot_pyramid[index] = None
+            self.sequence = seq
+            return seq
+            
+    def _view(self, index: int) -> np.ndarray:
+        """Read-only view of a slot"""
+        view = self._slots[index].view()
+        view.flags.writeable = False
+        return view
+        
+    def get_latest_with_seq(self) -> Tuple[int, Optional[np.ndarray]]:
+        """Get (sequence, read-only view) of the most recent frame"""
+        with self.lock:
+            index = self._index(self.sequence)
+            if not self.sequence or self._slot_seq[index] != self.sequence:
+                return 0, None
+            return self.sequence, self._view(index)
+            
+    def get_latest(self, writable: bool = False) -> Optional[np.ndarray]:
+        """
+        Get most recent frame
+        
+        Args:
+            writable: Return a private copy the caller may modify instead of a
+                read-only view of the shared slot
+        """
+        _, frame = self.get_latest_with_seq()
+        if writable and frame is not None:
+            return frame.copy()
+        return frame
+        
+    def get_frame(self, seq: int) -> Optional[np.ndarray]:
+        """Get read-only view of a specific frame if it is still in the ring"""
+        with self.lock:
+            if seq <= 0 or seq > self.sequence or seq <= self.sequence - self.max_size:
+                return None
+            index = self._index(seq)
+            if self._slot_seq[index] != seq:
+                return None
+            return self._view(index)
+            
+    def get_pyramid(self, seq: int) -> Optional[FramePyramid]:
+        """Get the shared pyramid of a specific frame if it is still in the ring"""
+        with self.lock:
+            if seq <= 0 or seq > self.sequence or seq <= self.sequence - self.max_size:
+                return None
+            index = self._index(seq)
+            if self._slot_seq[index] != seq:
+                return None
+            pyramid = self._slot_pyramid[index]
+            if pyramid is None:
+                pyramid = FramePyramid(self._view(index), seq, self._meta(index, seq))
+                self._slot_pyramid[index] = pyramid
+            return pyramid
+            
+    def _meta(self, index: int, seq: int) -> FrameMeta:
+        return FrameMeta(self.camera_id, seq, self._slot_time[index], self._slot_ingest[index])
+        
+    def get_meta(self, seq: int) -> Optional[FrameMeta]:
+        """Get identity and timing of a frame if it is still in the ring"""
+        with self.lock:
+            index = self._index(seq)
+            if seq <= 0 or self._slot_seq[index] != seq:
+                return None
+            return self._meta(index, seq)
+            
+    def get_latest_pyramid(self) -> Optional[FramePyramid]:
+        """Get the shared pyramid of the most recent frame"""
+        return self.get_pyramid(self.sequence)
+        
+    def get_timestamp(self, seq: int) -> Optional[float]:
+        """Get the presentation time a frame was published with"""
+        with self.lock:
+            index = self._index(seq)
+            if seq <= 0 or self._slot_seq[index] != seq:
+                return None
+            return self._slot_time[index]
             
     def get(self) -> Optional[np.ndarray]:
-        """Get and remove oldest frame"""
+        """Get oldest frame not yet returned by get() (read-only view)"""
         with self.lock:
-            if self.buffer:
-                return self.buffer.popleft()
+            while self._read_seq < self.sequence:
+                # Skip frames that have already been overwritten (or whose
+                # slot was handed to the decoder by acquire_slot())
+                self._read_seq = max(self._read_seq + 1, self.sequence - self.max_size + 1)
+                index = self._index(self._read_seq)
+                if self._slot_seq[index] == self._read_seq:
+                    return self._view(index)
             return None
             
     def clear(self):
         """Clear buffer"""
         with self.lock:
-            self.buffer.clear()
+            self._slots = [None] * self.max_size
+            self._slot_seq = [0] * self.max_size
+            self._slot_time = [None] * self.max_size
+            self._slot_ingest = [0.0] * self.max_size
+            self._slot_pyramid = [None] * self.max_size
+            self._read_seq = self.sequence
             
     def size(self) -> int:
-        """Get buffer size"""
+        """Get number of frames currently held in the ring"""
         with self.lock:
-            return len(self.buffer)
-
-
+            return sum(1 for seq in self._slot_seq if seq and seq > self.sequence - self.max_size)
@@ -0,0 +1,99 @@
+"""
+Frame Metadata
+Identity and timing stamped on every decoded frame
+
+Each frame gets a per-camera sequence number, the capture PTS from the
+decoder (when it knows it) and the monotonic time it was read off the wire.
+Pipeline stages report how long after ingest they finished with a frame, so
+the latency histogram shows where time goes between capture and the browser.
+Clients close the loop by acknowledging displayed frames with a WebSocket
+``frame_ack`` message carrying the frame_id.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from core.metrics import frame_stage_latency
+
+
+# Frames sent to clients that may still be acknowledged
+MAX_PENDING_ACKS = 1000
+
+
+class FrameMeta:
+    """Identity and timing of one frame"""
+    
+    __slots__ = ('camera_id', 'seq', 'pts', 'ingest_time')
+    
+    def __init__(
+        self,
+        camera_id: str,
+        seq: int,
+        pts: Optional[float] = None,
+        ingest_time: Optional[float] = None
+    ):
+        self.camera_id = camera_id
+        self.seq = seq
+        self.pts = pts
+        self.ingest_time = ingest_time if ingest_time is not None else time.monotonic()
+        
+    @property
+    def frame_id(self) -> str:
+        return f"{self.camera_id}:{self.seq}"
+        
+    def age(self) -> float:
+        """Seconds since the frame was ingested"""
+        return time.monotonic() - self.ingest_time
+        
+    def to_dict(self) -> dict:
+        return {
+            'frame_id': self.frame_id,
+            'seq': self.seq,
+            'pts': self.pts,
+            'age_ms': round(self.age() * 1000, 1)
+        }
+
+
+def observe_stage(meta: Optional[FrameMeta], stage: str) -> Optional[float]:
+    """
+    Record that a pipeline stage finished with a frame
+    
+    Args:
+        meta: Frame metadata (None is ignored)
+        stage: Stage name, e.g. 'decode', 'dispatch', 'inference', 'send'
+        
+    Returns:
+        Seconds since ingest, or None without metadata
+    """
+    if meta is None:
+        return None
+    latency = meta.age()
+    frame_stage_latency.labels(camera_id=meta.camera_id, stage=stage).observe(latency)
+    return latency
+
+
+_pending_lock = threading.Lock()
+_pending_acks: "OrderedDict[str, FrameMeta]" = OrderedDict()
+
+
+def track_sent(meta: Optional[FrameMeta]):
+    """Remember a frame sent to clients so its frame_ack can be timed"""
+    if meta is None:
+        return
+    with _pending_lock:
+        _pending_acks[meta.frame_id] = meta
+        while len(_pending_acks) > MAX_PENDING_ACKS:
+            _pending_acks.popitem(last=False)
+
+
+def acknowledge(frame_id: str) -> Optional[float]:
+    """
+    Record a client's frame_ack as the 'display' stage
+    
+    Returns:
+        Capture-to-display latency in seconds, or None for unknown frames
+    """
+    with _pending_lock:
+        meta = _pending_acks.pop(frame_id, None)
+    return observe_stage(meta, 'display')
@@ -0,0 +1,93 @@
+"""
+Frame Pyramid
+Lazily built, memoized downscaled copies of one decoded frame
+
+Several consumers want the same frame at reduced resolution: detection models
+at their ~640px input size, MJPEG previews, and cheap analyzers (frame
+similarity, lighting) at thumbnail size. FrameBuffer hands out one pyramid per
+sequence number, so each level is resized at most once per frame no matter how
+many consumers ask for it.
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .frame_meta import FrameMeta
+
+
+# Long side in pixels of each derived level, largest first
+PYRAMID_LEVELS = {
+    'inference': 640,
+    'preview': 480,
+    'thumbnail': 160
+}
+
+
+class FramePyramid:
+    """Full frame plus downscaled levels, each computed on first use"""
+    
+    def __init__(self, frame: np.ndarray, seq: int = 0, meta: Optional[FrameMeta] = None):
+        self.full = frame
+        self.seq = seq
+        self.meta = meta
+        self._levels: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        
+    def get(self, level: str = 'full') -> np.ndarray:
+        """
+        Get the frame at a pyramid level
+        
+        Args:
+            level: 'full' or one of PYRAMID_LEVELS
+            
+        Returns:
+            Read-only image; the full frame itself if it is already no larger
+            than the level
+        """
+        if level == 'full':
+            return self.full
+            
+        image = self._levels.get(level)
+        if image is not None:
+            return image
+            
+        if level not in PYRAMID_LEVELS:
+            raise ValueError(f"Unknown pyramid level: {level}")
+            
+        with self._lock:
+            image = self._levels.get(level)
+            if image is None:
+                image = self._build(level)
+                self._levels[level] = image
+        return image
+        
+    def _build(self, level: str) -> np.ndarray:
+        target = PYRAMID_LEVELS[level]
+        height, width = self.full.shape[:2]
+        scale = target / max(height, width)
+        if scale >= 1.0:
+            return self.full
+            
+        # Resize from the smallest level already built that is still larger
+        source = self.full
+        for name, size in PYRAMID_LEVELS.items():
+            if size <= target:
+                break
+            if name in self._levels:
+                source = self._levels[name]
+                
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        image = cv2.resize(source, size, interpolation=cv2.INTER_AREA)
+        image.flags.writeable = False
+        return image
+        
+    def scale_factors(self, level: str) -> Tuple[float, float]:
+        """Get (x, y) factors that map level coordinates back to the full frame"""
+        image = self.get(level)
+        return (
+            self.full.shape[1] / image.shape[1],
+            self.full.shape[0] / image.shape[0]
+        )
+
@@ -0,0 +1,384 @@
+"""
+Ingest Pool
+Shards camera ingest and YAML workflows across worker processes
+
+Enabled with INGEST_WORKERS > 0. Each worker process decodes its cameras and
+runs their workflows under its own GIL; decoded frames are published into a
+per-camera shared memory ring and events come back over a multiprocessing
+queue to the main process EventManager. RemoteStream exposes the RTSPStream
+interface so the rest of the backend does not care where a camera is decoded.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from queue import Empty
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.config import settings
+from .frame_meta import FrameMeta
+from .frame_pyramid import FramePyramid
+from .shm_ring import SharedFrameRing
+from .ingest_worker import run_worker
+
+
+logger = logging.getLogger('overwatch.stream.ingest')
+
+
+# Seconds to wait for a worker's switch result beyond the switch timeout
+SWITCH_REPLY_GRACE = 2.0
+
+
+class RemoteStream:
+    """Main process handle for a camera decoded in an ingest worker"""
+    
+    def __init__(
+        self,
+        pool: 'IngestPool',
+        camera_id: str,
+        rtsp_url: str,
+        workflows: List[str]
+    ):
+        self.pool = pool
+        self.camera_id = camera_id
+        self.rtsp_url = rtsp_url
+        self.workflows = workflows
+        
+        self.worker_index: Optional[int] = None
+        self.ring: Optional[SharedFrameRing] = None
+        self.target_fps: Optional[float] = None
+        self.keyframe_only = False
+        self.running = False
+        self.start_time = None
+        
+        # Last status reported by the worker
+        self.remote_status: dict = {}
+        
+        # Pyramid of the last frame copied out of the ring
+        self._pyramid: Optional[FramePyramid] = None
+        
+        # URL switches waiting for the worker's result
+        self._switches: Dict[str, asyncio.Future] = {}
+        
+    async def start(self):
+        """Start decoding in a worker process"""
+        if self.running:
+            logger.warning(f"Stream {self.camera_id} already running")
+            return
+            
+        self.ring = SharedFrameRing.create(settings.INGEST_SHM_SLOTS, settings.INGEST_MAX_FRAME_BYTES)
+        self.running = True
+        self.start_time = time.time()
+        self.pool.assign(self)
+        logger.info(f"Stream {self.camera_id} started on ingest worker {self.worker_index}")
+        
+    async def stop(self):
+        """Stop the stream and free its ring"""
+        if not self.running:
+            return
+            
+        self.running = False
+        self._pyramid = None
+        self.pool.release(self)
+        
+        # The worker keeps its own mapping until it detaches
+        self.ring.close()
+        logger.info(f"Stream {self.camera_id} stopped")
+        
+    def start_command(self) -> tuple:
+        """Command that (re)starts this camera in a worker"""
+        return ('start', {
+            'camera_id': self.camera_id,
+            'rtsp_url': self.rtsp_url,
+            'workflows': self.workflows,
+            'ring_name': self.ring.name,
+            'target_fps': self.target_fps,
+            'keyframe_only': self.keyframe_only
+        })
+        
+    def set_target_fps(self, fps: Optional[float]):
+        """Limit decoding to the rate consumers need"""
+        self.target_fps = fps
+        if self.running:
+            self.pool.send(self.worker_index, ('fps', self.camera_id, fps))
+            
+    def set_keyframe_only(self, enabled: bool):
+        """Decode only keyframes in the worker"""
+        self.keyframe_only = enabled
+        if self.running:
+            self.pool.send(self.worker_index, ('keyframe', self.camera_id, enabled))
+            
+    async def switch_url(self, rtsp_url: str, timeout: float = 10.0) -> bool:
+        """
+        Move the camera to another stream URL (hitless, done in the worker)
+        
+        The worker keeps the current stream if the new one does not come up
+        and reports whether the switch happened.
+        
+        Returns:
+            True if the worker now uses rtsp_url
+        """
+        if not self.running:
+            self.rtsp_url = rtsp_url
+            return True
+            
+        future = self._switches.get(rtsp_url)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._switches[rtsp_url] = future
+            self.pool.send(self.worker_index, ('url', self.camera_id, rtsp_url, timeout))
+            
+        try:
+            switched = await asyncio.wait_for(asyncio.shield(future), timeout + SWITCH_REPLY_GRACE)
+        except asyncio.TimeoutError:
+            logger.warning(f"No switch result for {self.camera_id} from ingest worker {self.worker_index}")
+            switched = False
+        finally:
+            if self._switches.get(rtsp_url) is future:
+                del self._switches[rtsp_url]
+                
+        if switched:
+            self.rtsp_url = rtsp_url
+        return switched
+        
+    def switch_done(self, rtsp_url: str, switched: bool):
+        """Record a worker's switch result (event loop)"""
+        future = self._switches.get(rtsp_url)
+        if future is not None and not future.done():
+            future.set_result(switched)
+        
+    @property
+    def recording(self) -> bool:
+        return bool(self.remote_status.get('recording'))
+        
+    async def wait_for_frame(
+        self,
+        after_seq: int = 0,
+        timeout: Optional[float] = None
+    ) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Wait for a frame newer than after_seq
+        
+        Only the ring header is polled; the new frame is copied out once,
+        into the pyramid get_latest_pyramid() hands to consumers.
+        
+        Returns:
+            (sequence, read-only frame), or (after_seq, None) on timeout
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        
+        while self.running:
+            if self.ring.latest_seq > after_seq:
+                pyramid = self.get_latest_pyramid()
+                if pyramid is not None and pyramid.seq > after_seq:
+                    return pyramid.seq, pyramid.full
+                    
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(settings.INGEST_POLL_INTERVAL)
+            
+        return after_seq, None
+        
+    def get_latest_frame(self, writable: bool = False) -> Optional[np.ndarray]:
+        """
+        Get the most recent frame
+        
+        Frames are copied out of shared memory, so they are always private
+        (writable is accepted for RTSPStream compatibility).
+        """
+        if not self.running:
+            return None
+        _, frame = self.ring.read_latest()
+        return frame
+        
+    def get_latest_pyramid(self) -> Optional[FramePyramid]:
+        """Get the resolution pyramid of the most recent frame"""
+        if not self.running:
+            return None
+            
+        # Consumers of the same frame share one copy and its levels
+        pyramid = self._pyramid
+        if pyramid is not None and pyramid.seq == self.ring.latest_seq:
+            return pyramid
+            
+        seq, frame = self.ring.read_latest()
+        if frame is None:
+            return None
+        frame.flags.writeable = False
+        
+        times = self.ring.read_times(seq)
+        meta = FrameMeta(self.camera_id, seq, *times) if times else FrameMeta(self.camera_id, seq)
+        self._pyramid = FramePyramid(frame, seq, meta)
+        return self._pyramid
+        
+    def get_status(self) -> dict:
+        """Get stream status as last reported by the worker"""
+        status = {
+            'running': self.running,
+            'fps': 0.0,
+            'frame_count': 0,
+            'uptime': int(time.time() - self.start_time) if self.start_time else 0,
+            'last_frame': None,
+            'error_count': 0,
+            'workflows': self.workflows,
+            'buffer_size': 0
+        }
+        status.update(self.remote_status)
+        status['running'] = self.running
+        status['ingest'] = {
+            'worker': self.worker_index,
+            'worker_alive': self.pool.is_alive(self.worker_index),
+            'ring': self.ring.get_stats() if self.ring and self.running else None
+        }
+        return status
+
+
+class IngestPool:
+    """Pool of ingest worker processes"""
+    
+    def __init__(self, num_workers: int, event_manager):
+        self.num_workers = num_workers
+        self.event_manager = event_manager
+        
+        self._ctx = multiprocessing.get_context('spawn')
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * num_workers
+        self._command_queues = [self._ctx.Queue() for _ in range(num_workers)]
+        self._message_queue = self._ctx.Queue()
+        
+        # worker index -> streams assigned to it
+        self._assignments: List[Dict[str, RemoteStream]] = [{} for _ in range(num_workers)]
+        
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[threading.Thread] = None
+        self._monitor_task = None
+        self._running = False
+        
+    def create_stream(self, camera_id: str, rtsp_url: str, workflows: List[str]) -> RemoteStream:
+        """Create a stream handle decoded by this pool"""
+        return RemoteStream(self, camera_id, rtsp_url, workflows)
+        
+    def _start(self):
+        """Spawn workers and the message reader (on first use)"""
+        if self._running:
+            return
+            
+        self._running = True
+        self._loop = asyncio.get_event_loop()
+        
+        for index in range(self.num_workers):
+            self._spawn(index)
+            
+        self._reader = threading.Thread(target=self._read_messages, name='ingest-reader', daemon=True)
+        self._reader.start()
+        self._monitor_task = asyncio.create_task(self._monitor())
+        
+        logger.info(f"Ingest pool started with {self.num_workers} workers")
+        
+    def _spawn(self, index: int):
+        process = self._ctx.Process(
+            target=run_worker,
+            args=(index, self._command_queues[index], self._message_queue),
+            name=f"ingest-{index}",
+            daemon=True
+        )
+        process.start()
+        self._processes[index] = process
+        
+    def assign(self, stream: RemoteStream):
+        """Place a stream on the least loaded worker"""
+        self._start()
+        
+        index = min(range(self.num_workers), key=lambda i: len(self._assignments[i]))
+        self._assignments[index][stream.camera_id] = stream
+        stream.worker_index = index
+        self.send(index, stream.start_command())
+        
+    def release(self, stream: RemoteStream):
+        """Stop a stream on its worker"""
+        if stream.worker_index is None:
+            return
+        self._assignments[stream.worker_index].pop(stream.camera_id, None)
+        self.send(stream.worker_index, ('stop', stream.camera_id))
+        
+    def send(self, index: Optional[int], command: tuple):
+        if index is not None and self._running:
+            self._command_queues[index].put(command)
+            
+    def is_alive(self, index: Optional[int]) -> bool:
+        if index is None or self._processes[index] is None:
+            return False
+        return self._processes[index].is_alive()
+        
+    def _read_messages(self):
+        """Forward worker messages to the event loop (reader thread)"""
+        while self._running:
+            try:
+                message = self._message_queue.get(timeout=0.5)
+            except Empty:
+                continue
+            except (EOFError, OSError):
+                break
+                
+            kind = message[0]
+            if kind == 'event':
+                asyncio.run_coroutine_threadsafe(
+                    self._create_event(message[1]), self._loop
+                )
+            elif kind == 'switched':
+                _, index, camera_id, rtsp_url, switched = message
+                stream = self._assignments[index].get(camera_id)
+                if stream:
+                    self._loop.call_soon_threadsafe(stream.switch_done, rtsp_url, switched)
+            elif kind == 'status':
+                _, index, statuses = message
+                for camera_id, status in statuses.items():
+                    stream = self._assignments[index].get(camera_id)
+                    if stream:
+                        stream.remote_status = status
+                        
+    async def _create_event(self, event: dict):
+        try:
+            await self.event_manager.create_event(event)
+        except Exception as e:
+            logger.error(f"Failed to create event from ingest worker: {e}", exc_info=True)
+            
+    async def _monitor(self):
+        """Restart workers that died and re-send their cameras"""
+        while self._running:
+            await asyncio.sleep(5)
+            
+            for index, process in enumerate(self._processes):
+                if not self._running or process is None or process.is_alive():
+                    continue
+                    
+                logger.error(
+                    f"Ingest worker {index} exited with code {process.exitcode}, restarting"
+                )
+                self._spawn(index)
+                for stream in self._assignments[index].values():
+                    self.send(index, stream.start_command())
+                    
+    async def shutdown(self):
+        """Stop all workers"""
+        if not self._running:
+            return
+            
+        for index in range(self.num_workers):
+            self.send(index, ('shutdown',))
+        self._running = False
+        
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            
+        loop = asyncio.get_event_loop()
+        for process in self._processes:
+            if process is None:
+                continue
+            await loop.run_in_executor(None, process.join, 10)
+            if process.is_alive():
+                process.terminate()
+                
+        logger.info("Ingest pool stopped")
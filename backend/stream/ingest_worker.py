@@ -0,0 +1,232 @@
+"""
+Ingest Worker
+Entry point for camera ingest worker processes
+
+Each worker owns a shard of cameras: it decodes them with its own RTSPStream
+instances, runs their YAML workflows, copies decoded frames into the camera's
+shared memory ring and sends events and status back to the main process.
+"""
+import asyncio
+import logging
+import os
+import sys
+from typing import Dict, Set
+
+import cv2
+
+from core.config import settings
+from core.logging import SecretRedactingFormatter
+
+
+logger = logging.getLogger('overwatch.stream.ingest_worker')
+
+
+# Seconds between status reports to the main process
+STATUS_INTERVAL = 1.0
+
+
+class EventForwarder:
+    """Stands in for EventManager inside a worker, forwarding events over IPC"""
+    
+    def __init__(self, message_queue):
+        self.message_queue = message_queue
+        
+    def subscribe(self, callback):
+        """Subscribers live in the main process"""
+        pass
+        
+    async def create_event(self, event: dict):
+        """Forward an event to the main process EventManager"""
+        self.message_queue.put(('event', event))
+
+
+class ShardStreams:
+    """Worker-local stand-in for StreamManager, used by record actions"""
+    
+    def __init__(self):
+        self.streams: Dict[str, object] = {}
+
+
+class ShardedCamera:
+    """A camera decoded inside this worker and mirrored into shared memory"""
+    
+    def __init__(self, stream, ring):
+        self.stream = stream
+        self.ring = ring
+        self.task = None
+        # Stream switches still in flight
+        self.switch_tasks: Set[asyncio.Task] = set()
+        
+    async def publish_loop(self):
+        """Copy each newly decoded frame into the shared ring"""
+        seq = 0
+        while self.stream.running:
+            seq, frame = await self.stream.wait_for_frame(seq, timeout=1.0)
+            if frame is None:
+                continue
+                
+            if frame.nbytes > self.ring.slot_bytes:
+                # Larger than the ring was sized for: downscale to fit
+                scale = (self.ring.slot_bytes / frame.nbytes) ** 0.5
+                frame = cv2.resize(
+                    frame,
+                    (int(frame.shape[1] * scale), int(frame.shape[0] * scale)),
+                    interpolation=cv2.INTER_AREA
+                )
+                
+            meta = self.stream.frame_buffer.get_meta(seq)
+            if meta is not None:
+                self.ring.write(frame, meta.pts, meta.ingest_time)
+            else:
+                self.ring.write(frame)
+            frame = None
+
+
+def _setup_logging(worker_index: int):
+    """Console logging tagged with the worker index"""
+    root_logger = logging.getLogger()
+    root_logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
+    root_logger.handlers.clear()
+    
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(SecretRedactingFormatter(
+        f'%(asctime)s - [ingest-{worker_index}] %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    root_logger.addHandler(handler)
+
+
+def run_worker(worker_index: int, command_queue, message_queue):
+    """
+    Worker process entry point
+    
+    Args:
+        worker_index: Index of this worker in the pool
+        command_queue: Commands from the main process
+        message_queue: Events and status for the main process
+    """
+    _setup_logging(worker_index)
+    
+    try:
+        asyncio.run(_worker_main(worker_index, command_queue, message_queue))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _worker_main(worker_index: int, command_queue, message_queue):
+    from workflows.engine import WorkflowEngine
+    from .rtsp import RTSPStream
+    from .shm_ring import SharedFrameRing
+    
+    loop = asyncio.get_event_loop()
+    engine = WorkflowEngine(EventForwarder(message_queue))
+    shard = ShardStreams()
+    engine.set_stream_manager(shard)
+    cameras: Dict[str, ShardedCamera] = {}
+    
+    logger.info(f"Ingest worker {worker_index} started (pid {os.getpid()})")
+    
+    async def report_status():
+        while True:
+            await asyncio.sleep(STATUS_INTERVAL)
+            status = {}
+            for camera_id, camera in cameras.items():
+                status[camera_id] = camera.stream.get_status()
+                status[camera_id]['recording'] = camera.stream.recording
+            message_queue.put(('status', worker_index, status))
+            
+    status_task = asyncio.create_task(report_status())
+    
+    async def switch_camera(camera: ShardedCamera, rtsp_url: str, timeout: float):
+        camera_id = camera.stream.camera_id
+        switched = False
+        try:
+            switched = await camera.stream.switch_url(rtsp_url, timeout)
+        except Exception as e:
+            logger.error(f"Failed to switch {camera_id} to {rtsp_url}: {e}", exc_info=True)
+        message_queue.put(('switched', worker_index, camera_id, rtsp_url, switched))
+        
+    async def stop_camera(camera_id: str):
+        camera = cameras.pop(camera_id, None)
+        shard.streams.pop(camera_id, None)
+        if not camera:
+            return
+        # A switch still opening its connection closes it when cancelled
+        for task in camera.switch_tasks:
+            task.cancel()
+        await asyncio.gather(*camera.switch_tasks, return_exceptions=True)
+        await camera.stream.stop()
+        if camera.task:
+            camera.task.cancel()
+        camera.ring.close()
+        
+    while True:
+        command = await loop.run_in_executor(None, command_queue.get)
+        op = command[0]
+        
+        try:
+            if op == 'start':
+                config = command[1]
+                camera_id = config['camera_id']
+                if camera_id in cameras:
+                    continue
+                    
+                # Load only the workflows this shard needs
+                await engine.load_workflows(config['workflows'])
+                
+                stream = RTSPStream(
+                    camera_id=camera_id,
+                    rtsp_url=config['rtsp_url'],
+                    workflow_engine=engine,
+                    workflows=config['workflows']
+                )
+                stream.set_target_fps(config.get('target_fps'))
+                stream.set_keyframe_only(config.get('keyframe_only', False))
+                
+                pre_buffer = engine.get_record_pre_buffer(config['workflows'])
+                if pre_buffer:
+                    await stream.enable_packet_ring(pre_buffer)
+                    
+                camera = ShardedCamera(stream, SharedFrameRing.attach(config['ring_name']))
+                cameras[camera_id] = camera
+                shard.streams[camera_id] = stream
+                
+                await stream.start()
+                camera.task = asyncio.create_task(camera.publish_loop())
+                
+            elif op == 'stop':
+                await stop_camera(command[1])
+                
+            elif op == 'fps':
+                camera = cameras.get(command[1])
+                if camera:
+                    camera.stream.set_target_fps(command[2])
+                    
+            elif op == 'keyframe':
+                camera = cameras.get(command[1])
+                if camera:
+                    camera.stream.set_keyframe_only(command[2])
+                    
+            elif op == 'url':
+                # Keeps the command loop responsive while the new
+                # connection comes up
+                camera = cameras.get(command[1])
+                if camera:
+                    task = asyncio.create_task(switch_camera(camera, command[2], command[3]))
+                    camera.switch_tasks.add(task)
+                    task.add_done_callback(camera.switch_tasks.discard)
+                else:
+                    message_queue.put(('switched', worker_index, command[1], command[2], False))
+                    
+            elif op == 'shutdown':
+                break
+                
+        except Exception as e:
+            logger.error(f"Ingest worker {worker_index} failed on {op}: {e}", exc_info=True)
+            
+    status_task.cancel()
+    for camera_id in list(cameras):
+        await stop_camera(camera_id)
+    await engine.cleanup()
+    
+    logger.info(f"Ingest worker {worker_index} stopped")
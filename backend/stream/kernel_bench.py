@@ -0,0 +1,154 @@
+"""
+CPU Kernel Benchmark
+Compares thread and process execution of each CPU kernel
+
+    python -m stream.kernel_bench --cameras 4 8 16 --rounds 20 --workers 4
+
+Every simulated camera submits one 1080p frame per round, all at once, to a
+CpuPool in thread mode (workers=0) and in process mode. Each result is then
+followed by --post-ms of pure Python work on the event loop, which stands in
+for the Python-level post-processing that contends with kernel threads for
+the GIL. Per kernel, camera count and mode, the JSON report gives frames per
+second and p50/p95 latency from submit until post-processing is done.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from .cpu_pool import CpuPool
+from .kernels import KERNELS
+
+
+FRAME_SHAPE = (1080, 1920, 3)
+
+
+def make_frame(seed: int) -> np.ndarray:
+    """Noisy frame with a fire-colored patch so every kernel has work"""
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 120, FRAME_SHAPE, dtype=np.uint8)
+    x = 200 + (seed * 97) % 1400
+    cv2.rectangle(frame, (x, 300), (x + 200, 500), (0, 80, 255), -1)
+    return frame
+
+
+def kernel_args(kernel: str) -> tuple:
+    """Arguments after the frame for each kernel"""
+    if kernel == 'heatmap':
+        detections = [
+            {'bbox': {'x': 150 + i * 300, 'y': 200 + i * 100, 'width': 120, 'height': 240}}
+            for i in range(5)
+        ]
+        return (detections,)
+    return ()
+
+
+def python_work(seconds: float):
+    """Hold the GIL like Python post-processing would"""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+async def bench_kernel(
+    pool: CpuPool,
+    kernel: str,
+    frames: List[np.ndarray],
+    rounds: int,
+    post_seconds: float
+) -> dict:
+    """Run rounds of one frame per camera and summarize throughput and latency"""
+    args = kernel_args(kernel)
+    latencies: List[float] = []
+    
+    async def one(frame: np.ndarray):
+        started = time.perf_counter()
+        await pool.run(kernel, frame, *args)
+        python_work(post_seconds)
+        latencies.append(time.perf_counter() - started)
+        
+    # Warm up: spawn workers, attach rings, fill caches
+    await asyncio.gather(*(one(frame) for frame in frames))
+    latencies.clear()
+    
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(one(frame) for frame in frames))
+    elapsed = time.perf_counter() - started
+    
+    p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+    return {
+        'fps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(float(p50), 2),
+        'p95_ms': round(float(p95), 2)
+    }
+
+
+async def run_bench(
+    cameras: List[int],
+    kernels: List[str],
+    workers: int,
+    rounds: int,
+    post_ms: float
+) -> dict:
+    """Benchmark every kernel in both modes at each camera count"""
+    results: Dict[str, Dict[str, dict]] = {kernel: {} for kernel in kernels}
+    
+    for mode, pool in (
+        ('thread', CpuPool(workers=0)),
+        ('process', CpuPool(workers=workers, kernels=kernels))
+    ):
+        try:
+            for count in cameras:
+                frames = [make_frame(seed) for seed in range(count)]
+                for kernel in kernels:
+                    result = await bench_kernel(pool, kernel, frames, rounds, post_ms / 1000)
+                    results[kernel].setdefault(str(count), {})[mode] = result
+        finally:
+            pool.shutdown()
+            
+    for by_count in results.values():
+        for modes in by_count.values():
+            modes['process_speedup'] = round(modes['process']['fps'] / modes['thread']['fps'], 2)
+            
+    return {
+        'frame_shape': list(FRAME_SHAPE),
+        'workers': workers,
+        'rounds': rounds,
+        'post_ms': post_ms,
+        'kernels': results
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog='python -m stream.kernel_bench',
+        description='Compare thread and process execution of the CPU kernels'
+    )
+    parser.add_argument('--cameras', type=int, nargs='+', default=[4, 8, 16], help='Camera counts (default 4 8 16)')
+    parser.add_argument('--kernels', nargs='+', default=list(KERNELS), choices=list(KERNELS))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes (default: CPU count)')
+    parser.add_argument('--rounds', type=int, default=20, help='Frames per camera per measurement (default 20)')
+    parser.add_argument('--post-ms', type=float, default=2.0, help='Python work per result on the event loop (default 2)')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+    
+    report = asyncio.run(run_bench(args.cameras, args.kernels, args.workers, args.rounds, args.post_ms))
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+CPU Kernels
+Pure OpenCV/numpy functions that may run in a CpuPool worker process
+
+Kernels take a frame as their first argument and only picklable arguments
+after it. Each returns a small picklable result (or a frame). They must not
+touch model, stream or event loop state, and this module only imports cv2
+and numpy, so worker processes start quickly.
+"""
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+
+# Fire color ranges in HSV (red wraps around hue 0)
+FIRE_HSV_RANGES = [
+    (np.array([0, 100, 100]), np.array([10, 255, 255])),
+    (np.array([160, 100, 100]), np.array([180, 255, 255])),
+    (np.array([20, 100, 100]), np.array([40, 255, 255]))
+]
+
+_MORPH_KERNEL = np.ones((5, 5), np.uint8)
+
+
+def fire_color_detections(frame: np.ndarray, min_area: float = 500) -> List[dict]:
+    """Find red/orange/yellow regions large and solid enough to be fire"""
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    
+    fire_mask = None
+    for lower, upper in FIRE_HSV_RANGES:
+        mask = cv2.inRange(hsv, lower, upper)
+        fire_mask = mask if fire_mask is None else fire_mask | mask
+        
+    # Remove speckle noise
+    fire_mask = cv2.morphologyEx(fire_mask, cv2.MORPH_CLOSE, _MORPH_KERNEL)
+    fire_mask = cv2.morphologyEx(fire_mask, cv2.MORPH_OPEN, _MORPH_KERNEL)
+    
+    contours, _ = cv2.findContours(fire_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    
+    detections = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if area <= min_area:
+            continue
+            
+        x, y, w, h = cv2.boundingRect(contour)
+        
+        # Confidence from how much of the box is fire colored
+        roi = fire_mask[y:y+h, x:x+w]
+        fill_ratio = np.sum(roi > 0) / (w * h) if w * h > 0 else 0
+        confidence = min(0.9, fill_ratio * 1.2)
+        
+        # Only return high confidence detections
+        if confidence > 0.6:
+            detections.append({
+                'class_id': 999,  # Custom ID
+                'class_name': 'fire_color_based',
+                'confidence': float(confidence),
+                'bbox': [float(x), float(y), float(x + w), float(y + h)],
+                'area': float(area),
+                'detection_type': 'fire_color',
+                'severity': 'high' if area > 5000 else 'medium'
+            })
+            
+    return detections
+
+
+def lighting_levels(frame: np.ndarray) -> Tuple[float, float]:
+    """Mean brightness (V) and saturation (S) of a BGR frame, 0.0-1.0"""
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    brightness = float(np.mean(hsv[:, :, 2]) / 255.0)
+    saturation = float(np.mean(hsv[:, :, 1]) / 255.0)
+    return brightness, saturation
+
+
+def render_heatmap(
+    frame: np.ndarray,
+    detections: List[Dict],
+    alpha: float = 0.4,
+    colormap: int = cv2.COLORMAP_JET,
+    schematic_mode: bool = False
+) -> np.ndarray:
+    """Draw a heatmap of detection locations over (or instead of) the frame"""
+    h, w = frame.shape[:2]
+    heatmap = np.zeros((h, w), dtype=np.float32)
+    
+    # Add Gaussian blobs for each detection
+    for det in detections:
+        bbox = det.get('bbox', {})
+        if not bbox:
+            continue
+            
+        cx = int(bbox.get('x', 0) + bbox.get('width', 0) / 2)
+        cy = int(bbox.get('y', 0) + bbox.get('height', 0) / 2)
+        
+        # Create Gaussian blob
+        sigma = max(bbox.get('width', 50), bbox.get('height', 50)) / 3
+        y, x = np.ogrid[:h, :w]
+        gaussian = np.exp(-((x - cx)**2 + (y - cy)**2) / (2 * sigma**2))
+        heatmap += gaussian
+        
+    # Normalize
+    if heatmap.max() > 0:
+        heatmap = heatmap / heatmap.max()
+        
+    # Apply colormap
+    heatmap_colored = cv2.applyColorMap(
+        (heatmap * 255).astype(np.uint8),
+        colormap
+    )
+    
+    if schematic_mode:
+        # Pure heatmap on black background
+        return heatmap_colored
+    # Blend with original frame
+    return cv2.addWeighted(frame, 1 - alpha, heatmap_colored, alpha, 0)
+
+
+def encode_jpeg(frame: np.ndarray, quality: int = 50) -> bytes:
+    """JPEG-encode a frame"""
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError(f"Could not JPEG-encode frame of shape {frame.shape}")
+    return buffer.tobytes()
+
+
+# Kernels by the name callers pass to CpuPool.run()
+KERNELS = {
+    'fire_color': fire_color_detections,
+    'lighting': lighting_levels,
+    'heatmap': render_heatmap,
+    'jpeg': encode_jpeg
+}
@@ -1,12 +1,13 @@
 """
 Lighting Analyzer - Detect day/night/dusk and IR mode from video frames
 """
-import cv2
 import numpy as np
 from typing import Dict, Optional
 from enum import Enum
 import logging
 
+from .kernels import lighting_levels
+
 logger = logging.getLogger(__name__)
 
 
@@ -51,15 +52,43 @@ class LightingAnalyzer:
             Dict with state, brightness, is_ir, confidence
         """
         try:
-            # Convert to HSV for better analysis
-            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-            
-            # Calculate average brightness (V channel)
-            brightness = np.mean(hsv[:, :, 2]) / 255.0
-            
-            # Calculate color saturation (S channel)
-            saturation = np.mean(hsv[:, :, 1]) / 255.0
+            # Average brightness (V channel) and color saturation (S channel)
+            brightness, saturation = lighting_levels(frame)
+            return self.analyze_levels(
+                brightness,
+                saturation,
+                brightness_threshold=brightness_threshold,
+                ir_threshold=ir_threshold,
+                sensitivity=sensitivity
+            )
+        except Exception as e:
+            logger.error(f"Error analyzing frame: {e}")
+            return self._default_result()
+    
+    def analyze_levels(
+        self,
+        brightness: float,
+        saturation: float,
+        brightness_threshold: float = 0.3,
+        ir_threshold: float = 0.7,
+        sensitivity: float = 0.5
+    ) -> Dict:
+        """
+        Analyze lighting levels already measured with kernels.lighting_levels
+        
+        Lets callers compute the levels off the event loop (CpuPool).
+        
+        Args:
+            brightness: Mean brightness (0.0-1.0)
+            saturation: Mean saturation (0.0-1.0)
+            brightness_threshold: Threshold for day/night (0.0-1.0)
+            ir_threshold: Threshold for IR detection (0.0-1.0)
+            sensitivity: Overall sensitivity adjustment (0.0-1.0)
             
+        Returns:
+            Dict with state, brightness, is_ir, confidence
+        """
+        try:
             # Add to history for smoothing
             self.brightness_history.append(brightness)
             self.saturation_history.append(saturation)
@@ -103,7 +132,7 @@ class LightingAnalyzer:
                 'raw_saturation': float(saturation)
             }
         except Exception as e:
-            logger.error(f"Error analyzing frame: {e}")
+            logger.error(f"Error analyzing lighting levels: {e}")
             return self._default_result()
     
     def _default_result(self) -> Dict:
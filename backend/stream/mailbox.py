@@ -0,0 +1,103 @@
+"""
+Latest Frame Mailbox
+Single-slot, latest-wins handoff between frame producers and consumers
+
+A producer (camera dispatch) posts frames without waiting; the consumer
+(a workflow's model) takes whatever is newest when it is ready. A frame that
+is replaced before it was taken is counted in
+frames_dropped{reason="stale"}, so under overload the work queue never grows
+and latency stays bounded by one frame of processing.
+"""
+import asyncio
+from typing import Any, Optional
+
+from core.metrics import frames_dropped, workflow_queue_depth
+
+
+class LatestFrameMailbox:
+    """Holds at most one pending item; newer posts replace older ones"""
+    
+    def __init__(self, camera_id: str, workflow_id: str = ''):
+        self.camera_id = camera_id
+        self.workflow_id = workflow_id
+        
+        self._item: Any = None
+        self._has_item = False
+        self._event = asyncio.Event()
+        self._closed = False
+        
+        # Statistics
+        self.posted = 0
+        self.taken = 0
+        self.dropped = 0
+        
+        self._dropped_metric = frames_dropped.labels(
+            camera_id=camera_id, workflow_id=workflow_id, reason='stale'
+        )
+        self._depth_metric = workflow_queue_depth.labels(
+            camera_id=camera_id, workflow_id=workflow_id
+        )
+        
+    def put(self, item: Any) -> bool:
+        """
+        Post an item without waiting
+        
+        Returns:
+            True if it replaced an item the consumer never took
+        """
+        replaced = self._has_item
+        if replaced:
+            self.dropped += 1
+            self._dropped_metric.inc()
+            
+        self._item = item
+        self._has_item = True
+        self.posted += 1
+        self._depth_metric.set(1)
+        self._event.set()
+        return replaced
+        
+    def take(self) -> Optional[Any]:
+        """Take the pending item, if any, without waiting"""
+        if not self._has_item:
+            return None
+            
+        item, self._item = self._item, None
+        self._has_item = False
+        self.taken += 1
+        self._depth_metric.set(0)
+        self._event.clear()
+        return item
+        
+    async def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Wait for and take the newest item
+        
+        Returns:
+            The item, or None on timeout or once the mailbox is closed
+        """
+        while not self._has_item and not self._closed:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.take()
+        
+    @property
+    def pending(self) -> bool:
+        return self._has_item
+        
+    def close(self):
+        """Drop any pending item and wake a waiting consumer"""
+        self._item = None
+        self._has_item = False
+        self._closed = True
+        self._depth_metric.set(0)
+        self._event.set()
+        
+    def get_stats(self) -> dict:
+        return {
+            'posted': self.posted,
+            'taken': self.taken,
+            'dropped_stale': self.dropped
+        }
@@ -4,6 +4,7 @@ Handles RTSP stream ingestion and management
 """
 import asyncio
 import logging
+import time
 from typing import Dict, List, Optional
 from pathlib import Path
 
@@ -11,12 +12,29 @@ import yaml
 
 from core.config import settings
 from .rtsp import RTSPStream
+from .ingest import IngestPool
 from workflows.engine import WorkflowEngine
+from workflows.performance import CpuMonitor
 
 
 logger = logging.getLogger('overwatch.stream')
 
 
+# Sub-stream qualities, lowest first
+QUALITY_LEVELS = ('low', 'medium', 'high')
+
+# Seconds between re-evaluations of CPU load and sub-stream choice
+QUALITY_CHECK_INTERVAL = 5.0
+
+# Seconds before retrying a sub-stream that failed to come up
+SWITCH_RETRY_DELAY = 60.0
+
+
+def _quality_rank(quality: Optional[str]) -> int:
+    """Position in QUALITY_LEVELS (unknown names count as medium)"""
+    return QUALITY_LEVELS.index(quality) if quality in QUALITY_LEVELS else 1
+
+
 class StreamManager:
     """Manages multiple RTSP camera streams"""
     
@@ -26,6 +44,27 @@ class StreamManager:
         self.cameras: Dict[str, dict] = {}
         self._running = False
         
+        # Optional worker processes that decode cameras outside this process
+        self.ingest_pool: Optional[IngestPool] = None
+        if settings.INGEST_WORKERS > 0:
+            self.ingest_pool = IngestPool(settings.INGEST_WORKERS, workflow_engine.event_manager)
+            logger.info(f"Sharding camera ingest across {settings.INGEST_WORKERS} worker processes")
+            
+        # Frame rate demand per camera: camera_id -> consumer_id -> fps
+        self._demand: Dict[str, Dict[str, float]] = {}
+        # Sub-stream quality demand: camera_id -> consumer_id -> quality
+        self._quality_demand: Dict[str, Dict[str, str]] = {}
+        
+        # Runtime sub-stream selection
+        self.cpu_monitor = CpuMonitor(settings.CPU_HIGH_PERCENT, settings.CPU_LOW_PERCENT)
+        self._quality_task = None
+        self._switch_tasks: Dict[str, asyncio.Task] = {}
+        self._downgrade_since: Dict[str, float] = {}
+        self._switch_retry_at: Dict[str, float] = {}
+        
+        # Record actions pull clips from our streams
+        workflow_engine.set_stream_manager(self)
+        
     async def load_cameras(self):
         """Load camera configuration from database"""
         from core.database import SessionLocal, Camera
@@ -83,17 +122,43 @@ class StreamManager:
             
         camera = self.cameras[camera_id]
         
+        # Open the sub-stream the attached workflows need right away
+        self._register_workflow_demand(camera_id)
+        quality = self._desired_quality(camera_id)
+        if quality and quality != camera.get('active_stream'):
+            camera['active_stream'] = quality
+            camera['rtsp_url'] = camera['streams'][quality]['url']
+            
         try:
-            stream = RTSPStream(
-                camera_id=camera_id,
-                rtsp_url=camera['rtsp_url'],
-                workflow_engine=self.workflow_engine,
-                workflows=camera.get('workflows', [])
-            )
+            if self.ingest_pool:
+                stream = self.ingest_pool.create_stream(
+                    camera_id=camera_id,
+                    rtsp_url=camera['rtsp_url'],
+                    workflows=camera.get('workflows', [])
+                )
+            else:
+                stream = RTSPStream(
+                    camera_id=camera_id,
+                    rtsp_url=camera['rtsp_url'],
+                    workflow_engine=self.workflow_engine,
+                    workflows=camera.get('workflows', [])
+                )
             
             self.streams[camera_id] = stream
+            self._apply_demand(camera_id)
+            
+            # Keep compressed packets around if a workflow records clips
+            pre_buffer = self.workflow_engine.get_record_pre_buffer(camera.get('workflows', []))
+            if pre_buffer and hasattr(stream, 'enable_packet_ring'):
+                await stream.enable_packet_ring(pre_buffer)
+                
             await stream.start()
             
+            # Cameras can opt into auto selection with the global flag off;
+            # delayed downgrades and CPU load only get revisited by the loop
+            if quality is not None and self._quality_task is None:
+                self._quality_task = asyncio.create_task(self._quality_loop())
+                
             logger.info(f"Started stream: {camera_id} ({camera['name']})")
             return True
             
@@ -101,6 +166,220 @@ class StreamManager:
             logger.error(f"Failed to start stream {camera_id}: {e}", exc_info=True)
             return False
             
+    def register_consumer(
+        self,
+        camera_id: str,
+        consumer_id: str,
+        fps: float,
+        quality: str = 'medium'
+    ):
+        """
+        Register (or update) a consumer's frame rate demand for a camera
+        
+        The camera is decoded at the highest rate any consumer requested;
+        frames in between are skipped without decoding. Cameras with several
+        sub-streams run the lowest one that satisfies every consumer.
+        
+        Args:
+            camera_id: Camera ID
+            consumer_id: Unique consumer ID (e.g. workflow:node)
+            fps: Frames per second the consumer needs
+            quality: Sub-stream the consumer needs: 'low' (coarse analytics),
+                'medium' (detection) or 'high' (X-RAY viewing, recording)
+        """
+        self._demand.setdefault(camera_id, {})[consumer_id] = float(fps)
+        self._quality_demand.setdefault(camera_id, {})[consumer_id] = quality
+        self._apply_demand(camera_id)
+        
+    def release_consumer(self, camera_id: str, consumer_id: str):
+        """Remove a consumer's frame rate demand for a camera"""
+        qualities = self._quality_demand.get(camera_id)
+        if qualities is not None:
+            qualities.pop(consumer_id, None)
+            if not qualities:
+                del self._quality_demand[camera_id]
+                
+        consumers = self._demand.get(camera_id)
+        if consumers is None or consumers.pop(consumer_id, None) is None:
+            return
+            
+        if not consumers:
+            del self._demand[camera_id]
+        self._apply_demand(camera_id)
+        
+    def get_demand_fps(self, camera_id: str) -> Optional[float]:
+        """
+        Get the highest fps any consumer requested
+        
+        Returns:
+            Highest requested fps, 0 if a consumer needs every frame, or None
+            when the camera has no consumers
+        """
+        consumers = self._demand.get(camera_id)
+        if not consumers:
+            return None
+        if any(fps <= 0 for fps in consumers.values()):
+            return 0.0
+        return max(consumers.values())
+        
+    def get_demand_quality(self, camera_id: str) -> Optional[str]:
+        """Get the highest sub-stream quality any consumer requested"""
+        qualities = self._quality_demand.get(camera_id)
+        if not qualities:
+            return None
+        return max(qualities.values(), key=_quality_rank)
+        
+    def _register_workflow_demand(self, camera_id: str):
+        """Register demand for the YAML workflows attached to a camera"""
+        for workflow_id in self.cameras[camera_id].get('workflows', []):
+            workflow = self.workflow_engine.workflows.get(workflow_id)
+            if workflow:
+                consumer_id = f"workflow:{workflow_id}"
+                self._demand.setdefault(camera_id, {})[consumer_id] = float(workflow.target_fps)
+                
+                # Recorded clips come from the active sub-stream
+                records = self.workflow_engine.get_record_pre_buffer([workflow_id]) > 0
+                self._quality_demand.setdefault(camera_id, {})[consumer_id] = (
+                    'high' if records else 'medium'
+                )
+                
+    def _apply_demand(self, camera_id: str):
+        """Push the current demand to the camera's stream"""
+        stream = self.streams.get(camera_id)
+        if not stream:
+            return
+            
+        demand = self.get_demand_fps(camera_id)
+        fps = demand
+        if fps is None:
+            # Nobody is watching, keep the stream alive at an idle rate
+            fps = settings.IDLE_DECODE_FPS
+        elif fps <= 0:
+            fps = None
+            
+        if fps != stream.target_fps:
+            logger.info(f"Decode rate for {camera_id}: {fps} fps")
+            stream.set_target_fps(fps)
+            
+        if hasattr(stream, 'set_keyframe_only'):
+            stream.set_keyframe_only(self._use_keyframe_only(camera_id, demand))
+            
+        self._update_stream_quality(camera_id)
+        
+    def _use_keyframe_only(self, camera_id: str, demand: Optional[float]) -> bool:
+        """
+        Decide whether a camera can be decoded keyframes-only
+        
+        Camera settings may force decode_mode 'full' or 'keyframe'; in 'auto'
+        (default) keyframe-only is used while every consumer is at or below
+        KEYFRAME_ONLY_MAX_FPS. Idle cameras (no consumers) decode in full so
+        snapshots stay fresh.
+        
+        Args:
+            demand: get_demand_fps() of the camera
+        """
+        mode = (self.cameras.get(camera_id, {}).get('settings') or {}).get('decode_mode', 'auto')
+        if mode == 'full':
+            return False
+        if mode == 'keyframe':
+            return True
+        return demand is not None and 0 < demand <= settings.KEYFRAME_ONLY_MAX_FPS
+        
+    def _desired_quality(self, camera_id: str) -> Optional[str]:
+        """
+        Pick the sub-stream a camera should run
+        
+        The lowest quality that satisfies every consumer, one step lower while
+        the CPU is overloaded, mapped onto the sub-streams the camera has.
+        Cameras opt out with settings stream_selection 'fixed'.
+        
+        Returns:
+            Quality name, or None to leave the active stream alone
+        """
+        camera = self.cameras.get(camera_id, {})
+        streams = camera.get('streams') or {}
+        available = [q for q in QUALITY_LEVELS if (streams.get(q) or {}).get('url')]
+        
+        default_mode = 'auto' if settings.STREAM_AUTO_QUALITY else 'fixed'
+        mode = (camera.get('settings') or {}).get('stream_selection', default_mode)
+        if mode != 'auto' or len(available) < 2:
+            return None
+            
+        wanted = _quality_rank(self.get_demand_quality(camera_id) or 'low')
+        if self.cpu_monitor.overloaded:
+            wanted = max(0, wanted - 1)
+            
+        # Closest available at or above what is wanted, else the best there is
+        for quality in available:
+            if _quality_rank(quality) >= wanted:
+                return quality
+        return available[-1]
+        
+    def _update_stream_quality(self, camera_id: str):
+        """Switch a camera's sub-stream if its demand calls for another one"""
+        camera = self.cameras.get(camera_id)
+        stream = self.streams.get(camera_id)
+        quality = self._desired_quality(camera_id)
+        
+        if not camera or not stream or not quality or quality == camera.get('active_stream'):
+            self._downgrade_since.pop(camera_id, None)
+            return
+            
+        task = self._switch_tasks.get(camera_id)
+        if task and not task.done():
+            return
+        if time.monotonic() < self._switch_retry_at.get(camera_id, 0.0):
+            return
+        if getattr(stream, 'recording', False):
+            # A reconnect would cut the clip short
+            return
+            
+        if _quality_rank(quality) < _quality_rank(camera.get('active_stream')):
+            # Step down only once the lower demand has held for a while
+            since = self._downgrade_since.setdefault(camera_id, time.monotonic())
+            if time.monotonic() - since < settings.STREAM_DOWNGRADE_DELAY:
+                return
+        self._downgrade_since.pop(camera_id, None)
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._switch_tasks[camera_id] = asyncio.create_task(self._switch_stream(camera_id, quality))
+        
+    async def _switch_stream(self, camera_id: str, quality: str):
+        """Move a running camera to another sub-stream without a frame gap"""
+        camera = self.cameras[camera_id]
+        stream = self.streams.get(camera_id)
+        url = camera['streams'][quality]['url']
+        previous = camera.get('active_stream')
+        
+        logger.info(f"Switching {camera_id} from {previous} to {quality} stream")
+        try:
+            switched = await stream.switch_url(url, settings.STREAM_SWITCH_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Failed to switch {camera_id} to {quality} stream: {e}", exc_info=True)
+            switched = False
+            
+        if not switched:
+            self._switch_retry_at[camera_id] = time.monotonic() + SWITCH_RETRY_DELAY
+            return
+            
+        if self.streams.get(camera_id) is stream:
+            camera['active_stream'] = quality
+            camera['rtsp_url'] = url
+            
+    async def _quality_loop(self):
+        """Track CPU load and revisit sub-stream choices (delayed downgrades)"""
+        while True:
+            await asyncio.sleep(QUALITY_CHECK_INTERVAL)
+            try:
+                self.cpu_monitor.refresh()
+                for camera_id in list(self.streams):
+                    self._update_stream_quality(camera_id)
+            except Exception as e:
+                logger.error(f"Sub-stream selection failed: {e}", exc_info=True)
+                
     async def stop_stream(self, camera_id: str) -> bool:
         """Stop a camera stream"""
         if camera_id not in self.streams:
@@ -109,6 +388,9 @@ class StreamManager:
             
         try:
             stream = self.streams[camera_id]
+            task = self._switch_tasks.pop(camera_id, None)
+            if task:
+                task.cancel()
             await stream.stop()
             del self.streams[camera_id]
             
@@ -128,6 +410,14 @@ class StreamManager:
             tasks.append(self.stop_stream(camera_id))
             
         await asyncio.gather(*tasks, return_exceptions=True)
+        
+        if self._quality_task:
+            self._quality_task.cancel()
+            self._quality_task = None
+            
+        if self.ingest_pool:
+            await self.ingest_pool.shutdown()
+            
         logger.info("All streams stopped")
         
     def get_stream_status(self, camera_id: str) -> Optional[dict]:
@@ -136,7 +426,9 @@ class StreamManager:
             return None
             
         stream = self.streams[camera_id]
-        return stream.get_status()
+        status = stream.get_status()
+        status['active_stream'] = self.cameras.get(camera_id, {}).get('active_stream')
+        return status
         
     def get_all_status(self) -> List[dict]:
         """Get status of all streams"""
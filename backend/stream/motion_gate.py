@@ -0,0 +1,162 @@
+"""
+Motion Gate
+Skips inference on frames where nothing moved
+
+Most cameras show a static scene most of the time. A MotionGate compares a
+thumbnail of each frame against a slowly updated background and only passes
+frames whose moving-pixel fraction (over the whole frame, or in any of its
+zones) reaches a threshold. A keep-alive lets a frame through every so often
+anyway, so detections of stationary objects are refreshed.
+"""
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from core.metrics import motion_gate_frames
+from .frame_pyramid import PYRAMID_LEVELS
+
+
+class MotionGate:
+    """Background-subtraction motion check in front of a model"""
+    
+    def __init__(
+        self,
+        camera_id: str,
+        workflow_id: str = '',
+        threshold: float = 0.01,
+        pixel_threshold: int = 25,
+        keepalive: float = 10.0,
+        learning_rate: float = 0.05,
+        zones: Optional[List[List[List[float]]]] = None
+    ):
+        """
+        Args:
+            camera_id: Camera (or input node) the frames come from, for metrics
+            workflow_id: Workflow the gate belongs to, for metrics
+            threshold: Fraction of moving pixels (0-1) that counts as motion
+            pixel_threshold: Grey level change (0-255) for a pixel to count as moving
+            keepalive: Pass a frame at least this often in seconds (0 = never)
+            learning_rate: How fast the background follows the scene; 1.0
+                compares against the previous frame only
+            zones: Polygons of normalized [x, y] points; motion in any zone
+                opens the gate. Whole frame if empty.
+        """
+        self.camera_id = camera_id
+        self.workflow_id = workflow_id
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.keepalive = keepalive
+        self.learning_rate = min(max(learning_rate, 0.001), 1.0)
+        self.zones = zones or []
+        
+        self._background: Optional[np.ndarray] = None
+        self._masks: List[np.ndarray] = []
+        self._last_pass = 0.0
+        self.last_motion = 0.0
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.keepalives = 0
+        
+        self._metrics = {
+            result: motion_gate_frames.labels(
+                camera_id=camera_id, workflow_id=workflow_id, result=result
+            )
+            for result in ('hit', 'miss', 'keepalive')
+        }
+        
+    def check(self, frame: np.ndarray) -> bool:
+        """
+        Decide whether a frame goes on to inference
+        
+        Args:
+            frame: BGR or greyscale frame; pass a thumbnail when one is at
+                hand, larger frames are downscaled here
+                
+        Returns:
+            True if the frame showed motion or the keep-alive is due
+        """
+        now = time.monotonic()
+        self.last_motion = self.measure(frame)
+        
+        if self.last_motion >= self.threshold:
+            result = 'hit'
+            self.hits += 1
+        elif self.keepalive > 0 and now - self._last_pass >= self.keepalive:
+            result = 'keepalive'
+            self.keepalives += 1
+        else:
+            self.misses += 1
+            self._metrics['miss'].inc()
+            return False
+            
+        self._last_pass = now
+        self._metrics[result].inc()
+        return True
+        
+    def measure(self, frame: np.ndarray) -> float:
+        """
+        Update the background and get the moving-pixel fraction
+        
+        Returns:
+            Largest fraction over the zones (or the whole frame); 1.0 for
+            the first frame or after a resolution change
+        """
+        gray = self._prepare(frame)
+        if self._background is None or self._background.shape != gray.shape:
+            self._background = gray
+            self._masks = [self._zone_mask(zone, gray.shape) for zone in self.zones]
+            return 1.0
+            
+        moving = cv2.absdiff(gray, self._background) > self.pixel_threshold
+        cv2.accumulateWeighted(gray, self._background, self.learning_rate)
+        
+        if not self._masks:
+            return float(moving.mean())
+        return max(
+            float(moving[mask].mean()) if mask.any() else 0.0
+            for mask in self._masks
+        )
+        
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        """Thumbnail-sized, blurred, float greyscale"""
+        size = PYRAMID_LEVELS['thumbnail']
+        height, width = frame.shape[:2]
+        scale = size / max(height, width)
+        if scale < 1.0:
+            frame = cv2.resize(
+                frame,
+                (max(1, round(width * scale)), max(1, round(height * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(frame, (5, 5), 0).astype(np.float32)
+        
+    @staticmethod
+    def _zone_mask(zone: List[List[float]], shape: Tuple[int, int]) -> np.ndarray:
+        height, width = shape
+        points = np.array(
+            [[round(x * (width - 1)), round(y * (height - 1))] for x, y in zone],
+            dtype=np.int32
+        )
+        mask = np.zeros(shape, dtype=np.uint8)
+        cv2.fillPoly(mask, [points], 1)
+        return mask.astype(bool)
+        
+    def reset(self):
+        """Forget the background (e.g. after the camera moved)"""
+        self._background = None
+        
+    def get_stats(self) -> dict:
+        checked = self.hits + self.misses + self.keepalives
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'keepalives': self.keepalives,
+            'hit_rate': round(self.hits / checked, 3) if checked else 0.0,
+            'last_motion': round(self.last_motion, 4)
+        }
@@ -0,0 +1,210 @@
+"""
+Packet Ring
+Time-bounded ring of encoded video packets for pre-event recording
+
+The pyav decoder pushes every compressed video packet into the ring before
+decoding it. Compressed packets are a fraction of the size of decoded frames,
+so keeping several seconds per camera is cheap. Recording a clip remuxes the
+buffered pre-event packets plus the packets that arrive during the clip into
+an MP4 container without re-encoding.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+import av
+
+
+logger = logging.getLogger('overwatch.stream.packet_ring')
+
+
+class BufferedPacket:
+    """Compressed packet detached from its demuxer"""
+    
+    __slots__ = ('data', 'pts', 'dts', 'duration', 'is_keyframe', 'arrival')
+    
+    def __init__(self, packet, arrival: float):
+        self.data = bytes(packet)
+        self.pts = packet.pts
+        self.dts = packet.dts
+        self.duration = packet.duration
+        self.is_keyframe = packet.is_keyframe
+        self.arrival = arrival
+
+
+class ClipRecorder:
+    """An in-progress clip: output container plus the packets collected for it"""
+    
+    def __init__(self, path: str, output, out_stream, time_base, packets: List[BufferedPacket]):
+        self.path = path
+        self.output = output
+        self.out_stream = out_stream
+        self.time_base = time_base
+        self.packets = packets
+        
+        # Set when the camera reconnects mid-clip; later packets would not
+        # share a timeline with the ones already collected
+        self.interrupted = False
+        
+    def finish(self) -> Optional[str]:
+        """
+        Write the collected packets and close the file (blocking)
+        
+        Returns:
+            Path of the clip, or None if nothing could be written
+        """
+        written = 0
+        origin = None
+        
+        try:
+            for buffered in self.packets:
+                timestamp = buffered.dts if buffered.dts is not None else buffered.pts
+                if timestamp is None:
+                    continue
+                if origin is None:
+                    origin = timestamp
+                    
+                packet = av.Packet(buffered.data)
+                packet.pts = buffered.pts - origin if buffered.pts is not None else None
+                packet.dts = timestamp - origin
+                packet.duration = buffered.duration
+                packet.is_keyframe = buffered.is_keyframe
+                packet.time_base = self.time_base
+                packet.stream = self.out_stream
+                self.output.mux(packet)
+                written += 1
+                
+        except Exception as e:
+            logger.error(f"Failed to remux clip {self.path}: {e}")
+            
+        finally:
+            self.output.close()
+            self.packets = []
+            
+        if not written:
+            return None
+            
+        logger.info(f"Recorded {written} packets to {self.path}")
+        return self.path
+
+
+class PacketRing:
+    """Thread-safe, time-bounded ring of compressed video packets"""
+    
+    def __init__(self, max_seconds: float = 10.0):
+        self.max_seconds = max_seconds
+        self.lock = threading.Lock()
+        self.packets: deque = deque()
+        self._keyframe_times: deque = deque()
+        
+        # Video stream of the live connection, used as the codec template
+        self.template = None
+        self.time_base = None
+        
+        self._recorders: List[ClipRecorder] = []
+        
+        # Stats
+        self.bytes_buffered = 0
+        
+    def set_template(self, stream):
+        """Use the live connection's video stream as codec template (decoder thread)"""
+        with self.lock:
+            self.template = stream
+            self.time_base = stream.time_base
+            
+    def reset(self):
+        """Drop buffered packets before the connection closes (decoder thread)"""
+        with self.lock:
+            self.template = None
+            self.packets.clear()
+            self._keyframe_times.clear()
+            self.bytes_buffered = 0
+            for recorder in self._recorders:
+                recorder.interrupted = True
+            self._recorders = []
+            
+    def push(self, packet):
+        """Buffer a demuxed video packet (decoder thread)"""
+        now = time.monotonic()
+        buffered = BufferedPacket(packet, now)
+        
+        with self.lock:
+            self.packets.append(buffered)
+            if buffered.is_keyframe:
+                self._keyframe_times.append(now)
+            self.bytes_buffered += len(buffered.data)
+            for recorder in self._recorders:
+                recorder.packets.append(buffered)
+            self._trim(now)
+            
+    def _trim(self, now: float):
+        """Drop whole GOPs once the next GOP alone covers max_seconds"""
+        cutoff = now - self.max_seconds
+        packets = self.packets
+        keyframes = self._keyframe_times
+        
+        # The ring always starts at a keyframe; a leading partial GOP
+        # cannot be decoded
+        while packets and not packets[0].is_keyframe:
+            self.bytes_buffered -= len(packets.popleft().data)
+            
+        while len(keyframes) >= 2 and keyframes[1] <= cutoff:
+            keyframes.popleft()
+            self.bytes_buffered -= len(packets.popleft().data)
+            while packets and not packets[0].is_keyframe:
+                self.bytes_buffered -= len(packets.popleft().data)
+                
+    def start_clip(self, path: str, pre_buffer: float) -> Optional[ClipRecorder]:
+        """
+        Start a clip with up to pre_buffer seconds of buffered packets (blocking)
+        
+        The clip starts at the last keyframe at or before the pre-buffer
+        window. Packets pushed afterwards are collected until stop_clip().
+        
+        Returns:
+            ClipRecorder, or None if the stream is not connected
+        """
+        with self.lock:
+            if self.template is None:
+                return None
+                
+            output = av.open(path, 'w', format='mp4')
+            try:
+                out_stream = output.add_stream_from_template(self.template)
+            except AttributeError:
+                # PyAV < 14
+                out_stream = output.add_stream(template=self.template)
+                
+            # Start from the newest keyframe at or before the window start
+            window_start = time.monotonic() - pre_buffer
+            start = 0
+            for index, buffered in enumerate(self.packets):
+                if buffered.arrival > window_start:
+                    break
+                if buffered.is_keyframe:
+                    start = index
+                    
+            packets = list(self.packets)[start:]
+            recorder = ClipRecorder(path, output, out_stream, self.time_base, packets)
+            self._recorders.append(recorder)
+            return recorder
+            
+    def stop_clip(self, recorder: ClipRecorder):
+        """Stop collecting packets for a clip"""
+        with self.lock:
+            if recorder in self._recorders:
+                self._recorders.remove(recorder)
+                
+    def get_stats(self) -> dict:
+        """Get ring statistics"""
+        with self.lock:
+            span = self.packets[-1].arrival - self.packets[0].arrival if self.packets else 0.0
+            return {
+                'packets': len(self.packets),
+                'bytes': self.bytes_buffered,
+                'seconds': round(span, 2),
+                'max_seconds': self.max_seconds,
+                'recording': len(self._recorders)
+            }
@@ -5,17 +5,26 @@ Handles individual RTSP camera stream
 import asyncio
 import logging
 import time
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
-import cv2
 import numpy as np
 
+from core.config import settings
+from .audio_buffer import AudioBuffer
+from .decoder import DecodeThread, PyAVDecodeThread, get_decoder_stats
 from .frame_buffer import FrameBuffer
+from .frame_meta import FrameMeta, observe_stage
+from .frame_pyramid import FramePyramid
+from .packet_ring import PacketRing
 
 
 logger = logging.getLogger('overwatch.stream.rtsp')
 
+# Seconds to wait for a replaced decoder to exit: the capture open/read
+# timeout (30s) plus some slack
+DECODER_STOP_TIMEOUT = 35.0
+
 
 class RTSPStream:
     """RTSP stream handler"""
@@ -25,26 +34,47 @@ class RTSPStream:
         camera_id: str,
         rtsp_url: str,
         workflow_engine,
-        workflows: List[str]
+        workflows: List[str],
+        backend: Optional[str] = None
     ):
         self.camera_id = camera_id
         self.rtsp_url = rtsp_url
         self.workflow_engine = workflow_engine
         self.workflows = workflows
         
-        self.capture = None
+        # Decoder backend: 'opencv' or 'pyav' (video + audio from one connection)
+        self.backend = backend or settings.STREAM_BACKEND
+        self.configured_backend = self.backend
+        
+        self.decoder: Optional[DecodeThread] = None
+        self.target_fps: Optional[float] = None
+        self.keyframe_only = False
+        self._backend_task = None
+        # Serializes decoder replacement (backend change, stream switch)
+        self._decoder_lock = asyncio.Lock()
+        # Replaced decoders that did not exit in time
+        self._stuck_decoders: List[DecodeThread] = []
         self.running = False
         self.task = None
         
         # Frame buffer for smooth playback
-        self.frame_buffer = FrameBuffer(max_size=5)
+        self.frame_buffer = FrameBuffer(max_size=5, camera_id=camera_id)
+        
+        # Audio demuxed from the same connection (pyav backend only)
+        self.audio_buffer: Optional[AudioBuffer] = None
+        self._audio_config: Tuple[int, int] = (16000, 1)
+        self._audio_consumers = 0
+        
+        # Compressed packets for pre-event recording (pyav backend only)
+        self.packet_ring: Optional[PacketRing] = None
         
         # Stats
-        self.fps = 0.0
         self.frame_count = 0
+        self.frames_superseded = 0
+        self.stream_switches = 0
         self.last_frame_time = None
         self.start_time = None
-        self.error_count = 0
+        self._dispatched_seq = 0
         
     async def start(self):
         """Start the stream"""
@@ -54,6 +84,12 @@ class RTSPStream:
             
         self.running = True
         self.start_time = time.time()
+        
+        # Blocking capture I/O lives on a dedicated thread per camera
+        self.decoder = self._create_decoder()
+        self._attach_outputs(self.decoder)
+        self.decoder.start()
+        
         self.task = asyncio.create_task(self._stream_loop())
         logger.info(f"Stream {self.camera_id} started")
         
@@ -71,138 +107,399 @@ class RTSPStream:
             except asyncio.CancelledError:
                 pass
                 
-        if self.capture:
-            self.capture.release()
-            self.capture = None
+        if self.decoder:
+            # Joining may block on a pending read, keep it off the loop
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self.decoder.stop)
+            
+        # Drop frames still waiting for workflows
+        if self.workflow_engine:
+            await self.workflow_engine.release_camera(self.camera_id)
             
         logger.info(f"Stream {self.camera_id} stopped")
         
-    async def _stream_loop(self):
-        """Main stream processing loop"""
-        reconnect_delay = 3  # Faster reconnection
-        max_reconnect_delay = 30
-        consecutive_failures = 0
+    def _create_decoder(self, rtsp_url: Optional[str] = None) -> DecodeThread:
+        """Create a decoder thread for the configured backend"""
+        rtsp_url = rtsp_url or self.rtsp_url
+        if self.backend == 'pyav':
+            decoder = PyAVDecodeThread(self.camera_id, rtsp_url, self.frame_buffer)
+            decoder.set_keyframe_only(self.keyframe_only)
+        else:
+            decoder = DecodeThread(self.camera_id, rtsp_url, self.frame_buffer)
+            
+        decoder.set_target_fps(self.target_fps)
+        return decoder
+        
+    def _attach_outputs(self, decoder: DecodeThread):
+        """Route audio and packets to a decoder that owns the connection"""
+        if isinstance(decoder, PyAVDecodeThread):
+            if self.audio_buffer is not None:
+                decoder.attach_audio(self.audio_buffer, *self._audio_config)
+            decoder.packet_ring = self.packet_ring
+            
+    async def _restart_decoder(self):
+        """Replace the decoder thread after a backend change (caller holds _decoder_lock)"""
+        old_decoder = self.decoder
+        self.decoder = self._create_decoder()
+        self._attach_outputs(self.decoder)
         
-        while self.running:
+        # Only one thread may write into the frame buffer at a time
+        await self._stop_replaced_decoder(old_decoder)
+        self.decoder.start()
+        
+    async def _stop_replaced_decoder(self, decoder: DecodeThread):
+        """
+        Stop a decoder that is handing the frame buffer to its replacement
+        
+        A decoder stuck opening or reading a dead camera is given up on after
+        DECODER_STOP_TIMEOUT instead of blocking every later switch; the
+        stream reports unhealthy until that thread is gone.
+        """
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, decoder.stop, DECODER_STOP_TIMEOUT)
+        if decoder.is_alive():
+            logger.error(
+                f"Decoder for {self.camera_id} did not exit within {DECODER_STOP_TIMEOUT}s, "
+                f"starting its replacement anyway"
+            )
+            self._stuck_decoders.append(decoder)
+            
+    @property
+    def healthy(self) -> bool:
+        """False while a replaced decoder thread is still blocked"""
+        self._stuck_decoders = [d for d in self._stuck_decoders if d.is_alive()]
+        return not self._stuck_decoders
+            
+    async def switch_url(self, rtsp_url: str, timeout: float = 10.0) -> bool:
+        """
+        Move the camera to another stream URL without a gap in frames
+        
+        The new connection is opened in standby next to the current one and
+        only takes over the frame buffer once it is decoding; if it does not
+        deliver a frame within timeout the current stream is kept.
+        
+        Args:
+            rtsp_url: URL of the stream to switch to
+            timeout: Seconds to wait for the new stream's first frame
+            
+        Returns:
+            True if the stream now uses rtsp_url
+        """
+        async with self._decoder_lock:
+            if rtsp_url == self.rtsp_url:
+                return True
+            if not self.running:
+                self.rtsp_url = rtsp_url
+                return True
+                
+            old_decoder = self.decoder
+            new_decoder = self._create_decoder(rtsp_url)
+            new_decoder.standby = True
+            # Consumers waiting on either decoder are woken by both
+            new_decoder.notifier = old_decoder.notifier
+            new_decoder.start()
+            
+            loop = asyncio.get_event_loop()
+            promoted = False
             try:
-                await self._connect()
-                await self._process_frames()
+                deadline = loop.time() + timeout
+                while not new_decoder.ready.is_set() and self.running and loop.time() < deadline:
+                    await asyncio.sleep(0.05)
+                    
+                if not new_decoder.ready.is_set() or not self.running:
+                    logger.warning(f"Stream {self.camera_id} could not switch to {rtsp_url}, keeping current stream")
+                    return False
+                    
+                # Hand over: new frames keep coming from the standby decoder
+                # as soon as the old writer has let go of the buffer
+                self.decoder = new_decoder
+                promoted = True
+                await self._stop_replaced_decoder(old_decoder)
+                self._attach_outputs(new_decoder)
+                new_decoder.promote()
                 
-                # Reset delay on successful connection
-                reconnect_delay = 3
-                consecutive_failures = 0
+                self.rtsp_url = rtsp_url
+                self.stream_switches += 1
+                logger.info(f"Stream {self.camera_id} switched to {rtsp_url}")
+                return True
+            finally:
+                if not promoted:
+                    # Also when cancelled (stream stopping): never leave the
+                    # standby connection running
+                    await asyncio.shield(loop.run_in_executor(None, new_decoder.stop))
+        
+    async def _use_pyav(self, reason: str) -> bool:
+        """
+        Switch to the pyav backend if not already using it
+        
+        The need is checked again once the decoder lock is held, so a
+        request that was withdrawn while waiting (e.g. keyframe-only
+        decoding turned off again) does not switch the camera.
+        
+        Returns:
+            True if the decoder was replaced
+        """
+        async with self._decoder_lock:
+            if self.backend == 'pyav' or not self._needs_pyav:
+                return False
                 
-            except Exception as e:
-                self.error_count += 1
-                consecutive_failures += 1
+            logger.info(f"Switching {self.camera_id} to pyav backend for {reason}")
+            self.backend = 'pyav'
+            if self.running:
+                await self._restart_decoder()
+            return True
+        
+    @property
+    def _needs_pyav(self) -> bool:
+        return self.keyframe_only or self.audio_buffer is not None or self.packet_ring is not None
+        
+    async def _restore_backend(self):
+        """Go back to the configured backend once no feature needs pyav"""
+        async with self._decoder_lock:
+            if self._needs_pyav or self.backend == self.configured_backend:
+                return
                 
-                logger.error(
-                    f"Stream {self.camera_id} error (attempt {consecutive_failures}): {e}"
-                )
+            logger.info(f"Switching {self.camera_id} back to {self.configured_backend} backend")
+            self.backend = self.configured_backend
+            if self.running:
+                await self._restart_decoder()
                 
-                if self.capture:
-                    self.capture.release()
-                    self.capture = None
-                    
-                if self.running:
-                    # Exponential backoff for reconnection
-                    current_delay = min(reconnect_delay * consecutive_failures, max_reconnect_delay)
-                    logger.info(
-                        f"Reconnecting {self.camera_id} in {current_delay}s..."
-                    )
-                    await asyncio.sleep(current_delay)
-                    
-    async def _connect(self):
-        """Connect to RTSP stream"""
-        logger.info(f"Connecting to {self.camera_id}...")
+    def _schedule_backend_change(self, change):
+        """
+        Run a backend change coroutine function in the background
         
-        # Run in executor to avoid blocking
-        loop = asyncio.get_event_loop()
+        Changes run in the order they were requested: each waits for the
+        one scheduled before it instead of cancelling it halfway through a
+        decoder swap.
+        """
+        previous = self._backend_task
         
-        # Create capture with better settings for reliability
-        def create_capture():
-            cap = cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
+        async def run():
+            if previous is not None and not previous.done():
+                await asyncio.wait({previous})
+            await change()
             
-            # Configure for better stability
-            # Higher buffer for high-res streams, lower for low-res
-            buffer_size = 3 if '1920' in self.rtsp_url or 'high' in self.rtsp_url.lower() else 1
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
-            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'H264'))
+        self._backend_task = asyncio.ensure_future(run())
+        self._backend_task.add_done_callback(self._backend_change_done)
+        
+    def _backend_change_done(self, task: asyncio.Future):
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(
+                f"Backend change for {self.camera_id} failed: {error}",
+                exc_info=error
+            )
             
-            # Set RTSP transport to TCP for reliability with secure streams
-            cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 30000)  # 30 second timeout
-            cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 30000)
+    async def enable_audio(self, sample_rate: int = 16000, channels: int = 1) -> AudioBuffer:
+        """
+        Demux the camera's audio track alongside video
+        
+        Switches the stream to the pyav backend if needed, so audio shares the
+        video connection and clock instead of opening a second session.
+        
+        Args:
+            sample_rate: Target sample rate in Hz
+            channels: Number of audio channels (1=mono, 2=stereo)
             
-            return cap
+        Returns:
+            AudioBuffer receiving the camera's audio
+        """
+        if self.audio_buffer is None:
+            self.audio_buffer = AudioBuffer(max_duration_seconds=60.0)
+            self._audio_config = (sample_rate, channels)
+        elif self._audio_config != (sample_rate, channels):
+            logger.warning(
+                f"Audio for {self.camera_id} already decoded at {self._audio_config}, "
+                f"ignoring request for {(sample_rate, channels)}"
+            )
+        self._audio_consumers += 1
         
-        self.capture = await loop.run_in_executor(None, create_capture)
+        if not await self._use_pyav('audio') and isinstance(self.decoder, PyAVDecodeThread):
+            self.decoder.attach_audio(self.audio_buffer, *self._audio_config)
+            
+        return self.audio_buffer
         
-        if not self.capture.isOpened():
-            raise ConnectionError(f"Failed to open stream: {self.rtsp_url}")
+    def release_audio(self):
+        """Release an audio consumer registered with enable_audio()"""
+        self._audio_consumers = max(0, self._audio_consumers - 1)
+        if self._audio_consumers:
+            return
+            
+        self.audio_buffer = None
+        if isinstance(self.decoder, PyAVDecodeThread):
+            self.decoder.detach_audio()
             
-        # Get stream properties
-        fps = self.capture.get(cv2.CAP_PROP_FPS)
-        width = int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        # The camera may have been moved to pyav only for audio
+        if self.backend != self.configured_backend:
+            if self.running:
+                self._schedule_backend_change(self._restore_backend)
+            elif not self._needs_pyav:
+                self.backend = self.configured_backend
+            
+    async def enable_packet_ring(self, seconds: float):
+        """
+        Keep at least seconds of compressed video for pre-event recording
         
-        logger.info(
-            f"Connected to {self.camera_id}: "
-            f"{width}x{height} @ {fps}fps"
-        )
+        Switches the stream to the pyav backend if needed.
+        """
+        if self.packet_ring is None:
+            self.packet_ring = PacketRing(max_seconds=seconds)
+        else:
+            self.packet_ring.max_seconds = max(self.packet_ring.max_seconds, seconds)
+            
+        if not await self._use_pyav('pre-event recording') and isinstance(self.decoder, PyAVDecodeThread):
+            self.decoder.packet_ring = self.packet_ring
+            
+    async def record_clip(
+        self,
+        path: str,
+        pre_buffer: float = 5.0,
+        duration: float = 30.0,
+        timeout: float = 10.0
+    ) -> Optional[str]:
+        """
+        Record a clip by remuxing buffered and live packets (no re-encode)
         
-    async def _process_frames(self):
-        """Process frames from stream"""
+        Args:
+            path: Output MP4 path
+            pre_buffer: Seconds before now to include
+            duration: Seconds after now to include
+            timeout: Seconds to wait for the first packet if none is buffered
+            
+        Returns:
+            Path of the clip, or None if the stream could not be recorded
+        """
+        if self.packet_ring is None:
+            # First recording on this stream: nothing buffered yet
+            await self.enable_packet_ring(pre_buffer)
+            
         loop = asyncio.get_event_loop()
-        frame_time_start = time.time()
-        frames_processed = 0
-        consecutive_failures = 0
-        max_consecutive_failures = 30  # Allow 30 failed reads before reconnecting
-        
-        while self.running and self.capture and self.capture.isOpened():
-            # Read frame in executor
-            ret, frame = await loop.run_in_executor(
-                None,
-                self.capture.read
-            )
+        packet_ring = self.packet_ring
+        
+        # The ring only gets its codec template once the (possibly just
+        # restarted) pyav decoder pushes its first packet
+        deadline = loop.time() + timeout
+        while packet_ring.template is None and self.running and loop.time() < deadline:
+            await asyncio.sleep(0.05)
             
-            if not ret or frame is None:
-                consecutive_failures += 1
-                
-                if consecutive_failures >= max_consecutive_failures:
-                    logger.warning(
-                        f"Failed to read {consecutive_failures} frames from {self.camera_id}, reconnecting..."
-                    )
-                    break
-                    
-                # Small delay before retry
-                await asyncio.sleep(0.1)
+        recorder = await loop.run_in_executor(None, packet_ring.start_clip, path, pre_buffer)
+        if recorder is None:
+            logger.warning(f"Cannot record {self.camera_id}: stream not connected")
+            return None
+            
+        try:
+            await asyncio.sleep(duration)
+        except asyncio.CancelledError:
+            # Keep what was recorded so far
+            packet_ring.stop_clip(recorder)
+            await asyncio.shield(loop.run_in_executor(None, recorder.finish))
+            raise
+        packet_ring.stop_clip(recorder)
+        
+        if recorder.interrupted:
+            logger.warning(f"Recording of {self.camera_id} cut short by reconnect")
+        return await loop.run_in_executor(None, recorder.finish)
+        
+    @property
+    def recording(self) -> bool:
+        """True while a clip is being collected from the packet ring"""
+        return self.packet_ring is not None and self.packet_ring.get_stats()['recording'] > 0
+        
+    @property
+    def has_audio(self) -> bool:
+        return isinstance(self.decoder, PyAVDecodeThread) and self.decoder.has_audio
+        
+    def set_target_fps(self, fps: Optional[float]):
+        """
+        Limit decoding to the rate consumers need
+        
+        Frames beyond the target are grabbed but never decoded.
+        
+        Args:
+            fps: Maximum frames per second to decode, None to decode all
+        """
+        self.target_fps = fps
+        if self.decoder:
+            self.decoder.set_target_fps(fps)
+            
+    def set_keyframe_only(self, enabled: bool):
+        """
+        Decode only keyframes (pyav backend)
+        
+        Used when every consumer needs at most a frame every second or so;
+        switches the stream to the pyav backend if needed, and back to the
+        configured backend once full decoding is wanted again.
+        """
+        if enabled == self.keyframe_only:
+            return
+        self.keyframe_only = enabled
+        
+        if isinstance(self.decoder, PyAVDecodeThread):
+            self.decoder.set_keyframe_only(enabled)
+            
+        if enabled and self.backend != 'pyav':
+            if self.running:
+                self._schedule_backend_change(lambda: self._use_pyav('keyframe-only decoding'))
+            else:
+                self.backend = 'pyav'
+        elif not enabled and self.backend != self.configured_backend:
+            # Full decoding works on any backend
+            if self.running:
+                self._schedule_backend_change(self._restore_backend)
+            elif not self._needs_pyav:
+                self.backend = self.configured_backend
+            
+    @property
+    def fps(self) -> float:
+        return self.decoder.fps if self.decoder else 0.0
+        
+    @property
+    def error_count(self) -> int:
+        return self.decoder.error_count if self.decoder else 0
+        
+    async def wait_for_frame(
+        self,
+        after_seq: int = 0,
+        timeout: Optional[float] = None
+    ) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Wait for a frame newer than after_seq
+        
+        Returns:
+            (sequence, read-only frame view), or (after_seq, None) on timeout
+        """
+        if not self.decoder:
+            return after_seq, None
+        return await self.decoder.wait_for_frame(after_seq, timeout)
+        
+    async def _stream_loop(self):
+        """Dispatch newly decoded frames to workflows"""
+        while self.running and not self.decoder.stopped:
+            seq, frame = await self.wait_for_frame(self._dispatched_seq, timeout=1.0)
+            if frame is None:
                 continue
                 
-            # Reset failure counter on successful read
-            consecutive_failures = 0
-                
+            # Frames decoded while the previous dispatch was running are
+            # superseded by the latest one
+            if self._dispatched_seq:
+                self.frames_superseded += seq - self._dispatched_seq - 1
+            self._dispatched_seq = seq
+            
             self.frame_count += 1
-            frames_processed += 1
             self.last_frame_time = datetime.now()
             
-            # Store frame in buffer
-            self.frame_buffer.put(frame)
-            
-            # Calculate FPS
-            if frames_processed % 30 == 0:
-                elapsed = time.time() - frame_time_start
-                self.fps = frames_processed / elapsed
-                frames_processed = 0
-                frame_time_start = time.time()
-                
             # Process frame through workflows
             if self.workflows:
-                await self._process_frame(frame)
+                meta = self.frame_buffer.get_meta(seq)
+                observe_stage(meta, 'dispatch')
+                await self._process_frame(frame, meta)
                 
-            # Small delay to prevent tight loop
-            await asyncio.sleep(0.001)
+            # Release the view so its slot can be reused
+            frame = None
             
-    async def _process_frame(self, frame: np.ndarray):
+    async def _process_frame(self, frame: np.ndarray, meta: Optional[FrameMeta] = None):
         """Process frame through workflows"""
         try:
             for workflow_id in self.workflows:
@@ -210,7 +507,8 @@ class RTSPStream:
                     camera_id=self.camera_id,
                     workflow_id=workflow_id,
                     frame=frame,
-                    timestamp=self.last_frame_time
+                    timestamp=self.last_frame_time,
+                    frame_meta=meta
                 )
         except Exception as e:
             logger.error(
@@ -226,16 +524,41 @@ class RTSPStream:
             
         return {
             'running': self.running,
+            'healthy': self.healthy,
             'fps': round(self.fps, 2),
             'frame_count': self.frame_count,
             'uptime': uptime,
             'last_frame': self.last_frame_time.isoformat() if self.last_frame_time else None,
             'error_count': self.error_count,
             'workflows': self.workflows,
-            'buffer_size': self.frame_buffer.size()
+            'buffer_size': self.frame_buffer.size(),
+            'backend': self.backend,
+            'has_audio': self.has_audio,
+            'stream_switches': self.stream_switches,
+            'decoder': self._decoder_status(),
+            'dispatch': self.workflow_engine.get_mailbox_stats(self.camera_id) if self.workflow_engine else {}
         }
         
-    def get_latest_frame(self) -> Optional[np.ndarray]:
-        """Get the most recent frame from buffer"""
-        return self.frame_buffer.get_latest()
+    def _decoder_status(self) -> dict:
+        """Decoder thread and queue depth statistics"""
+        status = self.decoder.get_status() if self.decoder else {'alive': False}
+        
+        # Frames decoded but not yet dispatched to workflows
+        status['queue_depth'] = max(0, self.frame_buffer.sequence - self._dispatched_seq)
+        status['frames_superseded'] = self.frames_superseded
+        status['process_threads'] = get_decoder_stats()
+        return status
+        
+    def get_latest_frame(self, writable: bool = False) -> Optional[np.ndarray]:
+        """
+        Get the most recent frame from buffer
+        
+        Returns a read-only view shared with other consumers; pass
+        writable=True to get a private copy that may be drawn on.
+        """
+        return self.frame_buffer.get_latest(writable=writable)
+        
+    def get_latest_pyramid(self) -> Optional[FramePyramid]:
+        """Get the shared resolution pyramid of the most recent frame"""
+        return self.frame_buffer.get_latest_pyramid()
 
@@ -0,0 +1,211 @@
+"""
+Shared Memory Frame Ring
+Fixed-size ring of frame slots in multiprocessing.shared_memory
+
+Used to hand decoded frames from ingest worker processes to the main process
+without pickling. One process writes, any number of processes read. Each slot
+is guarded by a sequence lock: the writer stamps the slot's begin sequence
+before copying pixels and its end sequence afterwards, and a reader only keeps
+a copy whose begin and end stamps match.
+"""
+import logging
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger('overwatch.stream.shm_ring')
+
+
+# Header: latest_seq, num_slots, slot_bytes, reserved
+HEADER_FIELDS = 4
+# Per slot: seq_begin, seq_end, height, width, channels, pts (us, -1 = none),
+# ingest time (time.monotonic() in ns; CLOCK_MONOTONIC is system-wide)
+SLOT_FIELDS = 7
+# Pixel data alignment
+ALIGN = 64
+
+
+def _align(size: int) -> int:
+    return (size + ALIGN - 1) // ALIGN * ALIGN
+
+
+class SharedFrameRing:
+    """Single-writer, multi-reader ring of uint8 frames in shared memory"""
+    
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool = False):
+        self.shm = shm
+        self.owner = owner
+        
+        self._header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        self.num_slots = int(self._header[1])
+        self.slot_bytes = int(self._header[2])
+        
+        self._slots_meta = np.ndarray(
+            (self.num_slots, SLOT_FIELDS),
+            dtype=np.int64,
+            buffer=shm.buf,
+            offset=HEADER_FIELDS * 8
+        )
+        self._data_offset = _align((HEADER_FIELDS + self.num_slots * SLOT_FIELDS) * 8)
+        self._data = np.ndarray(
+            (self.num_slots, self.slot_bytes),
+            dtype=np.uint8,
+            buffer=shm.buf,
+            offset=self._data_offset
+        )
+        
+        # Stats (local to this process)
+        self.frames_written = 0
+        self.torn_reads = 0
+        
+    @classmethod
+    def create(cls, num_slots: int, slot_bytes: int, name: Optional[str] = None) -> 'SharedFrameRing':
+        """
+        Allocate a new ring
+        
+        Args:
+            num_slots: Number of frame slots (at least 2)
+            slot_bytes: Maximum bytes per frame (height * width * channels)
+            name: Optional shared memory name
+        """
+        num_slots = max(2, num_slots)
+        slot_bytes = _align(slot_bytes)
+        header_bytes = _align((HEADER_FIELDS + num_slots * SLOT_FIELDS) * 8)
+        
+        shm = shared_memory.SharedMemory(
+            name=name, create=True, size=header_bytes + num_slots * slot_bytes
+        )
+        header = np.ndarray((HEADER_FIELDS + num_slots * SLOT_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[1] = num_slots
+        header[2] = slot_bytes
+        del header
+        
+        return cls(shm, owner=True)
+        
+    @classmethod
+    def attach(cls, name: str) -> 'SharedFrameRing':
+        """Attach to a ring created by another process"""
+        return cls(shared_memory.SharedMemory(name=name))
+        
+    @property
+    def name(self) -> str:
+        return self.shm.name
+        
+    @property
+    def latest_seq(self) -> int:
+        return int(self._header[0])
+        
+    def write(
+        self,
+        frame: np.ndarray,
+        pts: Optional[float] = None,
+        ingest_time: Optional[float] = None
+    ) -> int:
+        """
+        Copy a frame into the next slot (single writer only)
+        
+        Args:
+            frame: uint8 frame
+            pts: Capture presentation time in seconds, if known
+            ingest_time: time.monotonic() when the frame was ingested
+            
+        Returns:
+            Sequence number assigned to the frame
+        """
+        if frame.dtype != np.uint8:
+            raise ValueError(f"Only uint8 frames are supported, got {frame.dtype}")
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes exceeds slot size {self.slot_bytes}")
+            
+        seq = int(self._header[0]) + 1
+        meta = self._slots_meta[seq % self.num_slots]
+        
+        # Readers that see begin != end discard the copy
+        meta[0] = seq
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 0
+        self._data[seq % self.num_slots, :frame.nbytes].reshape(frame.shape)[...] = frame
+        meta[2] = height
+        meta[3] = width
+        meta[4] = channels
+        meta[5] = int(pts * 1e6) if pts is not None else -1
+        meta[6] = int((ingest_time if ingest_time is not None else time.monotonic()) * 1e9)
+        meta[1] = seq
+        
+        self._header[0] = seq
+        self.frames_written += 1
+        return seq
+        
+    def read_latest(self, retries: int = 3) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Copy out the most recent frame
+        
+        Returns:
+            (sequence, private frame copy), or (0, None) if no consistent
+            frame could be read
+        """
+        for _ in range(retries):
+            seq = int(self._header[0])
+            if not seq:
+                return 0, None
+                
+            frame = self.read(seq)
+            if frame is not None:
+                return seq, frame
+                
+        return 0, None
+        
+    def read(self, seq: int) -> Optional[np.ndarray]:
+        """Copy out frame seq if it is still in the ring and not torn"""
+        meta = self._slots_meta[seq % self.num_slots]
+        if int(meta[1]) != seq:
+            return None
+            
+        height, width, channels = (int(v) for v in meta[2:5])
+        shape = (height, width, channels) if channels else (height, width)
+        nbytes = height * width * max(channels, 1)
+        frame = self._data[seq % self.num_slots, :nbytes].reshape(shape).copy()
+        
+        # Slot was rewritten while copying
+        if int(meta[0]) != seq or int(meta[1]) != seq:
+            self.torn_reads += 1
+            return None
+            
+        return frame
+        
+    def read_times(self, seq: int) -> Optional[Tuple[Optional[float], float]]:
+        """Get (pts, ingest_time) of frame seq if it is still in the ring"""
+        meta = self._slots_meta[seq % self.num_slots]
+        pts_us, ingest_ns = int(meta[5]), int(meta[6])
+        if int(meta[0]) != seq or int(meta[1]) != seq:
+            return None
+        return (pts_us / 1e6 if pts_us >= 0 else None), ingest_ns / 1e9
+        
+    def close(self):
+        """Detach from the ring (and free it if this process created it)"""
+        # Drop numpy views before closing the mapping
+        self._header = self._slots_meta = self._data = None
+        try:
+            self.shm.close()
+        except BufferError as e:
+            logger.debug(f"Shared ring {self.shm.name} still referenced: {e}")
+            
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            
+    def get_stats(self) -> dict:
+        """Get ring statistics"""
+        return {
+            'name': self.name,
+            'slots': self.num_slots,
+            'slot_bytes': self.slot_bytes,
+            'latest_seq': self.latest_seq if self._header is not None else 0,
+            'torn_reads': self.torn_reads
+        }
@@ -0,0 +1,268 @@
+"""
+Workflow Benchmark
+Replays local video files through a saved visual workflow, headless
+
+    python -m workflows.bench workflow.json --video clip.mp4 --fps 0 --duration 60
+
+Runs the workflow's nodes and edges in a RealtimeWorkflowExecutor with every
+input node replaced by a video file input, so no camera, UI or WebSocket
+client is needed. Outputs are counted and discarded. When the run ends, a
+JSON report goes to stdout (or --output). It has per-node throughput,
+p50/p95/p99 latency and dropped frames, which makes results comparable
+across upgrades.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import sys
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from workflows.event_bus import get_event_bus
+from workflows.realtime_executor import RealtimeWorkflowExecutor
+
+
+logger = logging.getLogger('overwatch.workflows.bench')
+
+
+INPUT_TYPES = ('camera', 'videoInput', 'youtube')
+
+
+class NodeStats:
+    """Call latencies and frame counts of one node"""
+    
+    def __init__(self, node_type: str):
+        self.node_type = node_type
+        self.latencies: List[float] = []
+        self.frames_in = 0
+        self.dropped = 0
+        
+    def record(self, seconds: float):
+        self.latencies.append(seconds)
+        
+    def summary(self, elapsed: float) -> dict:
+        frames = len(self.latencies)
+        latency = None
+        if frames:
+            p50, p95, p99 = np.percentile(self.latencies, [50, 95, 99]) * 1000
+            latency = {
+                'p50': round(float(p50), 2),
+                'p95': round(float(p95), 2),
+                'p99': round(float(p99), 2),
+                'max': round(max(self.latencies) * 1000, 2)
+            }
+        return {
+            'type': self.node_type,
+            'frames': frames,
+            'throughput_fps': round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+            'latency_ms': latency,
+            'dropped': self.dropped
+        }
+
+
+class BenchExecutor(RealtimeWorkflowExecutor):
+    """Executor that times its nodes and sinks outputs instead of broadcasting"""
+    
+    def __init__(self, nodes: List[dict], edges: List[dict], workflow_id: str):
+        super().__init__(nodes, edges, workflow_id)
+        self.node_stats: Dict[str, NodeStats] = {}
+        self.messages: Counter = Counter()
+        
+    def _stats(self, node: dict) -> NodeStats:
+        stats = self.node_stats.get(node['id'])
+        if stats is None:
+            stats = NodeStats(node['type'])
+            self.node_stats[node['id']] = stats
+        return stats
+        
+    async def _get_frame_from_input(self, input_node: dict) -> Optional[np.ndarray]:
+        frame = await super()._get_frame_from_input(input_node)
+        if frame is not None:
+            self._stats(input_node).frames_in += 1
+        return frame
+        
+    async def _process_input_node(self, input_node: dict) -> bool:
+        stats = self._stats(input_node)
+        frames_in = stats.frames_in
+        started = time.perf_counter()
+        processed = await super()._process_input_node(input_node)
+        if processed:
+            stats.record(time.perf_counter() - started)
+        elif stats.frames_in > frames_in:
+            # Read but not passed on (e.g. skipped as similar)
+            stats.dropped += 1
+        return processed
+        
+    async def _process_through_model(self, model_node: dict, *args, **kwargs):
+        started = time.perf_counter()
+        await super()._process_through_model(model_node, *args, **kwargs)
+        self._stats(model_node).record(time.perf_counter() - started)
+        
+    async def _broadcast_to_websocket(self, data: dict):
+        self.messages[data.get('type', 'unknown')] += 1
+        
+    def report(self, elapsed: float) -> dict:
+        nodes = {node_id: stats.summary(elapsed) for node_id, stats in self.node_stats.items()}
+        
+        # Frames motion gates kept away from their models
+        for (gate_id, _), gate in self.motion_gates.items():
+            gate_stats = gate.get_stats()
+            entry = nodes.setdefault(gate_id, NodeStats('motionGate').summary(elapsed))
+            entry['frames'] += gate_stats['hits'] + gate_stats['keepalives']
+            entry['throughput_fps'] = round(entry['frames'] / elapsed, 2) if elapsed > 0 else 0.0
+            entry['dropped'] += gate_stats['misses']
+            
+        scheduler = self.scheduler.get_stats()['workflows'].get(self.workflow_id, {})
+        return {
+            'workflow_id': self.workflow_id,
+            'duration_s': round(elapsed, 2),
+            'nodes': nodes,
+            'inferences_shed': scheduler.get('shed', {}),
+            'messages': dict(self.messages)
+        }
+
+
+def load_workflow(path: str) -> dict:
+    """Read a saved visual workflow (an object with nodes and edges)"""
+    with open(path) as f:
+        workflow = json.load(f)
+    if 'workflow' in workflow and 'nodes' not in workflow:
+        # Export wrapped in an envelope
+        workflow = workflow['workflow']
+    if not isinstance(workflow.get('nodes'), list) or not isinstance(workflow.get('edges'), list):
+        raise ValueError(f"{path} has no nodes/edges lists")
+    return workflow
+
+
+def replace_inputs(nodes: List[dict], videos: Dict[str, str], fps: Optional[float]) -> List[dict]:
+    """
+    Turn every input node into a video file input
+    
+    Args:
+        videos: Input node id -> video path; '*' applies to all other inputs
+        fps: Rate for every input (0 = as fast as frames decode), None to
+            keep each node's own fps
+    """
+    nodes = copy.deepcopy(nodes)
+    for node in nodes:
+        if node['type'] not in INPUT_TYPES:
+            continue
+        path = videos.get(node['id'], videos.get('*'))
+        if not path:
+            raise ValueError(f"No video given for input node {node['id']}")
+        node['type'] = 'videoInput'
+        node.setdefault('data', {})['videoPath'] = path
+        if fps is not None:
+            node['data']['fps'] = fps
+    return nodes
+
+
+def parse_videos(values: List[str]) -> Dict[str, str]:
+    """'clip.mp4' applies to all inputs, 'node-id=clip.mp4' to one"""
+    videos = {}
+    for value in values:
+        node_id, sep, path = value.partition('=')
+        if sep:
+            videos[node_id] = path
+        else:
+            videos['*'] = value
+    return videos
+
+
+async def run_bench(
+    workflow: dict,
+    videos: Dict[str, str],
+    fps: Optional[float] = None,
+    duration: float = 30.0,
+    max_frames: Optional[int] = None,
+    adaptive: bool = False
+) -> dict:
+    """
+    Run a workflow against video files and report per-node statistics
+    
+    Args:
+        duration: Seconds to run
+        max_frames: Stop early once every input has processed this many frames
+        adaptive: Let the adaptive fps controller change input rates
+    """
+    nodes = replace_inputs(workflow['nodes'], videos, fps)
+    workflow_id = f"bench-{workflow.get('id') or uuid.uuid4().hex[:8]}"
+    inputs = [node['id'] for node in nodes if node['type'] in INPUT_TYPES]
+    
+    executor = BenchExecutor(nodes, workflow['edges'], workflow_id)
+    if not adaptive:
+        executor.fps_controller = None
+        
+    event_bus = get_event_bus()
+    await event_bus.start()
+    
+    await executor.start()
+    started = time.monotonic()
+    try:
+        while time.monotonic() - started < duration:
+            await asyncio.sleep(0.1)
+            if max_frames and all(
+                node_id in executor.node_stats and len(executor.node_stats[node_id].latencies) >= max_frames
+                for node_id in inputs
+            ):
+                break
+    finally:
+        elapsed = time.monotonic() - started
+        await executor.stop()
+        await event_bus.stop()
+        
+        from models.pool import get_model_pool
+        from stream.cpu_pool import get_cpu_pool
+        await get_model_pool().shutdown()
+        get_cpu_pool().shutdown()
+        
+    report = executor.report(elapsed)
+    report['rate'] = 'unthrottled' if fps == 0 else fps or 'per-node'
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog='python -m workflows.bench',
+        description='Replay video files through a saved visual workflow and report per-node performance'
+    )
+    parser.add_argument('workflow', help='Workflow JSON file with nodes and edges')
+    parser.add_argument(
+        '--video', action='append', required=True, metavar='[NODE=]PATH',
+        help='Video for all inputs, or NODE=PATH for one input node (repeatable)'
+    )
+    parser.add_argument('--fps', type=float, help="Input rate for every input; 0 = unthrottled (default: each node's fps)")
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run (default 30)')
+    parser.add_argument('--frames', type=int, help='Stop once every input processed this many frames')
+    parser.add_argument('--adaptive', action='store_true', help='Let the adaptive fps controller change input rates')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=args.log_level.upper(), stream=sys.stderr)
+    
+    report = asyncio.run(run_bench(
+        load_workflow(args.workflow),
+        parse_videos(args.video),
+        fps=args.fps,
+        duration=args.duration,
+        max_frames=args.frames,
+        adaptive=args.adaptive
+    ))
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Detection Reuse
+Re-emits the last detections for frames skipped as similar
+
+When an input skips frames that barely differ from the last processed one,
+its models produce nothing for them and output nodes go quiet until the scene
+changes. DetectionReuseCache keeps each (input, model) pair's last result so
+the executor can send it again, marked reused, for a limited number of
+skipped frames. Boxes can optionally follow global motion between the
+processed and the skipped frame, estimated by phase correlation of their
+thumbnails.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+ReuseKey = Tuple[str, str]
+
+
+class _ReuseEntry:
+    """One model's last detections on one input"""
+    
+    def __init__(self, detections: List[dict], thumbnail: Optional[np.ndarray]):
+        self.detections = detections
+        self.thumbnail = thumbnail
+        self.reused = 0
+
+
+class DetectionReuseCache:
+    """Last detections per (input node, model node)"""
+    
+    # Phase correlation peaks below this are too weak to trust as a shift
+    MIN_SHIFT_RESPONSE = 0.1
+    
+    def __init__(self):
+        self._entries: Dict[ReuseKey, _ReuseEntry] = {}
+        
+    def store(self, key: ReuseKey, detections: List[dict], thumbnail: Optional[np.ndarray] = None):
+        """Remember a model's detections on a processed frame"""
+        self._entries[key] = _ReuseEntry(detections, thumbnail)
+        
+    def reuse(
+        self,
+        key: ReuseKey,
+        max_frames: int,
+        thumbnail: Optional[np.ndarray] = None,
+        scale: Tuple[float, float] = (1.0, 1.0)
+    ) -> Optional[List[dict]]:
+        """
+        Get the stored detections for a skipped frame
+        
+        Args:
+            key: (input node id, model node id)
+            max_frames: Skipped frames a result may be reused for
+            thumbnail: Thumbnail of the skipped frame; boxes are shifted by
+                the motion since the processed frame when given
+            scale: (x, y) factors from thumbnail to full frame coordinates
+            
+        Returns:
+            Copies of the detections marked reused, or None if there is no
+            result or it has aged out
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry.reused >= max_frames:
+            return None
+        entry.reused += 1
+        
+        dx = dy = 0.0
+        if thumbnail is not None and entry.thumbnail is not None:
+            shift_x, shift_y = self.estimate_shift(entry.thumbnail, thumbnail)
+            dx, dy = shift_x * scale[0], shift_y * scale[1]
+            
+        reused = []
+        for detection in entry.detections:
+            detection = dict(detection, reused=True, reused_frames=entry.reused)
+            bbox = detection.get('bbox')
+            if (dx or dy) and bbox and len(bbox) == 4:
+                detection['bbox'] = [bbox[0] + dx, bbox[1] + dy, bbox[2] + dx, bbox[3] + dy]
+            reused.append(detection)
+        return reused
+        
+    @classmethod
+    def estimate_shift(cls, previous: np.ndarray, current: np.ndarray) -> Tuple[float, float]:
+        """
+        Estimate the global translation between two thumbnails
+        
+        Returns:
+            (dx, dy) in thumbnail pixels, (0, 0) if the images differ in size
+            or no clear shift was found
+        """
+        if previous.shape != current.shape:
+            return 0.0, 0.0
+        (dx, dy), response = cv2.phaseCorrelate(_gray(previous), _gray(current))
+        if response < cls.MIN_SHIFT_RESPONSE:
+            return 0.0, 0.0
+        return dx, dy
+        
+    def clear(self):
+        self._entries.clear()
+
+
+def _gray(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image.astype(np.float32)
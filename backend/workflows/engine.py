@@ -4,7 +4,7 @@ Manages AI processing workflows
 """
 import asyncio
 import logging
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 
@@ -12,6 +12,7 @@ import yaml
 import numpy as np
 
 from core.config import settings
+from stream.mailbox import LatestFrameMailbox
 from .workflow import Workflow
 
 
@@ -24,10 +25,40 @@ class WorkflowEngine:
     def __init__(self, event_manager):
         self.event_manager = event_manager
         self.workflows: Dict[str, Workflow] = {}
-        self._frame_queues: Dict[str, asyncio.Queue] = {}
         
-    async def load_workflows(self):
-        """Load workflow configurations"""
+        # (camera_id, workflow_id) -> newest frame waiting for that workflow,
+        # and the task feeding it to the workflow
+        self._mailboxes: Dict[Tuple[str, str], LatestFrameMailbox] = {}
+        self._consumers: Dict[Tuple[str, str], asyncio.Task] = {}
+        
+        # Source of camera streams for actions that need more than one frame
+        self.stream_manager = None
+        
+    def set_stream_manager(self, stream_manager):
+        """Give workflows access to camera streams (e.g. for clip recording)"""
+        self.stream_manager = stream_manager
+        for workflow in self.workflows.values():
+            workflow.stream_manager = stream_manager
+            
+    def get_record_pre_buffer(self, workflow_ids: Iterable[str]) -> float:
+        """Get the longest pre-event buffer any record action in these workflows needs"""
+        pre_buffer = 0.0
+        for workflow_id in workflow_ids:
+            workflow = self.workflows.get(workflow_id)
+            if not workflow:
+                continue
+            for action in workflow.actions:
+                if action.get('type') == 'record':
+                    pre_buffer = max(pre_buffer, float(action.get('pre_buffer', 5)))
+        return pre_buffer
+        
+    async def load_workflows(self, workflow_ids: Optional[Iterable[str]] = None):
+        """
+        Load workflow configurations
+        
+        Args:
+            workflow_ids: Only load these workflows (default: all)
+        """
         config_path = Path(settings.WORKFLOWS_CONFIG)
         
         if not config_path.exists():
@@ -45,6 +76,13 @@ class WorkflowEngine:
         workflows = config.get('workflows', {})
         logger.info(f"Loading {len(workflows)} workflows...")
         
+        if workflow_ids is not None:
+            wanted = set(workflow_ids)
+            workflows = {
+                k: v for k, v in workflows.items()
+                if k in wanted and k not in self.workflows
+            }
+            
         for workflow_id, workflow_config in workflows.items():
             try:
                 workflow = Workflow(
@@ -52,6 +90,7 @@ class WorkflowEngine:
                     config=workflow_config,
                     event_manager=self.event_manager
                 )
+                workflow.stream_manager = self.stream_manager
                 
                 if workflow_config.get('enabled', True):
                     await workflow.initialize()
@@ -68,31 +107,87 @@ class WorkflowEngine:
         camera_id: str,
         workflow_id: str,
         frame: np.ndarray,
-        timestamp: datetime
+        timestamp: datetime,
+        frame_meta=None
     ):
-        """Process a frame through a workflow"""
+        """
+        Hand a frame to a workflow
+        
+        Returns without waiting for inference. If the workflow is still busy
+        with an earlier frame from this camera, only the newest frame is kept
+        and the one it replaces is counted as a stale drop.
+        """
         if workflow_id not in self.workflows:
             logger.warning(f"Workflow {workflow_id} not found")
             return
             
-        workflow = self.workflows[workflow_id]
+        key = (camera_id, workflow_id)
+        mailbox = self._mailboxes.get(key)
+        if mailbox is None:
+            mailbox = LatestFrameMailbox(camera_id, workflow_id)
+            self._mailboxes[key] = mailbox
+            self._consumers[key] = asyncio.create_task(self._consume(key, mailbox))
+            
+        mailbox.put((frame, timestamp, frame_meta))
         
-        try:
-            await workflow.process_frame(
-                camera_id=camera_id,
-                frame=frame,
-                timestamp=timestamp
-            )
-        except Exception as e:
-            logger.error(
-                f"Error in workflow {workflow_id} for camera {camera_id}: {e}",
-                exc_info=True
-            )
+    async def _consume(self, key: Tuple[str, str], mailbox: LatestFrameMailbox):
+        """Feed a workflow the newest frame from one camera whenever it is free"""
+        camera_id, workflow_id = key
+        while True:
+            item = await mailbox.get()
+            if item is None:
+                return
+                
+            workflow = self.workflows.get(workflow_id)
+            if workflow is None:
+                continue
+                
+            frame, timestamp, frame_meta = item
+            try:
+                await workflow.process_frame(
+                    camera_id=camera_id,
+                    frame=frame,
+                    timestamp=timestamp,
+                    frame_meta=frame_meta
+                )
+            except Exception as e:
+                logger.error(
+                    f"Error in workflow {workflow_id} for camera {camera_id}: {e}",
+                    exc_info=True
+                )
+            # Release the frame so its ring slot can be reused
+            item = frame = None
             
+    async def release_camera(self, camera_id: str):
+        """Stop feeding a camera's frames to workflows (camera stopped)"""
+        for key in [k for k in self._mailboxes if k[0] == camera_id]:
+            await self._close_mailbox(key)
+            
+    async def _close_mailbox(self, key: Tuple[str, str]):
+        self._mailboxes.pop(key).close()
+        task = self._consumers.pop(key, None)
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+                
+    def get_mailbox_stats(self, camera_id: str) -> Dict[str, dict]:
+        """Per-workflow frame handoff statistics for a camera"""
+        return {
+            workflow_id: mailbox.get_stats()
+            for (cam, workflow_id), mailbox in self._mailboxes.items()
+            if cam == camera_id
+        }
+        
     async def cleanup(self):
         """Cleanup all workflows"""
         logger.info("Cleaning up workflows...")
         
+        for key in list(self._mailboxes):
+            await self._close_mailbox(key)
+            
         for workflow in self.workflows.values():
             try:
                 await workflow.cleanup()
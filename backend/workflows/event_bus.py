@@ -9,6 +9,8 @@ from datetime import datetime
 from enum import Enum
 from dataclasses import dataclass, asdict
 
+from workflows.trace import trace
+
 
 logger = logging.getLogger('overwatch.workflows.event_bus')
 
@@ -412,9 +414,8 @@ class WorkflowEventBus:
                 }
             
             # Broadcast to all connected clients
-            logger.info(f"📡 Broadcasting to WebSocket: type={ws_message.get('type')}, node_id={ws_message.get('node_id')}")
             await manager.broadcast(ws_message)
-            logger.info(f"✅ Broadcast complete")
+            trace(event.workflow_id, 'bus_broadcast', event.node_id, detail=ws_message['type'])
             
         except Exception as e:
             logger.error(f"❌ Could not broadcast to WebSocket: {e}", exc_info=True)
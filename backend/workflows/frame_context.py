@@ -0,0 +1,80 @@
+"""
+Frame Context
+One frame per input node per tick, shared by every consumer of that input
+
+Each input node of a visual workflow fetches (and decodes) one frame per tick
+and publishes it here. Models, the day/night detector and any other frame
+consumer read the published context instead of pulling frames from the input
+themselves, so a video file is not advanced once per consumer and decode and
+resize work is paid once.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from stream.frame_meta import FrameMeta
+from stream.frame_pyramid import FramePyramid
+
+
+@dataclass
+class FrameContext:
+    """An input node's frame for one tick"""
+    input_id: str
+    tick: int
+    pyramid: FramePyramid
+    created: float = field(default_factory=time.monotonic)
+    
+    @property
+    def frame(self) -> np.ndarray:
+        return self.pyramid.full
+        
+    @property
+    def meta(self) -> Optional[FrameMeta]:
+        return self.pyramid.meta
+        
+    def get(self, level: str = 'full') -> np.ndarray:
+        """Get the frame at a pyramid level (built once for all consumers)"""
+        return self.pyramid.get(level)
+        
+    def age(self) -> float:
+        """Seconds since the context was published"""
+        return time.monotonic() - self.created
+
+
+class FrameContextBoard:
+    """Latest frame context of every input node"""
+    
+    def __init__(self):
+        self._contexts: Dict[str, FrameContext] = {}
+        # (consumer id, input id) -> last tick the consumer took
+        self._taken: Dict[Tuple[str, str], int] = {}
+        
+    def publish(self, input_id: str, pyramid: FramePyramid) -> FrameContext:
+        """Publish an input node's frame for this tick"""
+        previous = self._contexts.get(input_id)
+        context = FrameContext(input_id, previous.tick + 1 if previous else 1, pyramid)
+        self._contexts[input_id] = context
+        return context
+        
+    def latest(self, input_id: str) -> Optional[FrameContext]:
+        """Get the most recent context of an input node"""
+        return self._contexts.get(input_id)
+        
+    def take_new(self, consumer_id: str, input_id: str) -> Optional[FrameContext]:
+        """
+        Get the latest context of an input if this consumer has not seen it yet
+        
+        Lets periodic consumers skip re-analysing the same frame when the
+        input has stopped producing.
+        """
+        context = self._contexts.get(input_id)
+        if context is None or self._taken.get((consumer_id, input_id)) == context.tick:
+            return None
+        self._taken[(consumer_id, input_id)] = context.tick
+        return context
+        
+    def clear(self):
+        self._contexts.clear()
+        self._taken.clear()
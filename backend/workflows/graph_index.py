@@ -0,0 +1,96 @@
+"""
+Workflow Graph Index
+Precompiled lookups over a visual workflow's nodes and edges
+
+The realtime executor asks the same questions about its graph for every frame
+(which models hang off this camera, which outputs sit downstream of this
+model). WorkflowGraph answers them from id-keyed maps and adjacency lists
+built once, and memoizes downstream searches, instead of scanning every edge
+and node per call.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+
+TypeFilter = Optional[Union[str, Iterable[str]]]
+
+
+def _type_set(types: TypeFilter) -> Optional[frozenset]:
+    if types is None:
+        return None
+    if isinstance(types, str):
+        return frozenset([types])
+    return frozenset(types)
+
+
+class WorkflowGraph:
+    """Read-only index of a workflow graph"""
+    
+    def __init__(self, nodes: List[dict], edges: List[dict]):
+        self.nodes: Dict[str, dict] = {node['id']: node for node in nodes}
+        
+        # Adjacency keeps edge order (and duplicate edges) like a scan would
+        self._forward: Dict[str, List[dict]] = {}
+        self._reverse: Dict[str, List[dict]] = {}
+        for edge in edges:
+            source = self.nodes.get(edge['source'])
+            target = self.nodes.get(edge['target'])
+            if target is not None:
+                self._forward.setdefault(edge['source'], []).append(target)
+            if source is not None:
+                self._reverse.setdefault(edge['target'], []).append(source)
+                
+        self._downstream: Dict[Tuple[str, frozenset, int], Tuple[dict, ...]] = {}
+        
+    def node(self, node_id: str) -> Optional[dict]:
+        return self.nodes.get(node_id)
+        
+    def successors(self, node_id: str, types: TypeFilter = None) -> List[dict]:
+        """Get nodes with an edge from node_id, optionally of the given types"""
+        targets = self._forward.get(node_id, [])
+        wanted = _type_set(types)
+        if wanted is None:
+            return list(targets)
+        return [node for node in targets if node['type'] in wanted]
+        
+    def predecessors(self, node_id: str, types: TypeFilter = None) -> List[dict]:
+        """Get nodes with an edge to node_id, optionally of the given types"""
+        sources = self._reverse.get(node_id, [])
+        wanted = _type_set(types)
+        if wanted is None:
+            return list(sources)
+        return [node for node in sources if node['type'] in wanted]
+        
+    def downstream(self, node_id: str, types: TypeFilter, max_depth: int = 3) -> List[dict]:
+        """
+        Find nodes of the given types reachable from node_id
+        
+        Searches depth first through intermediate nodes of any type, up to
+        max_depth edges away. Results are memoized per (node, types, depth).
+        """
+        wanted = _type_set(types) or frozenset()
+        key = (node_id, wanted, max_depth)
+        
+        found = self._downstream.get(key)
+        if found is None:
+            found = tuple(self._search(node_id, wanted, max_depth))
+            self._downstream[key] = found
+        return list(found)
+        
+    def _search(self, start_id: str, wanted: frozenset, max_depth: int) -> List[dict]:
+        found: List[dict] = []
+        found_ids = set()
+        visited = set()
+        
+        def search(node_id: str, depth: int):
+            if depth > max_depth or node_id in visited:
+                return
+            visited.add(node_id)
+            
+            for target in self._forward.get(node_id, []):
+                if target['type'] in wanted and target['id'] not in found_ids:
+                    found_ids.add(target['id'])
+                    found.append(target)
+                search(target['id'], depth + 1)
+                
+        search(start_id, 0)
+        return found
@@ -2,11 +2,13 @@
 Performance Profiling and Optimization Module
 Measures and optimizes AI model and visualization pipeline
 """
+import os
 import time
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from collections import deque
+import cv2
 import numpy as np
 
 logger = logging.getLogger('overwatch.performance')
@@ -42,7 +44,11 @@ class PerformanceProfiler:
             
         start_time = self.current_timers.pop(operation)
         duration = (time.time() - start_time) * 1000  # Convert to ms
+        self.record(operation, duration, metadata)
+        return duration
         
+    def record(self, operation: str, duration: float, metadata: Optional[Dict] = None):
+        """Record a duration (ms) timed by the caller, e.g. by concurrent tasks"""
         # Initialize deque for this operation if needed
         if operation not in self.metrics:
             self.metrics[operation] = deque(maxlen=self.max_samples)
@@ -56,8 +62,6 @@ class PerformanceProfiler:
         )
         self.metrics[operation].append(metric)
         
-        return duration
-        
     def get_stats(self, operation: str) -> Dict:
         """Get statistics for an operation"""
         if operation not in self.metrics or len(self.metrics[operation]) == 0:
@@ -153,98 +157,329 @@ class PerformanceProfiler:
 
 
 class FrameCache:
-    """Intelligent frame caching to skip redundant processing"""
+    """
+    Skips frames too similar to the last processed one
+    
+    Each frame is reduced to a small greyscale signature, written into
+    preallocated buffers and compared with integer arithmetic. A grid of
+    per-block change flags records where the frame differs from the last
+    processed one, for stages that only need to look at changed regions.
+    """
     
-    def __init__(self, similarity_threshold: float = 0.95, max_cache_size: int = 10):
+    # Signature width and height in pixels
+    SIGNATURE_SIZE = (64, 48)
+    
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        grid: Tuple[int, int] = (4, 4),
+        block_threshold: float = 0.05
+    ):
+        """
+        Args:
+            similarity_threshold: Frames at least this similar (0-1) are skipped
+            grid: Columns and rows of change blocks; must divide SIGNATURE_SIZE
+            block_threshold: Mean absolute difference (0-1) for a block to
+                count as changed
+        """
+        width, height = self.SIGNATURE_SIZE
+        columns, rows = grid
+        if width % columns or height % rows:
+            raise ValueError(f"Grid {grid} does not divide signature size {self.SIGNATURE_SIZE}")
+            
         self.similarity_threshold = similarity_threshold
-        self.max_cache_size = max_cache_size
-        self.cache: deque = deque(maxlen=max_cache_size)
-        self.last_hash = None
+        self.grid = grid
+        self.block_threshold = block_threshold
         
-    def compute_hash(self, frame: np.ndarray) -> int:
-        """Compute fast perceptual hash of frame"""
-        # Downsample frame for fast comparison
-        small = frame[::8, ::8]
-        return hash(small.tobytes())
+        self._signature = np.empty((height, width), dtype=np.uint8)
+        self._reference = np.empty((height, width), dtype=np.uint8)
+        self._diff = np.empty((height, width), dtype=np.uint8)
+        self._color = np.empty((height, width, 3), dtype=np.uint8)
+        self._has_reference = False
+        
+        # Sum of absolute differences above which a block counts as changed
+        self._block_limit = block_threshold * 255 * (width // columns) * (height // rows)
+        
+        # Blocks that differ from the last processed frame, as of the last check
+        self.changed_grid = np.ones((rows, columns), dtype=bool)
+        self.last_similarity = 0.0
+        
+    def _compute_signature(self, image: np.ndarray, out: np.ndarray):
+        """Downscale to SIGNATURE_SIZE greyscale into out"""
+        if image.ndim == 3:
+            cv2.resize(image, self.SIGNATURE_SIZE, dst=self._color, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(self._color, cv2.COLOR_BGR2GRAY, dst=out)
+        else:
+            cv2.resize(image, self.SIGNATURE_SIZE, dst=out, interpolation=cv2.INTER_AREA)
+            
+    def _compare(self, signature: np.ndarray, reference: np.ndarray) -> float:
+        """Similarity (0-1) of two signatures; updates changed_grid"""
+        cv2.absdiff(signature, reference, dst=self._diff)
+        columns, rows = self.grid
+        height, width = self._diff.shape
+        blocks = self._diff.reshape(rows, height // rows, columns, width // columns).sum(
+            axis=(1, 3), dtype=np.uint32
+        )
+        np.greater(blocks, self._block_limit, out=self.changed_grid)
+        return 1.0 - int(blocks.sum()) / (255 * self._diff.size)
         
     def compute_similarity(self, frame1: np.ndarray, frame2: np.ndarray) -> float:
         """Compute similarity between frames (0-1)"""
-        # Downsample for speed
-        small1 = frame1[::4, ::4].astype(np.float32)
-        small2 = frame2[::4, ::4].astype(np.float32)
+        first = np.empty_like(self._signature)
+        second = np.empty_like(self._signature)
+        self._compute_signature(frame1, first)
+        self._compute_signature(frame2, second)
+        return self._compare(first, second)
         
-        # Normalized cross-correlation
-        diff = np.abs(small1 - small2)
-        max_diff = 255.0
-        similarity = 1.0 - (np.mean(diff) / max_diff)
+    def should_process(self, frame: np.ndarray, pyramid=None) -> bool:
+        """
+        Determine if frame should be processed
         
-        return similarity
+        Args:
+            frame: Full frame
+            pyramid: Optional FramePyramid of frame; its shared thumbnail is
+                downscaled instead of the full frame
+        """
+        image = pyramid.get('thumbnail') if pyramid is not None else frame
+        self._compute_signature(image, self._signature)
         
-    def should_process(self, frame: np.ndarray) -> bool:
-        """Determine if frame should be processed"""
-        if len(self.cache) == 0:
-            self.cache.append(frame.copy())
+        if not self._has_reference:
+            self._has_reference = True
+            self.changed_grid.fill(True)
+            self.last_similarity = 0.0
+            self._signature, self._reference = self._reference, self._signature
             return True
             
-        # Check against most recent frame
-        last_frame = self.cache[-1]
-        similarity = self.compute_similarity(frame, last_frame)
-        
-        if similarity >= self.similarity_threshold:
+        self.last_similarity = self._compare(self._signature, self._reference)
+        if self.last_similarity >= self.similarity_threshold:
             # Too similar, skip processing
             return False
-        else:
-            # Different enough, process it
-            self.cache.append(frame.copy())
-            return True
             
+        # Different enough; it becomes the frame later ones are compared to
+        self._signature, self._reference = self._reference, self._signature
+        return True
+        
+    def changed_regions(self) -> List[Tuple[float, float, float, float]]:
+        """
+        Blocks that changed in the last checked frame
+        
+        Returns:
+            Normalized (x1, y1, x2, y2) boxes, one per changed block
+        """
+        columns, rows = self.grid
+        return [
+            (col / columns, row / rows, (col + 1) / columns, (row + 1) / rows)
+            for row, col in zip(*np.nonzero(self.changed_grid))
+        ]
+        
     def reset(self):
         """Clear cache"""
-        self.cache.clear()
-        self.last_hash = None
+        self._has_reference = False
+        self.changed_grid.fill(True)
+        self.last_similarity = 0.0
+
+
+class CpuMonitor:
+    """
+    Smoothed system CPU load with hysteresis on the overloaded flag
+    
+    Reading overloaded takes a new sample once the last one is older than
+    min_interval, so the flag stays current without a sampling task.
+    """
+    
+    def __init__(
+        self,
+        high_percent: float = 85.0,
+        low_percent: float = 60.0,
+        smoothing: float = 0.3,
+        min_interval: float = 1.0
+    ):
+        self.high_percent = high_percent
+        self.low_percent = low_percent
+        self.smoothing = smoothing
+        self.min_interval = min_interval
+        self.percent: Optional[float] = None
+        self._sampled_at: Optional[float] = None
+        
+        # Set above high_percent, cleared only below low_percent
+        self._overloaded = False
+        
+    @property
+    def overloaded(self) -> bool:
+        self.refresh()
+        return self._overloaded
+        
+    def refresh(self) -> Optional[float]:
+        """Sample unless the last reading is newer than min_interval"""
+        if self._sampled_at is None or time.monotonic() - self._sampled_at >= self.min_interval:
+            self.sample()
+        return self.percent
+        
+    def _read_percent(self) -> float:
+        """System-wide CPU utilisation since the previous call"""
+        try:
+            import psutil
+            return psutil.cpu_percent(interval=None)
+        except ImportError:
+            # Load average relative to core count as a rough stand-in
+            return min(100.0, os.getloadavg()[0] / (os.cpu_count() or 1) * 100.0)
+            
+    def sample(self) -> float:
+        """Take a reading and update the overloaded flag"""
+        raw = self._read_percent()
+        self._sampled_at = time.monotonic()
+        if self.percent is None:
+            self.percent = raw
+        else:
+            self.percent += self.smoothing * (raw - self.percent)
+            
+        if self._overloaded and self.percent < self.low_percent:
+            self._overloaded = False
+            logger.info(f"CPU load back to {self.percent:.0f}%")
+        elif not self._overloaded and self.percent > self.high_percent:
+            self._overloaded = True
+            logger.warning(f"CPU overloaded at {self.percent:.0f}%")
+            
+        return self.percent
 
 
-class BatchProcessor:
-    """Batch multiple frames for GPU efficiency"""
+@dataclass
+class _NodeRate:
+    """AIMD state of one node"""
+    fps: float
+    min_fps: float
+    max_fps: float
+    busy_time: Optional[float] = None  # Smoothed seconds of work per frame
+    max_age: float = 0.0  # Oldest frame seen since the last adjustment
+    last_adjust: float = field(default_factory=time.monotonic)
+    reason: Optional[str] = None  # Why the rate was last cut
+    increases: int = 0
+    decreases: int = 0
+
+
+class AdaptiveFpsController:
+    """
+    Per-node frame rate chosen from measured latency (AIMD)
+    
+    Nodes report how long each frame took and how old it was when work on it
+    started. Once per adjust_interval, a node whose work no longer fits in
+    its frame interval, whose frames are going stale, or that runs while the
+    CPU is overloaded has its rate cut multiplicatively; otherwise the rate
+    grows additively back towards its maximum.
+    """
     
-    def __init__(self, batch_size: int = 1, max_wait_ms: float = 50.0):
-        self.batch_size = batch_size
-        self.max_wait_ms = max_wait_ms
-        self.batch: List[np.ndarray] = []
-        self.batch_start_time: Optional[float] = None
+    def __init__(
+        self,
+        increase: float = 0.5,
+        decrease: float = 0.75,
+        target_utilization: float = 0.8,
+        max_frame_age: float = 0.5,
+        adjust_interval: float = 1.0,
+        smoothing: float = 0.3,
+        cpu_monitor: Optional[CpuMonitor] = None
+    ):
+        """
+        Args:
+            increase: fps added per adjustment while keeping up
+            decrease: Factor applied to fps when falling behind
+            target_utilization: Share of the frame interval work may take
+            max_frame_age: Seconds a frame may wait before work starts
+            adjust_interval: Seconds between adjustments of a node
+            smoothing: Weight of the newest work time in the moving average
+            cpu_monitor: Shared CPU monitor, if any
+        """
+        self.increase = increase
+        self.decrease = decrease
+        self.target_utilization = target_utilization
+        self.max_frame_age = max_frame_age
+        self.adjust_interval = adjust_interval
+        self.smoothing = smoothing
+        self.cpu_monitor = cpu_monitor
+        self._nodes: Dict[str, _NodeRate] = {}
         
-    def add_frame(self, frame: np.ndarray) -> Optional[List[np.ndarray]]:
+    def register(
+        self,
+        node_id: str,
+        fps: float,
+        min_fps: Optional[float] = None,
+        max_fps: Optional[float] = None
+    ) -> float:
         """
-        Add frame to batch, returns batch if ready
+        Start controlling a node, beginning at its configured fps
         
         Returns:
-            List of frames if batch is ready, None otherwise
+            The fps to run at
         """
-        if len(self.batch) == 0:
-            self.batch_start_time = time.time()
-            
-        self.batch.append(frame)
+        max_fps = max(max_fps or fps, fps)
+        min_fps = min(min_fps or min(1.0, fps), fps)
+        self._nodes[node_id] = _NodeRate(fps, min_fps, max_fps)
+        return fps
         
-        # Check if batch is ready
-        batch_ready = (
-            len(self.batch) >= self.batch_size or
-            (time.time() - self.batch_start_time) * 1000 >= self.max_wait_ms
-        )
+    def get_fps(self, node_id: str) -> Optional[float]:
+        rate = self._nodes.get(node_id)
+        return rate.fps if rate else None
+        
+    def observe(self, node_id: str, duration: float, frame_age: Optional[float] = None) -> float:
+        """
+        Report the work done on one frame
         
-        if batch_ready:
-            ready_batch = self.batch.copy()
-            self.batch.clear()
-            self.batch_start_time = None
-            return ready_batch
+        Args:
+            duration: Seconds spent processing the frame
+            frame_age: Seconds the frame waited before processing started
+            
+        Returns:
+            The fps to run at from now on
+        """
+        rate = self._nodes[node_id]
+        if rate.busy_time is None:
+            rate.busy_time = duration
+        else:
+            rate.busy_time += self.smoothing * (duration - rate.busy_time)
+        if frame_age is not None:
+            rate.max_age = max(rate.max_age, frame_age)
             
-        return None
-        
-    def flush(self) -> List[np.ndarray]:
-        """Force return current batch"""
-        batch = self.batch.copy()
-        self.batch.clear()
-        self.batch_start_time = None
-        return batch
+        now = time.monotonic()
+        if now - rate.last_adjust >= self.adjust_interval:
+            self._adjust(rate)
+            rate.last_adjust = now
+            rate.max_age = 0.0
+        return rate.fps
+        
+    def _adjust(self, rate: _NodeRate):
+        if rate.busy_time * rate.fps > self.target_utilization:
+            reason = 'latency'
+        elif rate.max_age > self.max_frame_age:
+            reason = 'frame_age'
+        elif self.cpu_monitor is not None and self.cpu_monitor.overloaded:
+            reason = 'cpu'
+        else:
+            reason = None
+            
+        if reason:
+            fps = max(rate.min_fps, rate.fps * self.decrease)
+            if fps < rate.fps:
+                rate.decreases += 1
+                rate.reason = reason
+        else:
+            fps = min(rate.max_fps, rate.fps + self.increase)
+            if fps > rate.fps:
+                rate.increases += 1
+        rate.fps = fps
+        
+    def get_stats(self) -> Dict[str, Dict]:
+        """Current rate and its inputs per node"""
+        return {
+            node_id: {
+                'fps': round(rate.fps, 2),
+                'min_fps': rate.min_fps,
+                'max_fps': rate.max_fps,
+                'busy_ms': round(rate.busy_time * 1000, 2) if rate.busy_time is not None else None,
+                'last_cut_reason': rate.reason,
+                'increases': rate.increases,
+                'decreases': rate.decreases
+            }
+            for node_id, rate in self._nodes.items()
+        }
 
 
 # Global profiler instance
@@ -4,18 +4,30 @@ Executes visual workflows and streams data via WebSocket
 """
 import asyncio
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import time
 import cv2
 import numpy as np
 
-from models import get_model
+from core.config import settings
+from core.metrics import frames_dropped
+from models import acquire_model
+from workflows.detection_reuse import DetectionReuseCache
 from workflows.event_bus import get_event_bus, EventType, WorkflowEvent
+from workflows.frame_context import FrameContextBoard
 from workflows.visualization import DetectionVisualizer
-from workflows.performance import get_profiler, FrameCache
+from workflows.performance import get_profiler, AdaptiveFpsController, FrameCache
+from workflows.scheduler import get_inference_scheduler
+from workflows.trace import create_trace_ring, register_trace_ring, remove_trace_ring
+from workflows.graph_index import WorkflowGraph
 from stream.audio_analyzer import AudioAnalyzer
+from stream.cpu_pool import get_cpu_pool
+from stream.file_source import YOUTUBE_RETRY_DELAY, FileFrameSource, invalidate_youtube_url, resolve_youtube_url
+from stream.frame_meta import FrameMeta, observe_stage, track_sent
+from stream.frame_pyramid import FramePyramid
 from stream.lighting_analyzer import LightingAnalyzer
+from stream.motion_gate import MotionGate
 from stream.webrtc_streamer import get_webrtc_streamer
 
 
@@ -35,12 +47,24 @@ def set_stream_manager(stream_manager):
     _stream_manager = stream_manager
 
 
+def _rescale_boxes(detections: List[dict], scale_x: float, scale_y: float):
+    """Map detection boxes from a pyramid level back to full frame coordinates"""
+    for detection in detections:
+        bbox = detection.get('bbox') if isinstance(detection, dict) else None
+        if bbox and len(bbox) == 4:
+            detection['bbox'] = [
+                bbox[0] * scale_x, bbox[1] * scale_y,
+                bbox[2] * scale_x, bbox[3] * scale_y
+            ]
+
+
 class RealtimeWorkflowExecutor:
     """Executes visual workflows in real-time"""
     
     def __init__(self, nodes: List[dict], edges: List[dict], workflow_id: str):
         self.nodes = nodes
         self.edges = edges
+        self.graph = WorkflowGraph(nodes, edges)
         self.workflow_id = workflow_id
         self.running = False
         self.task = None
@@ -79,8 +103,31 @@ class RealtimeWorkflowExecutor:
         
         # Performance profiling and optimization
         self.profiler = get_profiler()
-        self.frame_cache = FrameCache(similarity_threshold=0.95)
+        # Similar-frame skipping state per input node
+        self.frame_caches: Dict[str, FrameCache] = {}
+        # Last detections per (input, model), re-sent for skipped frames
+        self.detection_reuse = DetectionReuseCache()
         self.enable_profiling = True  # Can be disabled for production
+        # Inference slots shared fairly with other running workflows
+        self.scheduler = get_inference_scheduler()
+        
+        # Input fps adapted to measured latency (None = fixed data.fps)
+        self.fps_controller: Optional[AdaptiveFpsController] = None
+        if settings.ADAPTIVE_FPS:
+            self.fps_controller = AdaptiveFpsController(max_frame_age=settings.ADAPTIVE_FPS_MAX_AGE)
+        
+        # Resolution pyramid of the last frame each input node produced
+        self.frame_pyramids: Dict[str, FramePyramid] = {}
+        # Frame sequence numbers for inputs that are not camera streams
+        self._input_seq: Dict[str, int] = {}
+        # Reader threads for video file and YouTube inputs
+        self._file_sources: Dict[str, FileFrameSource] = {}
+        # When YouTube inputs whose stream failed to open may try again
+        self._youtube_retry_at: Dict[str, float] = {}
+        # Each input's frame for the current tick, read by all its consumers
+        self.frame_contexts = FrameContextBoard()
+        # Motion gates by (motionGate node id, input node id)
+        self.motion_gates: Dict[Tuple[str, str], MotionGate] = {}
         
         # State tracking
         self.audio_vu_states = {}  # Track threshold states per node
@@ -94,9 +141,15 @@ class RealtimeWorkflowExecutor:
         self.last_metrics_broadcast = {}
         self.metrics_broadcast_interval = 2.0  # seconds
         
+        # Per-frame events go here rather than to the log
+        self.trace = create_trace_ring(workflow_id)
+        
         # Frame throttling
         self.last_process_time = {}  # Per node throttling
         
+        # Bounds how many inputs run each model node at once
+        self.model_slots: Dict[str, asyncio.Semaphore] = {}
+        
     async def start(self):
         """Start workflow execution"""
         if self.running:
@@ -112,10 +165,17 @@ class RealtimeWorkflowExecutor:
         
         # Register in global registry
         _running_workflows[self.workflow_id] = self
+        register_trace_ring(self.trace)
         
         # Initialize models
         await self._initialize_models()
         
+        # Tell the stream manager how often we need camera frames
+        self._register_camera_demand()
+        self.scheduler.register(self.workflow_id, **self._scheduling_config())
+        if self.fps_controller and _stream_manager:
+            self.fps_controller.cpu_monitor = _stream_manager.cpu_monitor
+        
         # Start execution loop
         self.task = asyncio.create_task(self._execution_loop())
         
@@ -177,6 +237,10 @@ class RealtimeWorkflowExecutor:
             except asyncio.CancelledError:
                 pass
                 
+        self._release_camera_demand()
+        self.scheduler.unregister(self.workflow_id)
+        remove_trace_ring(self.trace)
+        
         # Clean up models
         for model in self.models.values():
             try:
@@ -198,18 +262,119 @@ class RealtimeWorkflowExecutor:
             except:
                 pass
         
-        # Clean up video captures
-        if hasattr(self, '_video_captures'):
-            for cap in self._video_captures.values():
-                try:
-                    cap.release()
-                except:
-                    pass
-            self._video_captures.clear()
+        # Clean up video file / YouTube readers
+        for node_id in list(self._file_sources):
+            await self._close_file_source(node_id)
+        self.frame_contexts.clear()
+        self.detection_reuse.clear()
                 
         # Remove from registry
         _running_workflows.pop(self.workflow_id, None)
         
+    def _register_camera_demand(self):
+        """Register each camera input's fps with the stream manager"""
+        if not _stream_manager:
+            return
+            
+        for node in self.input_nodes:
+            camera_id = node['data'].get('cameraId')
+            if node['type'] != 'camera' or not camera_id:
+                continue
+                
+            fps = self._camera_demand_fps(node)
+            if fps is not None:
+                _stream_manager.register_consumer(
+                    camera_id,
+                    f"{self.workflow_id}:{node['id']}",
+                    fps,
+                    self._camera_demand_quality(node)
+                )
+                
+    def _camera_demand_fps(self, input_node: dict) -> Optional[float]:
+        """
+        Frame rate a camera input actually needs, based on what consumes it
+        
+        Slow analytics (day/night every checkInterval seconds, parking at
+        1 fps) need far fewer frames than the input's fps, which lets the
+        stream drop to keyframe-only decoding when nothing faster is attached.
+        
+        Returns:
+            fps, or None if only audio is consumed
+        """
+        fps = input_node['data'].get('fps', 10)
+        if self.fps_controller:
+            # Leave room for the adaptive rate to grow
+            fps = max(fps, input_node['data'].get('maxFps') or fps)
+        targets = self._frame_consumers(input_node['id'])
+        if not targets:
+            return fps
+            
+        rates = []
+        for target in targets:
+            if target['type'] == 'dayNightDetector':
+                rates.append(1.0 / target.get('data', {}).get('checkInterval', 5))
+            elif target['type'] == 'parkingViolation':
+                rates.append(1.0)
+            elif target['type'] != 'audioExtractor':
+                rates.append(fps)
+                
+        return min(max(rates), fps) if rates else None
+        
+    def _camera_demand_quality(self, input_node: dict) -> str:
+        """
+        Sub-stream a camera input needs, based on what consumes it
+        
+        Day/night analysis works on the low stream, detection on medium, and
+        only models with X-RAY viewing enabled pull the high stream.
+        """
+        targets = self._frame_consumers(input_node['id'])
+        
+        quality = 'low'
+        for target in targets:
+            data = target.get('data', {})
+            if target['type'] == 'model' and data.get('enableXRay', False):
+                return 'high'
+            if target['type'] not in ('dayNightDetector', 'audioExtractor'):
+                quality = 'medium'
+        return quality
+        
+    def _frame_consumers(self, node_id: str) -> List[dict]:
+        """Nodes an input's frames go to, looking through motion gates"""
+        consumers = []
+        for target in self.graph.successors(node_id):
+            if target['type'] == 'motionGate':
+                consumers.extend(self.graph.successors(target['id']))
+            else:
+                consumers.append(target)
+        return consumers
+                
+    def _scheduling_config(self) -> dict:
+        """
+        Priority class and inference budget from a 'scheduling' config node
+        
+        e.g. {"priority": "critical", "maxInferencesPerSecond": 20, "share": 6}
+        """
+        for node in self.nodes:
+            data = node.get('data', {})
+            if node['type'] == 'config' and data.get('configType') == 'scheduling':
+                config = data.get('config') or {}
+                return {
+                    'priority': config.get('priority', 'normal'),
+                    'max_inferences_per_second': config.get('maxInferencesPerSecond'),
+                    'share': config.get('share')
+                }
+        return {}
+        
+    def _release_camera_demand(self):
+        """Release camera fps demand registered in start()"""
+        if not _stream_manager:
+            return
+            
+        for node in self.input_nodes:
+            camera_id = node['data'].get('cameraId')
+            if node['type'] == 'camera' and camera_id:
+                _stream_manager.release_consumer(camera_id, f"{self.workflow_id}:{node['id']}")
+                
     @classmethod
     async def stop_workflow(cls, workflow_id: str):
         """Stop a specific workflow by ID"""
@@ -245,7 +410,7 @@ class RealtimeWorkflowExecutor:
                 continue
                 
             try:
-                model = await get_model(model_id, {})
+                model = await acquire_model(model_id, {})
                 self.models[node_id] = model
                 logger.info(f"Initialized model {model_id} for node {node_id}")
             except Exception as e:
@@ -267,87 +432,275 @@ class RealtimeWorkflowExecutor:
                     'confidence': node['data'].get('confidence', 0.7),
                     'detectKeywords': node['data'].get('detectKeywords', [])
                 }
-                model = await get_model(model_id, config)
+                model = await acquire_model(model_id, config)
                 self.audio_models[node_id] = model
                 logger.info(f"Initialized audio model {model_id} for node {node_id}")
             except Exception as e:
                 logger.error(f"Failed to initialize audio model {model_id}: {e}")
                 
     async def _execution_loop(self):
-        """Main execution loop"""
+        """
+        Main execution loop
+        
+        Every input node runs as its own task woken by new frames, and every
+        audio/analytics node on its own timer, so a slow camera or model only
+        holds back the inputs that feed it.
+        """
+        tasks = []
         try:
             logger.info(f"Workflow {self.workflow_id}: Starting execution loop")
             logger.info(f"Input nodes: {len(self.input_nodes)}, Model nodes: {len(self.model_nodes)}, Output nodes: {len(self.output_nodes)}")
             
-            frame_count = 0
-            while self.running:
-                # Process each input source
-                for input_node in self.input_nodes:
-                    await self._process_input_node(input_node)
-                    frame_count += 1
-                    
-                    if frame_count % 30 == 0:
-                        logger.info(f"Workflow {self.workflow_id}: Processed {frame_count} frames")
-                
-                # Process audio extractor nodes
-                for audio_node in self.audio_extractor_nodes:
-                    await self._process_audio_extractor_node(audio_node)
-                
-                # Process audio AI nodes
-                for audio_ai_node in self.audio_ai_nodes:
-                    await self._process_audio_ai_node(audio_ai_node)
-                
-                # Process audio VU nodes
-                for audio_vu_node in self.audio_vu_nodes:
-                    await self._process_audio_vu_node(audio_vu_node)
-                
-                # Process day/night detector nodes
-                for day_night_node in self.day_night_nodes:
-                    await self._process_day_night_node(day_night_node)
+            for input_node in self.input_nodes:
+                tasks.append(asyncio.create_task(self._input_loop(input_node)))
                 
-                # Process parking violation nodes
-                for parking_node in self.parking_violation_nodes:
-                    await self._process_parking_violation_node(parking_node)
+            periodic = [
+                (self.audio_extractor_nodes, self._process_audio_extractor_node),
+                (self.audio_ai_nodes, self._process_audio_ai_node),
+                (self.audio_vu_nodes, self._process_audio_vu_node),
+                (self.day_night_nodes, self._process_day_night_node),
+                (self.parking_violation_nodes, self._process_parking_violation_node)
+            ]
+            for nodes, handler in periodic:
+                for node in nodes:
+                    tasks.append(asyncio.create_task(self._periodic_loop(node, handler)))
                     
-                # Small delay to prevent tight loop
-                await asyncio.sleep(0.1)
+            await asyncio.gather(*tasks)
                 
         except asyncio.CancelledError:
             logger.info(f"Workflow {self.workflow_id} execution cancelled")
         except Exception as e:
             logger.error(f"Error in workflow execution: {e}", exc_info=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
             
-    async def _process_input_node(self, input_node: dict):
-        """Process a single input node"""
+    async def _input_loop(self, input_node: dict):
+        """Process an input node's frames at its configured (or adapted) fps"""
         node_id = input_node['id']
-        node_type = input_node['type']
+        data = input_node.get('data', {})
+        fps = data.get('fps', 10)
+        adaptive = self.fps_controller is not None and fps > 0
+        if adaptive:
+            self.fps_controller.register(node_id, fps, data.get('minFps'), data.get('maxFps'))
+        interval = 1.0 / fps if fps > 0 else 0
+        
+        frame_count = 0
+        last_seq = 0
+        next_due = time.monotonic()
+        
+        # Frames published while this input was still busy are never
+        # processed; the stream ring keeps only the newest ones
+        stale = frames_dropped.labels(
+            camera_id=data.get('cameraId') or node_id, workflow_id=self.workflow_id, reason='stale'
+        )
         
-        logger.debug(f"Processing input node {node_id} ({node_type})")
+        while self.running:
+            delay = next_due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                
+            if input_node['type'] == 'camera':
+                # Sleep until the stream publishes a newer frame
+                seq = await self._wait_for_camera_frame(data.get('cameraId'), last_seq)
+                if seq == last_seq:
+                    continue
+                # Skipped frames only count when we fell behind, not when
+                # the input was deliberately paced below the stream rate
+                if last_seq and delay <= 0 and seq > last_seq + 1:
+                    stale.inc(seq - last_seq - 1)
+                last_seq = seq
+                
+            next_due = max(next_due + interval, time.monotonic())
+            started = time.monotonic()
+            try:
+                processed = await self._process_input_node(input_node)
+            except Exception as e:
+                logger.error(f"Error processing input node {node_id}: {e}", exc_info=True)
+                # Back off like an empty tick, or an unthrottled input spins on the error
+                await asyncio.sleep(0.005)
+                continue
+                
+            if not processed and not interval:
+                # Unthrottled input with no frame ready yet; don't spin
+                await asyncio.sleep(0.005)
+                
+            if processed and adaptive:
+                fps = await self._adapt_input_fps(node_id, time.monotonic() - started)
+                interval = 1.0 / fps
+                
+            if processed:
+                frame_count += 1
+                if frame_count % 30 == 0:
+                    self.trace.record('input_frames', node_id, frame_count)
+                    
+    async def _adapt_input_fps(self, node_id: str, duration: float) -> float:
+        """Feed one tick's latency to the fps controller and get the input's new rate"""
+        context = self.frame_contexts.latest(node_id)
+        frame_age = None
+        if context is not None and context.meta is not None:
+            # How long the frame waited between ingest and dispatch
+            frame_age = context.created - context.meta.ingest_time
+        fps = self.fps_controller.observe(node_id, duration, frame_age)
+        await self._update_node_metrics(node_id, {}, gauges={'target_fps': round(fps, 2)})
+        return fps
+        
+    async def _periodic_loop(self, node: dict, handler, interval: float = 0.1):
+        """Run an audio/analytics node on its own timer (handlers throttle themselves)"""
+        while self.running:
+            try:
+                await handler(node)
+            except Exception as e:
+                logger.error(f"Error processing node {node['id']}: {e}", exc_info=True)
+            await asyncio.sleep(interval)
+            
+    async def _wait_for_camera_frame(
+        self,
+        camera_id: Optional[str],
+        after_seq: int,
+        timeout: float = 1.0
+    ) -> int:
+        """
+        Wait until a camera stream publishes a frame newer than after_seq
+        
+        Returns:
+            Sequence of the new frame, or after_seq if none arrived in time
+        """
+        stream = _stream_manager.streams.get(camera_id) if _stream_manager and camera_id else None
+        if stream is None or not hasattr(stream, 'wait_for_frame'):
+            await asyncio.sleep(timeout)
+            return after_seq
+            
+        seq, frame = await stream.wait_for_frame(after_seq, timeout)
+        if frame is None:
+            # Stopped streams return at once; do not spin on them
+            await asyncio.sleep(0.1)
+            return after_seq
+        return seq
+        
+    def _model_slot(self, model_node: dict) -> asyncio.Semaphore:
+        """Get the semaphore bounding concurrent runs of a model node"""
+        node_id = model_node['id']
+        slot = self.model_slots.get(node_id)
+        if slot is None:
+            limit = model_node.get('data', {}).get('maxConcurrency')
+            if limit is None:
+                # Batched models need several frames in flight to fill a batch
+                batch = min(settings.INFERENCE_MAX_BATCH, getattr(self.models.get(node_id), 'max_batch', 1))
+                limit = max(settings.WORKFLOW_MODEL_CONCURRENCY, batch)
+            slot = asyncio.Semaphore(max(1, int(limit)))
+            self.model_slots[node_id] = slot
+        return slot
+        
+    async def _process_input_node(self, input_node: dict) -> bool:
+        """
+        Process a single input node
+        
+        Returns:
+            True if a frame was read and passed on to models
+        """
+        node_id = input_node['id']
         
-        # Get frame from input
+        # Get this tick's frame; the only place input frames are read
         frame = await self._get_frame_from_input(input_node)
         if frame is None:
-            logger.debug(f"No frame available from {node_id}")
-            return
+            self.trace.record('no_frame', node_id)
+            return False
             
-        logger.debug(f"Got frame from {node_id}: shape={frame.shape}")
+        pyramid = self._get_pyramid(node_id, frame)
+        observe_stage(pyramid.meta, 'dispatch')
+        
+        # Publish it for non-model consumers (day/night, ...)
+        self.frame_contexts.publish(node_id, pyramid)
             
         # Find connected model nodes
         connected_models = self._find_connected_nodes(node_id, 'model')
-        logger.debug(f"Found {len(connected_models)} connected models for {node_id}")
         
         # Check if we should skip similar frames
         skip_similar = input_node.get('data', {}).get('skipSimilar', False)
-        if skip_similar and not self.frame_cache.should_process(frame):
-            logger.debug(f"⏭️  Skipping similar frame for {node_id}")
-            return
+        if skip_similar and not self._get_frame_cache(node_id).should_process(frame, pyramid):
+            self.trace.record('skip_similar', node_id, self._get_frame_cache(node_id).last_similarity)
+            await self._reuse_detections(input_node, frame, pyramid)
+            return False
         
         # Profile frame read
         if self.enable_profiling:
             self.profiler.record_frame()
         
         for model_node in connected_models:
-            await self._process_through_model(model_node, frame, node_id)
+            await self._process_through_model(model_node, frame, node_id, pyramid)
+            
+        # Models behind a motion gate only run while the scene changes
+        for gate_node in self._find_connected_nodes(node_id, 'motionGate'):
+            if not self._get_motion_gate(gate_node, node_id, pyramid).check(pyramid.get('thumbnail')):
+                continue
+            for model_node in self._find_connected_nodes(gate_node['id'], 'model'):
+                await self._process_through_model(model_node, frame, node_id, pyramid)
+        return True
+        
+    async def _reuse_detections(self, input_node: dict, frame: np.ndarray, pyramid: FramePyramid):
+        """
+        Send each model's last detections again for a frame skipped as similar
+        
+        Keeps outputs and zone logic fed while the scene is unchanged. Results
+        are marked reused and stop after the input's reuseMaxFrames skipped
+        frames; with reuseTrack, boxes follow the global motion since they
+        were detected.
+        """
+        node_id = input_node['id']
+        data = input_node.get('data', {})
+        max_frames = data.get('reuseMaxFrames', 30)
+        if max_frames <= 0:
+            return
+            
+        thumbnail, scale = None, (1.0, 1.0)
+        if data.get('reuseTrack', False):
+            thumbnail = pyramid.get('thumbnail')
+            scale = pyramid.scale_factors('thumbnail')
+            
+        model_nodes = self._find_connected_nodes(node_id, 'model')
+        for gate_node in self._find_connected_nodes(node_id, 'motionGate'):
+            model_nodes.extend(self._find_connected_nodes(gate_node['id'], 'model'))
+            
+        for model_node in model_nodes:
+            detections = self.detection_reuse.reuse(
+                (node_id, model_node['id']), max_frames, thumbnail, scale
+            )
+            if detections is None:
+                continue
+            if pyramid.meta is not None:
+                for detection in detections:
+                    detection['frame_id'] = pyramid.meta.frame_id
+            await self._send_detections_to_outputs(
+                model_node['id'], detections, frame, model_node, pyramid.meta
+            )
+            
+    def _get_frame_cache(self, node_id: str) -> FrameCache:
+        """Get an input node's similar-frame cache"""
+        cache = self.frame_caches.get(node_id)
+        if cache is None:
+            cache = FrameCache(similarity_threshold=0.95)
+            self.frame_caches[node_id] = cache
+        return cache
+        
+    def _get_motion_gate(self, gate_node: dict, input_id: str, pyramid: FramePyramid) -> MotionGate:
+        """Get a motion gate node's gate for one of its inputs"""
+        key = (gate_node['id'], input_id)
+        gate = self.motion_gates.get(key)
+        if gate is None:
+            data = gate_node.get('data', {})
+            gate = MotionGate(
+                pyramid.meta.camera_id if pyramid.meta else input_id,
+                self.workflow_id,
+                threshold=data.get('threshold', 0.01),
+                pixel_threshold=data.get('pixelThreshold', 25),
+                keepalive=data.get('keepalive', 10.0),
+                learning_rate=data.get('learningRate', 0.05),
+                zones=data.get('zones')
+            )
+            self.motion_gates[key] = gate
+        return gate
             
     async def _get_frame_from_input(self, input_node: dict) -> Optional[np.ndarray]:
         """Get frame from input source"""
@@ -355,11 +708,7 @@ class RealtimeWorkflowExecutor:
         node_id = input_node['id']
         data = input_node['data']
         
-        # Apply FPS throttling
-        fps = data.get('fps', 10)
-        if not self._should_process_node(node_id, fps):
-            return None
-        
+        # FPS throttling is done by _input_loop
         if node_type == 'camera':
             # Get frame from camera stream via stream manager
             camera_id = data.get('cameraId')
@@ -367,13 +716,14 @@ class RealtimeWorkflowExecutor:
                 return None
             
             try:
-                # Get frame from stream manager
-                frame = await self._get_frame_from_stream_manager(camera_id)
-                
-                if frame is not None:
-                    await self._update_node_metrics(node_id, {'frames_received': 1})
+                # Get frame (and its shared pyramid) from stream manager
+                pyramid = await self._get_pyramid_from_stream_manager(camera_id)
+                if pyramid is None:
+                    return None
                     
-                return frame
+                self.frame_pyramids[node_id] = pyramid
+                await self._update_node_metrics(node_id, {'frames_received': 1})
+                return pyramid.full
                 
             except Exception as e:
                 logger.error(f"Error getting frame from camera {camera_id}: {e}")
@@ -384,58 +734,34 @@ class RealtimeWorkflowExecutor:
                 return None
             
         elif node_type == 'youtube':
-            # Get frame from YouTube stream via yt-dlp
+            # Get frame from YouTube stream (URL resolved by yt-dlp)
             youtube_url = data.get('youtubeUrl')
             if not youtube_url:
                 return None
             
-            # Use OpenCV to capture from YouTube stream
-            # This requires yt-dlp to get the actual stream URL
-            try:
-                import subprocess
-                import json
-                
-                # Get stream URL using yt-dlp
-                result = subprocess.run(
-                    ['yt-dlp', '-f', 'best', '-g', youtube_url],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if result.returncode == 0:
-                    stream_url = result.stdout.strip()
-                    
-                    # Open video capture
-                    if not hasattr(self, '_video_captures'):
-                        self._video_captures = {}
-                    
-                    node_id = input_node['id']
-                    if node_id not in self._video_captures:
-                        cap = cv2.VideoCapture(stream_url)
-                        if cap.isOpened():
-                            self._video_captures[node_id] = cap
-                        else:
-                            logger.error(f"Failed to open YouTube stream: {youtube_url}")
-                            return None
-                    
-                    cap = self._video_captures[node_id]
-                    ret, frame = cap.read()
-                    
-                    if ret:
-                        return frame
-                    else:
-                        # Reconnect if stream failed
-                        cap.release()
-                        del self._video_captures[node_id]
-                        return None
+            source = self._file_sources.get(node_id)
+            if source is not None and source.finished:
+                await self._close_file_source(node_id)
+                if source.frames_read:
+                    # Stream ended or its media URL expired: resolve again
+                    logger.info(f"YouTube stream for {node_id} ended, reconnecting")
+                    invalidate_youtube_url(youtube_url)
                 else:
-                    logger.error(f"yt-dlp failed: {result.stderr}")
+                    # Could not open the stream; don't hammer it every tick
+                    self._youtube_retry_at[node_id] = time.monotonic() + YOUTUBE_RETRY_DELAY
+                source = None
+                
+            if source is None:
+                if time.monotonic() < self._youtube_retry_at.get(node_id, 0.0):
                     return None
-                    
-            except Exception as e:
-                logger.error(f"Error getting YouTube frame: {e}")
-                return None
+                stream_url = await resolve_youtube_url(youtube_url)
+                if not stream_url:
+                    return None
+                source = FileFrameSource(node_id, stream_url, live=True, loop_playback=False)
+                source.start()
+                self._file_sources[node_id] = source
+                
+            return source.read()
             
         elif node_type == 'videoInput':
             # Get frame from video file
@@ -444,83 +770,40 @@ class RealtimeWorkflowExecutor:
                 logger.warning(f"VideoInput node {node_id} has no videoPath configured")
                 return None
             
-            try:
-                # Initialize video capture if not exists
-                if not hasattr(self, '_video_captures'):
-                    self._video_captures = {}
-                
-                # Open video file if not already open
-                if node_id not in self._video_captures:
-                    logger.info(f"Opening video file: {video_path}")
-                    cap = cv2.VideoCapture(video_path)
-                    
-                    if not cap.isOpened():
-                        logger.error(f"Failed to open video file: {video_path}")
-                        await self.event_bus.emit_error(
-                            self.workflow_id, node_id,
-                            Exception(f"Failed to open video file: {video_path}"),
-                            {'video_path': video_path}
-                        )
-                        return None
-                    
-                    self._video_captures[node_id] = cap
-                    logger.info(f"Video file opened successfully: {video_path}")
-                
-                cap = self._video_captures[node_id]
-                ret, frame = cap.read()
+            source = self._file_sources.get(node_id)
+            if source is None:
+                # Frames are read and scaled ahead in a reader thread
+                resolution_scale = data.get('resolutionScale', 100)
+                source = FileFrameSource(node_id, video_path, scale=resolution_scale / 100.0)
+                source.start()
+                self._file_sources[node_id] = source
                 
-                if ret:
-                    # Apply resolution scaling if configured
-                    resolution_scale = data.get('resolutionScale', 100)
-                    if resolution_scale < 100:
-                        scale = resolution_scale / 100.0
-                        new_width = int(frame.shape[1] * scale)
-                        new_height = int(frame.shape[0] * scale)
-                        frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
-                        logger.debug(f"Scaled frame from {frame.shape[1]}x{frame.shape[0]} to {new_width}x{new_height} ({resolution_scale}%)")
-                    
-                    await self._update_node_metrics(node_id, {'frames_received': 1})
-                    return frame
-                else:
-                    # End of video - loop back to start
-                    logger.info(f"End of video file reached, looping back to start: {video_path}")
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Reset to beginning
-                    ret, frame = cap.read()
-                    
-                    if ret:
-                        # Apply resolution scaling if configured
-                        resolution_scale = data.get('resolutionScale', 100)
-                        if resolution_scale < 100:
-                            scale = resolution_scale / 100.0
-                            new_width = int(frame.shape[1] * scale)
-                            new_height = int(frame.shape[0] * scale)
-                            frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
-                        
-                        return frame
-                    else:
-                        logger.error(f"Failed to read from video file after reset: {video_path}")
-                        # Close and remove the capture
-                        cap.release()
-                        del self._video_captures[node_id]
-                        return None
-                        
-            except Exception as e:
-                logger.error(f"Error reading video file {video_path}: {e}")
+            error = source.take_error()
+            if error:
                 await self.event_bus.emit_error(
-                    self.workflow_id, node_id, e,
+                    self.workflow_id, node_id, Exception(error),
                     {'video_path': video_path}
                 )
-                # Clean up failed capture
-                if node_id in getattr(self, '_video_captures', {}):
-                    try:
-                        self._video_captures[node_id].release()
-                        del self._video_captures[node_id]
-                    except:
-                        pass
+            if source.finished:
+                # Unreadable file: try again from scratch next time
+                await self._close_file_source(node_id)
                 return None
+                
+            frame = source.read()
+            if frame is not None:
+                await self._update_node_metrics(node_id, {'frames_received': 1})
+            return frame
             
         return None
         
+    async def _close_file_source(self, node_id: str):
+        """Stop a video file / YouTube reader thread"""
+        source = self._file_sources.pop(node_id, None)
+        if source:
+            # Joining waits for a pending read, keep it off the loop
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, source.stop)
+            
     def _create_test_frame(self) -> np.ndarray:
         """Create a test frame for debugging"""
         # Create a simple test image
@@ -536,15 +819,28 @@ class RealtimeWorkflowExecutor:
         )
         return frame
         
+    def _get_pyramid(self, node_id: str, frame: np.ndarray) -> FramePyramid:
+        """Get the resolution pyramid shared by all consumers of an input frame"""
+        pyramid = self.frame_pyramids.get(node_id)
+        if pyramid is None or pyramid.full is not frame:
+            # Files and YouTube inputs are stamped per input node
+            seq = self._input_seq.get(node_id, 0) + 1
+            self._input_seq[node_id] = seq
+            pyramid = FramePyramid(frame, seq, FrameMeta(node_id, seq))
+            self.frame_pyramids[node_id] = pyramid
+        return pyramid
+        
     async def _process_through_model(
         self,
         model_node: dict,
         frame: np.ndarray,
-        source_node_id: str
+        source_node_id: str,
+        pyramid: Optional[FramePyramid] = None
     ):
         """Process frame through model"""
         node_id = model_node['id']
         model = self.models.get(node_id)
+        frame_meta = pyramid.meta if pyramid is not None else None
         
         if not model:
             logger.warning(f"Model not initialized for node {node_id}")
@@ -558,29 +854,47 @@ class RealtimeWorkflowExecutor:
             
         try:
             # Emit node started event
-            logger.info(f"🚀 Emitting NODE_STARTED for {node_id}")
             await self.event_bus.emit(WorkflowEvent(
                 event_type=EventType.NODE_STARTED,
                 workflow_id=self.workflow_id,
                 node_id=node_id,
                 timestamp=datetime.utcnow(),
-                data={'source': source_node_id, 'frame_shape': frame.shape}
+                data={
+                    'source': source_node_id,
+                    'frame_shape': frame.shape,
+                    'frame_id': frame_meta.frame_id if frame_meta else None
+                }
             ))
-            logger.info(f"✅ NODE_STARTED event emitted for {node_id}")
             
-            # Run detection with profiling
-            if self.enable_profiling:
-                self.profiler.start_timer('model_inference')
-            
-            detections = await model.detect(frame)
+            # Models that resize to a fixed input size anyway can take the
+            # pyramid level directly; boxes are mapped back to full frame
+            input_level = getattr(model, 'input_level', None)
+            async with self._model_slot(model_node):
+                # Wait for this workflow's fair share of inference slots
+                if not await self.scheduler.acquire(self.workflow_id):
+                    self.trace.record('shed', node_id)
+                    return
+                try:
+                    # Timed locally: other inputs may be running models concurrently
+                    started = time.time()
+                    if pyramid is not None and input_level:
+                        model_frame = pyramid.get(input_level)
+                        detections = await model.detect(model_frame)
+                        if model_frame is not pyramid.full and isinstance(detections, list):
+                            _rescale_boxes(detections, *pyramid.scale_factors(input_level))
+                    else:
+                        detections = await model.detect(frame)
+                    inference_time = (time.time() - started) * 1000
+                finally:
+                    self.scheduler.release(self.workflow_id)
+            observe_stage(frame_meta, 'inference')
             
             if self.enable_profiling:
-                inference_time = self.profiler.end_timer('model_inference', {
+                self.profiler.record('model_inference', inference_time, {
                     'model_id': node_id,
                     'frame_shape': frame.shape,
                     'detections': len(detections) if isinstance(detections, list) else 0
                 })
-                logger.debug(f"⚡ Model inference: {inference_time:.2f}ms")
             
             # Ensure detections is a flat list of dicts
             if not isinstance(detections, list):
@@ -599,8 +913,12 @@ class RealtimeWorkflowExecutor:
                     logger.warning(f"Unexpected detection type: {type(item)}")
             
             detections = flat_detections
-            logger.info(f"Model {node_id} detected {len(detections)} objects")
+            self.trace.record('inference', node_id, round(inference_time, 2), f"{len(detections)} objects")
             
+            if frame_meta is not None:
+                for detection in detections:
+                    detection['frame_id'] = frame_meta.frame_id
+                    
             # Filter by confidence
             confidence_threshold = model_node['data'].get('confidence', 0.7)
             filtered_detections = [
@@ -608,6 +926,16 @@ class RealtimeWorkflowExecutor:
                 if isinstance(d, dict) and d.get('confidence', 0) >= confidence_threshold
             ]
             
+            # Kept for frames the input skips as similar; the thumbnail is
+            # only needed to track boxes across them
+            source_data = (self.graph.node(source_node_id) or {}).get('data', {})
+            track = pyramid is not None and source_data.get('reuseTrack', False)
+            self.detection_reuse.store(
+                (source_node_id, node_id),
+                filtered_detections,
+                pyramid.get('thumbnail') if track else None
+            )
+            
             # Emit detections event (even if empty - important for debugging!)
             await self.event_bus.emit(WorkflowEvent(
                 event_type=EventType.DETECTIONS_EMITTED,
@@ -626,7 +954,8 @@ class RealtimeWorkflowExecutor:
                 model_node['id'],
                 filtered_detections,
                 frame,
-                model_node
+                model_node,
+                frame_meta
             )
             
             # Emit node completed event
@@ -705,15 +1034,11 @@ class RealtimeWorkflowExecutor:
         model_node_id: str,
         detections: List[dict],
         frame: np.ndarray,
-        model_node: dict = None
+        model_node: dict = None,
+        frame_meta: Optional[FrameMeta] = None
     ):
         """Send detection data to output nodes via WebSocket, applying filters if present"""
         
-        # Debug logging
-        logger.info(f"_send_detections_to_outputs called with model_node type: {type(model_node)}")
-        if model_node:
-            logger.info(f"model_node content: {model_node}")
-        
         # Check if X-RAY mode is enabled
         xray_enabled = False
         xray_settings = {}
@@ -739,7 +1064,8 @@ class RealtimeWorkflowExecutor:
                 model_node_id,
                 frame,
                 detections,
-                xray_settings
+                xray_settings,
+                frame_meta
             )
         # Check if there are filter nodes connected to this model
         connected_filters = self._find_connected_nodes(model_node_id, 'detectionFilter')
@@ -752,7 +1078,7 @@ class RealtimeWorkflowExecutor:
                     continue
                 filtered_detections, should_pass = self._apply_detection_filter(filter_node, detections)
                 
-                logger.info(f"Filter {filter_node['id']}: {len(detections)} → {len(filtered_detections)} detections, pass={should_pass}")
+                self.trace.record('filter', filter_node['id'], len(filtered_detections), 'pass' if should_pass else 'block')
                 
                 if not should_pass:
                     # Emit blocked event
@@ -791,7 +1117,8 @@ class RealtimeWorkflowExecutor:
                             output_node,
                             frame,
                             filtered_detections,
-                            xray_settings
+                            xray_settings,
+                            frame_meta
                         )
                 
                 # Emit filter completed event
@@ -814,10 +1141,6 @@ class RealtimeWorkflowExecutor:
             max_depth=3
         )
         
-        logger.info(f"Sending {len(detections)} detections to {len(output_nodes)} output nodes")
-        logger.info(f"Output node types: {[n['type'] for n in output_nodes]}")
-        logger.info(f"Output node IDs: {[n['id'] for n in output_nodes]}")
-        
         for output_node in output_nodes:
             output_node_id = output_node['id']
             node_type = output_node['type']
@@ -832,9 +1155,10 @@ class RealtimeWorkflowExecutor:
                     'detections': detections,
                     'count': len(detections),
                     'fps': 10,
-                    'frame_id': id(frame),
+                    'frame_id': frame_meta.frame_id if frame_meta else None,
                     'resolution': {'width': frame.shape[1], 'height': frame.shape[0]},
-                    'processing_time_ms': 25
+                    'processing_time_ms': 25,
+                    'frame_age_ms': round(frame_meta.age() * 1000, 1) if frame_meta else None
                 }
             elif node_type == 'debug':
                 # Format detections for debug output
@@ -859,17 +1183,19 @@ class RealtimeWorkflowExecutor:
                 logger.warning(f"Unknown output node type: {node_type}")
                 continue
                 
-            logger.info(f"Broadcasting {data['type']} to {node_type} node {output_node_id}")
+            self.trace.record('send', output_node_id, len(detections), data['type'])
             
             # Broadcast via WebSocket
             await self._broadcast_to_websocket(data)
+            observe_stage(frame_meta, 'send')
             
     async def _send_xray_frames(
         self,
         node_id: str,
         frame: np.ndarray,
         detections: List[dict],
-        xray_settings: dict
+        xray_settings: dict,
+        frame_meta: Optional[FrameMeta] = None
     ):
         """Send X-RAY annotated frames to X-RAY View nodes"""
         
@@ -877,8 +1203,7 @@ class RealtimeWorkflowExecutor:
         # Max FPS can be configured: 15 (CPU), 30 (Apple Silicon), 60 (NVIDIA GPU)
         if not hasattr(self, '_xray_last_send'):
             self._xray_last_send = {}
-        
-        import time
+            
         current_time = time.time()
         
         # Get max FPS from settings (default: 30 for good balance)
@@ -889,15 +1214,11 @@ class RealtimeWorkflowExecutor:
             time_since_last = current_time - self._xray_last_send[node_id]
             if time_since_last < min_interval:
                 # Skip this frame - too soon
-                logger.debug(f"   ⏭️  Skipping X-RAY frame (throttled to {max_xray_fps} FPS)")
+                self.trace.record('xray_throttled', node_id)
                 return
         
         self._xray_last_send[node_id] = current_time
         
-        logger.info(f"🔍 _send_xray_frames called for model {node_id}")
-        logger.info(f"   Frame shape: {frame.shape}, Detections: {len(detections)}")
-        logger.info(f"   X-RAY settings: {xray_settings}")
-        
         # Find connected X-RAY view nodes (both WebSocket and WebRTC types)
         xray_nodes = self._find_output_nodes_recursive(
             node_id,
@@ -905,20 +1226,14 @@ class RealtimeWorkflowExecutor:
             max_depth=3
         )
         
-        logger.info(f"   Found {len(xray_nodes)} X-RAY View nodes")
-        for xnode in xray_nodes:
-            logger.info(f"     - X-RAY node: {xnode.get('id', 'unknown')} (type: {xnode.get('type', 'unknown')})")
-        
         if not xray_nodes:
-            logger.warning(f"   ⚠️ No X-RAY View nodes found connected to {node_id}")
+            self.trace.record('xray_unconnected', node_id)
             return
         
         # Create X-RAY annotated frame
         xray_mode = xray_settings.get('xray_mode', 'boxes')
         schematic_mode = xray_settings.get('schematic_mode', False)
         
-        logger.info(f"   Drawing X-RAY frame: mode={xray_mode}, schematic={schematic_mode}")
-        
         if self.enable_profiling:
             self.profiler.start_timer('xray_visualization')
         
@@ -938,19 +1253,18 @@ class RealtimeWorkflowExecutor:
                         'mode': xray_mode,
                         'detections': len(detections)
                     })
-                    logger.debug(f"   ⚡ Visualization: {viz_time:.2f}ms")
-                logger.info(f"   ✅ Drew {len(detections)} detections on frame")
+                    self.trace.record('xray_draw', node_id, round(viz_time, 2), xray_mode)
             elif xray_mode == 'heatmap':
-                annotated_frame = self.visualizer.draw_heatmap(
+                # Full-frame float math; a worker process if the CPU pool has one
+                annotated_frame = await get_cpu_pool().run(
+                    'heatmap',
                     frame,
                     detections,
                     alpha=xray_settings.get('overlay_alpha', 0.4),
                     schematic_mode=schematic_mode
                 )
-                logger.info(f"   ✅ Drew heatmap with {len(detections)} detections")
             else:
                 annotated_frame = frame.copy()
-                logger.info(f"   Using raw frame (no annotation)")
         except Exception as e:
             logger.error(f"   ❌ Error drawing X-RAY annotations: {e}", exc_info=True)
             annotated_frame = frame.copy()
@@ -962,20 +1276,19 @@ class RealtimeWorkflowExecutor:
                 len(detections),
                 position='top-right'
             )
-            logger.info(f"   ✅ Added detection count overlay: {len(detections)}")
         except Exception as e:
             logger.error(f"   ⚠️ Could not add detection count: {e}")
+        observe_stage(frame_meta, 'visualize')
         
         # Encode to JPEG with optimized quality for speed
-        if self.enable_profiling:
-            self.profiler.start_timer('jpeg_encoding')
-        
         try:
             import base64
             # Use lower quality for real-time performance (60% is good balance)
             # Quality: 85 = ~150KB, 60 = ~60KB, 40 = ~30KB, 30 = ~20KB
             jpeg_quality = 50  # Further optimized: 50% gives 30% smaller files with minimal quality loss
-            _, buffer = cv2.imencode('.jpg', annotated_frame, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+            # Timed locally: other inputs run while the encode is awaited
+            encode_started = time.time()
+            buffer = await get_cpu_pool().run('jpeg', annotated_frame, quality=jpeg_quality)
             
             # For now, still use base64 for JSON WebSocket compatibility
             # TODO: Implement binary WebSocket for 25% bandwidth savings
@@ -985,19 +1298,16 @@ class RealtimeWorkflowExecutor:
             base64_overhead = frame_size_kb - jpeg_size_kb
             
             if self.enable_profiling:
-                encode_time = self.profiler.end_timer('jpeg_encoding', {
+                encode_time = (time.time() - encode_started) * 1000
+                self.profiler.record('jpeg_encoding', encode_time, {
                     'quality': jpeg_quality,
                     'jpeg_kb': jpeg_size_kb,
                     'total_kb': frame_size_kb,
                     'overhead_kb': base64_overhead
                 })
-                logger.debug(f"   ⚡ JPEG encoding: {encode_time:.2f}ms (JPEG: {jpeg_size_kb:.1f}KB + base64 overhead: {base64_overhead:.1f}KB)")
-            
-            logger.info(f"   ✅ Encoded frame to JPEG (Q{jpeg_quality}): {jpeg_size_kb:.1f} KB (total with base64: {frame_size_kb:.1f} KB)")
+                self.trace.record('xray_encode', node_id, round(encode_time, 2), f"{frame_size_kb:.1f}KB")
         except Exception as e:
             logger.error(f"   ❌ Error encoding frame: {e}", exc_info=True)
-            if self.enable_profiling:
-                self.profiler.end_timer('jpeg_encoding')
             return
         
         # Send to each X-RAY view node
@@ -1012,6 +1322,8 @@ class RealtimeWorkflowExecutor:
                 'fps': 10,
                 'detections_count': len(detections),
                 'processing_time_ms': 25,
+                'frame_age_ms': round(frame_meta.age() * 1000, 1) if frame_meta else None,
+                'frame_id': frame_meta.frame_id if frame_meta else None,
                 'xray_mode': xray_mode,
                 'resolution': {
                     'width': frame.shape[1],
@@ -1019,12 +1331,11 @@ class RealtimeWorkflowExecutor:
                 }
             }
             
-            logger.info(f"   📤 Broadcasting X-RAY frame to node {xray_node_id}")
-            logger.info(f"      Frame size: {frame_size_kb:.1f} KB, Detections: {len(detections)}")
-            
             try:
                 await self._broadcast_to_websocket(data)
-                logger.info(f"   ✅ X-RAY frame sent to {xray_node_id} via WebSocket")
+                observe_stage(frame_meta, 'send')
+                track_sent(frame_meta)
+                self.trace.record('send', xray_node_id, len(detections), 'xray_frame')
             except Exception as e:
                 logger.error(f"   ❌ Failed to send X-RAY frame to {xray_node_id}: {e}", exc_info=True)
             
@@ -1032,10 +1343,9 @@ class RealtimeWorkflowExecutor:
             try:
                 webrtc = get_webrtc_streamer()
                 await webrtc.update_frame(xray_node_id, annotated_frame)
-                logger.debug(f"   🎥 Updated WebRTC stream for {xray_node_id}")
             except Exception as e:
                 # WebRTC is optional - ignore errors if not connected
-                logger.debug(f"   ⚠️  WebRTC not available for {xray_node_id}: {e}")
+                self.trace.record('webrtc_unavailable', xray_node_id, detail=type(e).__name__)
             
     async def _send_xray_frame_to_node(
         self,
@@ -1043,7 +1353,8 @@ class RealtimeWorkflowExecutor:
         target_node: dict,
         frame: np.ndarray,
         detections: List[dict],
-        xray_settings: dict
+        xray_settings: dict,
+        frame_meta: Optional[FrameMeta] = None
     ):
         """Send X-RAY annotated frame to a specific X-RAY view node"""
         # Create X-RAY annotated frame
@@ -1061,7 +1372,8 @@ class RealtimeWorkflowExecutor:
                 schematic_mode=schematic_mode or (xray_mode == 'schematic')
             )
         elif xray_mode == 'heatmap':
-            annotated_frame = self.visualizer.draw_heatmap(
+            annotated_frame = await get_cpu_pool().run(
+                'heatmap',
                 frame,
                 detections,
                 alpha=xray_settings.get('overlay_alpha', 0.4),
@@ -1076,10 +1388,11 @@ class RealtimeWorkflowExecutor:
             len(detections),
             position='top-right'
         )
+        observe_stage(frame_meta, 'visualize')
         
         # Encode to JPEG
         import base64
-        _, buffer = cv2.imencode('.jpg', annotated_frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        buffer = await get_cpu_pool().run('jpeg', annotated_frame, quality=85)
         frame_base64 = base64.b64encode(buffer).decode('utf-8')
         
         data = {
@@ -1091,6 +1404,8 @@ class RealtimeWorkflowExecutor:
             'fps': 10,
             'detections_count': len(detections),
             'processing_time_ms': 25,
+            'frame_age_ms': round(frame_meta.age() * 1000, 1) if frame_meta else None,
+            'frame_id': frame_meta.frame_id if frame_meta else None,
             'xray_mode': xray_mode,
             'resolution': {
                 'width': frame.shape[1],
@@ -1099,6 +1414,8 @@ class RealtimeWorkflowExecutor:
         }
         
         await self._broadcast_to_websocket(data)
+        observe_stage(frame_meta, 'send')
+        track_sent(frame_meta)
     
     async def _broadcast_to_websocket(self, data: dict):
         """Broadcast data to WebSocket clients"""
@@ -1114,26 +1431,7 @@ class RealtimeWorkflowExecutor:
         target_types: any
     ) -> List[dict]:
         """Find nodes connected to a source node"""
-        if isinstance(target_types, str):
-            target_types = [target_types]
-            
-        connected = []
-        
-        # Find edges from source
-        for edge in self.edges:
-            if edge['source'] == source_id:
-                target_id = edge['target']
-                
-                # Find target node
-                target_node = next(
-                    (n for n in self.nodes if n['id'] == target_id),
-                    None
-                )
-                
-                if target_node and target_node['type'] in target_types:
-                    connected.append(target_node)
-                    
-        return connected
+        return self.graph.successors(source_id, target_types)
     
     def _find_output_nodes_recursive(
         self,
@@ -1145,43 +1443,11 @@ class RealtimeWorkflowExecutor:
         Recursively find output nodes connected to source
         Searches through intermediate nodes to find debug/preview nodes
         """
-        found_nodes = []
-        visited = set()
-        
-        def search(node_id: str, depth: int):
-            if depth > max_depth or node_id in visited:
-                return
-            
-            visited.add(node_id)
-            
-            # Find all edges from this node
-            for edge in self.edges:
-                if edge['source'] == node_id:
-                    target_id = edge['target']
-                    
-                    # Find target node
-                    target_node = next(
-                        (n for n in self.nodes if n['id'] == target_id),
-                        None
-                    )
-                    
-                    if not target_node:
-                        continue
-                    
-                    # If it's a target type, add it
-                    if target_node['type'] in target_types:
-                        if target_node not in found_nodes:
-                            found_nodes.append(target_node)
-                    
-                    # Continue searching through this node
-                    search(target_id, depth + 1)
-        
-        search(source_id, 0)
-        return found_nodes
+        return self.graph.downstream(source_id, target_types, max_depth)
     
-    async def _get_frame_from_stream_manager(self, camera_id: str) -> Optional[np.ndarray]:
+    async def _get_pyramid_from_stream_manager(self, camera_id: str) -> Optional[FramePyramid]:
         """
-        Get latest frame from stream manager
+        Get the resolution pyramid of the latest frame from stream manager
         Integrates with backend stream manager to retrieve frames
         """
         global _stream_manager
@@ -1202,7 +1468,12 @@ class RealtimeWorkflowExecutor:
             if not stream:
                 return None
             
+            # Shared pyramid, so levels are built once for all consumers
+            if hasattr(stream, 'get_latest_pyramid'):
+                return stream.get_latest_pyramid()
+                
             # Get latest frame from stream buffer
+            frame = None
             if hasattr(stream, 'get_latest_frame'):
                 # Check if it's async or sync
                 result = stream.get_latest_frame()
@@ -1210,12 +1481,13 @@ class RealtimeWorkflowExecutor:
                     frame = await result
                 else:
                     frame = result
-                return frame
             
             # Fallback: try to get from frame buffer
-            if hasattr(stream, 'frame_buffer') and stream.frame_buffer:
+            elif hasattr(stream, 'frame_buffer') and stream.frame_buffer:
                 frame = stream.frame_buffer.get_latest()
-                return frame
+                
+            if frame is not None:
+                return FramePyramid(frame)
                 
         except Exception as e:
             logger.error(f"Error getting frame from stream manager: {e}")
@@ -1235,8 +1507,14 @@ class RealtimeWorkflowExecutor:
             
         return False
     
-    async def _update_node_metrics(self, node_id: str, metrics: dict):
-        """Update metrics for a node"""
+    async def _update_node_metrics(self, node_id: str, metrics: dict, gauges: Optional[dict] = None):
+        """
+        Update metrics for a node
+        
+        Args:
+            metrics: Counts added to the node's totals
+            gauges: Values that replace the previous ones (e.g. target_fps)
+        """
         if node_id not in self.node_metrics:
             self.node_metrics[node_id] = {
                 'frames_received': 0,
@@ -1253,6 +1531,7 @@ class RealtimeWorkflowExecutor:
                 self.node_metrics[node_id][key] += value
             else:
                 self.node_metrics[node_id][key] = value
+        self.node_metrics[node_id].update(gauges or {})
         
         # Broadcast metrics periodically
         current_time = time.time()
@@ -1286,12 +1565,16 @@ class RealtimeWorkflowExecutor:
         
         # Get RTSP URL or video source
         rtsp_url = None
+        shared_stream = None
         if input_node['type'] == 'camera':
             camera_id = input_node['data'].get('cameraId')
             if camera_id and _stream_manager:
                 stream = _stream_manager.streams.get(camera_id)
                 if stream:
                     rtsp_url = stream.rtsp_url
+                    # Demux audio from the camera's existing connection
+                    if hasattr(stream, 'enable_audio'):
+                        shared_stream = stream
         elif input_node['type'] == 'youtube':
             rtsp_url = input_node['data'].get('youtubeUrl')
         elif input_node['type'] == 'videoInput':
@@ -1310,7 +1593,8 @@ class RealtimeWorkflowExecutor:
                 rtsp_url=rtsp_url,
                 sample_rate=config.get('sampleRate', 16000),
                 channels=config.get('channels', 1),
-                buffer_duration=config.get('bufferDuration', 5.0)
+                buffer_duration=config.get('bufferDuration', 5.0),
+                stream=shared_stream
             )
             
             await extractor.start()
@@ -1445,26 +1729,7 @@ class RealtimeWorkflowExecutor:
     
     def _find_connected_nodes_reverse(self, target_id: str, source_types: any) -> List[dict]:
         """Find nodes that connect TO the target node"""
-        if isinstance(source_types, str):
-            source_types = [source_types]
-        
-        connected = []
-        
-        # Find edges TO target
-        for edge in self.edges:
-            if edge['target'] == target_id:
-                source_id = edge['source']
-                
-                # Find source node
-                source_node = next(
-                    (n for n in self.nodes if n['id'] == source_id),
-                    None
-                )
-                
-                if source_node and source_node['type'] in source_types:
-                    connected.append(source_node)
-        
-        return connected
+        return self.graph.predecessors(target_id, source_types)
     
     async def _process_audio_vu_node(self, audio_vu_node: dict):
         """Process Audio VU/Frequency Meter node"""
@@ -1580,28 +1845,31 @@ class RealtimeWorkflowExecutor:
         node_id = day_night_node['id']
         node_config = day_night_node.get('data', {})
         
-        # Check interval-based throttling
-        check_interval = node_config.get('checkInterval', 5)  # seconds
-        if not self._should_process_node(node_id, 1.0 / check_interval):
-            return
-        
         # Find connected camera/video source
         video_sources = self._find_connected_nodes_reverse(node_id, ['camera', 'videoInput', 'youtube'])
         
         if not video_sources:
             return
         
-        # Get frame from source
-        video_source = video_sources[0]
-        frame = await self._get_frame_from_input(video_source)
+        # Check interval-based throttling
+        check_interval = node_config.get('checkInterval', 5)  # seconds
+        if not self._should_process_node(node_id, 1.0 / check_interval):
+            return
         
-        if frame is None:
+        # Use the frame the source's input loop already read this tick;
+        # reading our own would advance video files and decode twice
+        context = self.frame_contexts.take_new(node_id, video_sources[0]['id'])
+        if context is None:
             return
         
         try:
             # Analyze frame for lighting conditions
-            analysis = self.lighting_analyzer.analyze_frame(
-                frame,
+            # Mean brightness and saturation survive downscaling
+            thumbnail = context.get('thumbnail')
+            brightness, saturation = await get_cpu_pool().run('lighting', thumbnail)
+            analysis = self.lighting_analyzer.analyze_levels(
+                brightness,
+                saturation,
                 brightness_threshold=node_config.get('brightnessThreshold', 0.3),
                 ir_threshold=node_config.get('irThreshold', 0.7),
                 sensitivity=node_config.get('sensitivity', 0.5)
@@ -0,0 +1,213 @@
+"""
+Inference Scheduler
+Weighted fair queuing of model runs across realtime workflows
+
+Every RealtimeWorkflowExecutor asks the scheduler for a slot before running a
+model. Up to `slots` runs proceed at once; when they are all taken, waiting
+runs are granted in start-time fair queuing order, so each workflow gets slots
+in proportion to its weight (its priority class, or an explicit share).
+Workflows may also cap their inferences per second. Runs over that quota, or
+still waiting after max_wait, are shed and counted per workflow.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core.config import settings
+from core.metrics import workflow_inferences_shed
+
+
+logger = logging.getLogger('overwatch.workflows.scheduler')
+
+
+# Slot weight of each priority class
+PRIORITY_WEIGHTS = {
+    'critical': 8.0,
+    'high': 4.0,
+    'normal': 2.0,
+    'low': 1.0
+}
+
+
+class _Client:
+    """A registered workflow's weight, quota and accounting"""
+    
+    def __init__(self, workflow_id: str, priority: str, weight: float, max_rate: Optional[float]):
+        self.workflow_id = workflow_id
+        self.priority = priority
+        self.weight = weight
+        self.max_rate = max_rate
+        self.tokens = max_rate or 0.0
+        self.refilled_at = time.monotonic()
+        self.last_finish = 0.0
+        self.running = 0
+        self.granted = 0
+        self.shed: Dict[str, int] = {'quota': 0, 'wait': 0}
+        
+    def take_token(self) -> bool:
+        """Token bucket with one second of burst"""
+        if not self.max_rate:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.max_rate, self.tokens + (now - self.refilled_at) * self.max_rate)
+        self.refilled_at = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class InferenceScheduler:
+    """Shares inference slots between workflows by weight"""
+    
+    def __init__(self, slots: int = 8, max_wait: float = 1.0):
+        """
+        Args:
+            slots: Model runs allowed at once across all workflows
+            max_wait: Seconds a run may wait for a slot before it is shed
+        """
+        self.slots = max(1, slots)
+        self.max_wait = max_wait
+        self._clients: Dict[str, _Client] = {}
+        self._busy = 0
+        self._virtual_time = 0.0
+        # (finish tag, order, start tag, workflow id, future)
+        self._waiting: List[Tuple[float, int, float, str, asyncio.Future]] = []
+        self._order = itertools.count()
+        
+    def register(
+        self,
+        workflow_id: str,
+        priority: str = 'normal',
+        max_inferences_per_second: Optional[float] = None,
+        share: Optional[float] = None
+    ):
+        """
+        Declare a workflow's priority class and inference budget
+        
+        Args:
+            priority: One of PRIORITY_WEIGHTS
+            max_inferences_per_second: Model runs per second before shedding (None = no cap)
+            share: Explicit slot weight, overriding the priority class
+        """
+        if priority not in PRIORITY_WEIGHTS:
+            logger.warning(f"Unknown priority '{priority}' for workflow {workflow_id}, using 'normal'")
+            priority = 'normal'
+        weight = share if share and share > 0 else PRIORITY_WEIGHTS[priority]
+        client = _Client(workflow_id, priority, weight, max_inferences_per_second)
+        # Start level with the others rather than ahead of them
+        client.last_finish = self._virtual_time
+        self._clients[workflow_id] = client
+        
+    def unregister(self, workflow_id: str):
+        """Forget a workflow; slots its runs still hold are freed now"""
+        client = self._clients.pop(workflow_id, None)
+        if client is not None:
+            self._busy -= client.running
+            self._dispatch()
+            
+    async def acquire(self, workflow_id: str) -> bool:
+        """
+        Wait for an inference slot
+        
+        Returns:
+            True if granted (call release() when done), False if the run
+            was shed
+        """
+        client = self._clients.get(workflow_id)
+        if client is None:
+            # Unregistered callers are not scheduled
+            return True
+            
+        if not client.take_token():
+            self._shed(client, 'quota')
+            return False
+            
+        start = max(self._virtual_time, client.last_finish)
+        client.last_finish = start + 1.0 / client.weight
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (client.last_finish, next(self._order), start, workflow_id, future))
+        self._dispatch()
+        if future.done():
+            return True
+            
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+            return True
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Granted just as the wait ran out
+                return True
+            # Give back the virtual time the shed run had reserved
+            client.last_finish = max(start, client.last_finish - 1.0 / client.weight)
+            self._shed(client, 'wait')
+            return False
+            
+    def release(self, workflow_id: str):
+        """Return a slot taken by a granted acquire()"""
+        client = self._clients.get(workflow_id)
+        if client is None:
+            return
+        client.running -= 1
+        self._busy -= 1
+        self._dispatch()
+        
+    def _dispatch(self):
+        """Grant free slots to waiting runs, smallest finish tag first"""
+        while self._waiting and self._busy < self.slots:
+            _, _, start, waiting_id, future = heapq.heappop(self._waiting)
+            waiter = self._clients.get(waiting_id)
+            if future.done() or waiter is None:
+                continue
+            self._virtual_time = max(self._virtual_time, start)
+            self._grant(waiter)
+            future.set_result(True)
+            
+    def _grant(self, client: _Client):
+        self._busy += 1
+        client.running += 1
+        client.granted += 1
+        
+    def _shed(self, client: _Client, reason: str):
+        client.shed[reason] += 1
+        workflow_inferences_shed.labels(workflow_id=client.workflow_id, reason=reason).inc()
+        
+    def get_stats(self) -> dict:
+        """Slot use and per-workflow grants and shed runs"""
+        return {
+            'slots': self.slots,
+            'busy': self._busy,
+            'waiting': sum(1 for item in self._waiting if not item[4].done()),
+            'workflows': {
+                client.workflow_id: {
+                    'priority': client.priority,
+                    'weight': client.weight,
+                    'max_inferences_per_second': client.max_rate,
+                    'running': client.running,
+                    'granted': client.granted,
+                    'shed': dict(client.shed)
+                }
+                for client in self._clients.values()
+            }
+        }
+
+
+# Global scheduler instance
+_scheduler: Optional[InferenceScheduler] = None
+
+
+def get_inference_scheduler() -> InferenceScheduler:
+    """Get global inference scheduler instance"""
+    global _scheduler
+    
+    if _scheduler is None:
+        _scheduler = InferenceScheduler(
+            slots=settings.INFERENCE_SCHEDULER_SLOTS,
+            max_wait=settings.INFERENCE_SCHEDULER_MAX_WAIT
+        )
+        
+    return _scheduler
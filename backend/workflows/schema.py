@@ -29,7 +29,11 @@ CAMERA_NODE_SCHEMA = {
                 "videoPath": {"type": "string"},
                 "youtubeUrl": {"type": "string"},
                 "fps": {"type": "number", "minimum": 1, "maximum": 30, "default": 10},
-                "skipSimilar": {"type": "boolean", "default": False}
+                "minFps": {"type": "number", "minimum": 0.1, "description": "Lowest adaptive fps (default 1)"},
+                "maxFps": {"type": "number", "minimum": 1, "maximum": 60, "description": "Highest adaptive fps (default fps)"},
+                "skipSimilar": {"type": "boolean", "default": False},
+                "reuseMaxFrames": {"type": "integer", "minimum": 0, "default": 30, "description": "Skipped frames the last detections are re-sent for (0 = off)"},
+                "reuseTrack": {"type": "boolean", "default": False, "description": "Shift re-sent boxes by the motion since they were detected"}
             }
         }
     }
@@ -108,6 +112,47 @@ ZONE_NODE_SCHEMA = {
     }
 }
 
+# Motion Gate Node Schema
+MOTION_GATE_NODE_SCHEMA = {
+    "type": "object",
+    "required": ["id", "type", "position", "data"],
+    "properties": {
+        "id": {"type": "string"},
+        "type": {"type": "string", "enum": ["motionGate"]},
+        "position": {
+            "type": "object",
+            "properties": {
+                "x": {"type": "number"},
+                "y": {"type": "number"}
+            },
+            "required": ["x", "y"]
+        },
+        "data": {
+            "type": "object",
+            "properties": {
+                "threshold": {"type": "number", "minimum": 0, "maximum": 1, "default": 0.01, "description": "Fraction of moving pixels that counts as motion"},
+                "pixelThreshold": {"type": "integer", "minimum": 1, "maximum": 255, "default": 25},
+                "keepalive": {"type": "number", "minimum": 0, "default": 10, "description": "Pass a frame at least this often in seconds (0 = never)"},
+                "learningRate": {"type": "number", "minimum": 0, "maximum": 1, "default": 0.05},
+                "zones": {
+                    "type": "array",
+                    "items": {
+                        "type": "array",
+                        "items": {
+                            "type": "array",
+                            "items": {"type": "number"},
+                            "minItems": 2,
+                            "maxItems": 2
+                        },
+                        "minItems": 3
+                    },
+                    "description": "Polygons of [x, y] coordinates to watch; whole frame if empty"
+                }
+            }
+        }
+    }
+}
+
 # Action Node Schemas
 EMAIL_ACTION_SCHEMA = {
     "type": "object",
@@ -283,7 +328,7 @@ CONFIG_NODE_SCHEMA = {
             "type": "object",
             "required": ["config"],
             "properties": {
-                "configType": {"type": "string", "enum": ["generic", "model", "webhook", "record", "email"]},
+                "configType": {"type": "string", "enum": ["generic", "model", "webhook", "record", "email", "scheduling"]},
                 "configName": {"type": "string"},
                 "description": {"type": "string"},
                 "config": {"type": "object", "description": "Configuration JSON object"}
@@ -528,6 +573,7 @@ WORKFLOW_GRAPH_SCHEMA = {
                     CAMERA_NODE_SCHEMA,
                     MODEL_NODE_SCHEMA,
                     ZONE_NODE_SCHEMA,
+                    MOTION_GATE_NODE_SCHEMA,
                     ACTION_NODE_SCHEMA,
                     LINK_IN_NODE_SCHEMA,
                     LINK_OUT_NODE_SCHEMA,
@@ -625,6 +671,14 @@ PORT_COMPATIBILITY = {
             "filtered-output": ["detections"]
         }
     },
+    "motionGate": {
+        "inputs": {
+            "video-input": ["video"]
+        },
+        "outputs": {
+            "video-output": ["video"]
+        }
+    },
     "audioExtractor": {
         "inputs": {
             "video-input": ["video"]
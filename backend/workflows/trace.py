@@ -0,0 +1,188 @@
+"""
+Workflow Trace Ring
+Fixed-size record of a workflow's hot-path events
+
+Per-frame events (model runs, output sends, WebSocket broadcasts) are
+written into a preallocated ring of fixed-size tuples instead of being
+logged one line at a time. The ring can be dumped on demand through
+GET /api/workflow-builder/{id}/trace. Only one aggregated summary line per
+log interval reaches the Python logger, plus optional sampled lines at
+DEBUG.
+"""
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core.config import settings
+
+
+logger = logging.getLogger('overwatch.workflows.trace')
+
+
+# (timestamp, event, node id, value, detail)
+TraceEntry = Tuple[float, str, Optional[str], float, Optional[str]]
+
+
+class TraceRing:
+    """Preallocated ring of hot-path trace entries for one workflow"""
+    
+    def __init__(
+        self,
+        workflow_id: str,
+        capacity: int = 4096,
+        log_interval: float = 10.0,
+        sample_every: int = 0
+    ):
+        """
+        Args:
+            capacity: Entries kept; the oldest are overwritten
+            log_interval: Seconds between aggregated summary log lines (0 = never)
+            sample_every: Also log every Nth entry of each event at DEBUG (0 = never)
+        """
+        self.workflow_id = workflow_id
+        self.capacity = max(1, capacity)
+        self.log_interval = log_interval
+        self.sample_every = sample_every
+        self._entries: List[Optional[TraceEntry]] = [None] * self.capacity
+        self._next = 0
+        self.recorded = 0
+        # Per event: [count, value sum] since startup and since the last summary
+        self._totals: Dict[str, List[float]] = {}
+        self._window: Dict[str, List[float]] = {}
+        self._logged_at = time.monotonic()
+        
+    def record(
+        self,
+        event: str,
+        node_id: Optional[str] = None,
+        value: float = 0.0,
+        detail: Optional[str] = None
+    ):
+        """
+        Record one event
+        
+        Args:
+            event: Short event name, e.g. 'inference' or 'broadcast'
+            value: One number for the event (a count or a duration in ms)
+            detail: Short optional text; keep it small, it is stored as is
+        """
+        entry = (time.time(), event, node_id, value, detail)
+        self._entries[self._next] = entry
+        self._next += 1
+        if self._next == self.capacity:
+            self._next = 0
+        self.recorded += 1
+        
+        window = self._window.get(event)
+        if window is None:
+            window = self._window[event] = [0, 0.0]
+        window[0] += 1
+        window[1] += value
+        
+        if self.sample_every and window[0] % self.sample_every == 0:
+            logger.debug(f"Workflow {self.workflow_id} trace: {event} node={node_id} value={value} {detail or ''}")
+            
+        if self.log_interval:
+            now = time.monotonic()
+            if now - self._logged_at >= self.log_interval:
+                self._log_summary(now)
+                
+    def _log_summary(self, now: float):
+        """Log one line with per-event counts and mean values, then start a new window"""
+        elapsed = now - self._logged_at
+        self._logged_at = now
+        parts = []
+        for event, (count, total) in sorted(self._window.items()):
+            parts.append(f"{event}={count} (avg {total / count:.1f})")
+            totals = self._totals.setdefault(event, [0, 0.0])
+            totals[0] += count
+            totals[1] += total
+        self._window = {}
+        logger.info(f"Workflow {self.workflow_id} trace over {elapsed:.0f}s: {', '.join(parts)}")
+        
+    def dump(self, limit: Optional[int] = None, event: Optional[str] = None) -> List[dict]:
+        """
+        Recorded entries, oldest first
+        
+        Args:
+            limit: Only the newest N entries (after filtering)
+            event: Only entries of this event
+        """
+        entries = self._entries[self._next:] + self._entries[:self._next]
+        selected = [
+            entry for entry in entries
+            if entry is not None and (event is None or entry[1] == event)
+        ]
+        if limit is not None:
+            selected = selected[-limit:] if limit > 0 else []
+        return [
+            {
+                'timestamp': timestamp,
+                'event': name,
+                'node_id': node_id,
+                'value': value,
+                'detail': detail
+            }
+            for timestamp, name, node_id, value, detail in selected
+        ]
+        
+    def get_stats(self) -> dict:
+        """Ring size and per-event counts since startup"""
+        events = {}
+        for source in (self._totals, self._window):
+            for event, (count, total) in source.items():
+                stats = events.setdefault(event, {'count': 0, 'total': 0.0})
+                stats['count'] += count
+                stats['total'] += total
+        return {
+            'capacity': self.capacity,
+            'recorded': self.recorded,
+            'held': min(self.recorded, self.capacity),
+            'events': {
+                event: {'count': stats['count'], 'avg_value': round(stats['total'] / stats['count'], 3)}
+                for event, stats in events.items()
+            }
+        }
+
+
+# Rings of running workflows by workflow id
+_rings: Dict[str, TraceRing] = {}
+
+
+def create_trace_ring(workflow_id: str) -> TraceRing:
+    """Create a ring sized from settings (not registered yet)"""
+    return TraceRing(
+        workflow_id,
+        capacity=settings.TRACE_RING_SIZE,
+        log_interval=settings.TRACE_LOG_INTERVAL,
+        sample_every=settings.TRACE_LOG_SAMPLE
+    )
+
+
+def register_trace_ring(ring: TraceRing):
+    """Make a running workflow's ring visible to trace() and the API"""
+    _rings[ring.workflow_id] = ring
+
+
+def get_trace_ring(workflow_id: Optional[str]) -> Optional[TraceRing]:
+    """Ring of a running workflow, or None"""
+    return _rings.get(workflow_id) if workflow_id else None
+
+
+def remove_trace_ring(ring: TraceRing):
+    """Forget a stopped workflow's ring (unless it was already replaced)"""
+    if _rings.get(ring.workflow_id) is ring:
+        del _rings[ring.workflow_id]
+
+
+def trace(
+    workflow_id: Optional[str],
+    event: str,
+    node_id: Optional[str] = None,
+    value: float = 0.0,
+    detail: Optional[str] = None
+):
+    """Record an event in a workflow's ring if it has one"""
+    ring = _rings.get(workflow_id) if workflow_id else None
+    if ring is not None:
+        ring.record(event, node_id, value, detail)
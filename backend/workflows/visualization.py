@@ -8,6 +8,8 @@ import numpy as np
 from typing import List, Dict, Tuple, Optional
 import colorsys
 
+from stream.kernels import render_heatmap
+
 
 # Color schemes for X-RAY mode
 COLOR_SCHEMES = {
@@ -277,41 +279,7 @@ class DetectionVisualizer:
         schematic_mode: bool = False
     ) -> np.ndarray:
         """Draw heatmap of detection locations"""
-        h, w = frame.shape[:2]
-        heatmap = np.zeros((h, w), dtype=np.float32)
-        
-        # Add Gaussian blobs for each detection
-        for det in detections:
-            bbox = det.get('bbox', {})
-            if not bbox:
-                continue
-            
-            cx = int(bbox.get('x', 0) + bbox.get('width', 0) / 2)
-            cy = int(bbox.get('y', 0) + bbox.get('height', 0) / 2)
-            
-            # Create Gaussian blob
-            sigma = max(bbox.get('width', 50), bbox.get('height', 50)) / 3
-            y, x = np.ogrid[:h, :w]
-            gaussian = np.exp(-((x - cx)**2 + (y - cy)**2) / (2 * sigma**2))
-            heatmap += gaussian
-        
-        # Normalize
-        if heatmap.max() > 0:
-            heatmap = heatmap / heatmap.max()
-        
-        # Apply colormap
-        heatmap_colored = cv2.applyColorMap(
-            (heatmap * 255).astype(np.uint8),
-            colormap
-        )
-        
-        if schematic_mode:
-            # Pure heatmap on black background
-            return heatmap_colored
-        else:
-            # Blend with original frame
-            annotated = cv2.addWeighted(frame, 1 - alpha, heatmap_colored, alpha, 0)
-            return annotated
+        return render_heatmap(frame, detections, alpha, colormap, schematic_mode)
     
     def draw_zones(
         self,
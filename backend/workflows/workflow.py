@@ -2,6 +2,7 @@
 Workflow
 Individual workflow implementation
 """
+import asyncio
 import logging
 import time
 from typing import Dict, List, Optional
@@ -10,7 +11,9 @@ import uuid
 
 import numpy as np
 
-from models import get_model
+from models import acquire_model
+from stream.frame_meta import FrameMeta, observe_stage
+from stream.motion_gate import MotionGate
 from .snapshot import SnapshotHandler
 
 
@@ -38,47 +41,65 @@ class Workflow:
         self.processing = config.get('processing', {})
         self.target_fps = self.processing.get('fps', 10)
         self.skip_similar = self.processing.get('skip_similar', False)
+        # Motion gate options (`motion_gate: true` for the defaults)
+        motion_gate = self.processing.get('motion_gate', False)
+        self.motion_gate: Optional[dict] = {} if motion_gate is True else motion_gate or None
         
         # Actions
         self.actions = config.get('actions', [])
         
         # State
         self.last_process_time: Dict[str, float] = {}
+        self.motion_gates: Dict[str, MotionGate] = {}
         self.frame_count = 0
         self.detection_count = 0
         
         # Snapshot handler
         self.snapshot_handler = SnapshotHandler()
         
+        # Set by WorkflowEngine; provides camera streams for clip recording
+        self.stream_manager = None
+        self._recording_tasks = set()
+        
     async def initialize(self):
         """Initialize the workflow"""
         logger.info(f"Initializing workflow: {self.workflow_id}")
         
-        # Load model
+        # Load model (shared with other workflows using the same one)
         if self.model_id:
-            self.model = await get_model(self.model_id, self.config)
+            self.model = await acquire_model(self.model_id, self.config)
             
     async def process_frame(
         self,
         camera_id: str,
         frame: np.ndarray,
-        timestamp: datetime
+        timestamp: datetime,
+        frame_meta: Optional[FrameMeta] = None
     ):
         """Process a frame"""
         # Check FPS throttling
         if not self._should_process(camera_id):
             return
             
+        # Skip inference while the scene is static
+        if not self._has_motion(camera_id, frame):
+            return
+            
         self.frame_count += 1
         
         # Run detection
         detections = await self._run_detection(frame)
+        observe_stage(frame_meta, 'inference')
         
         if not detections:
             return
             
         self.detection_count += len(detections)
         
+        if frame_meta is not None:
+            for detection in detections:
+                detection['frame_id'] = frame_meta.frame_id
+                
         # Execute actions
         await self._execute_actions(
             camera_id=camera_id,
@@ -86,6 +107,27 @@ class Workflow:
             frame=frame,
             timestamp=timestamp
         )
+        observe_stage(frame_meta, 'actions')
+        
+    def _has_motion(self, camera_id: str, frame: np.ndarray) -> bool:
+        """Check the camera's motion gate, if the workflow has one"""
+        if self.motion_gate is None:
+            return True
+            
+        gate = self.motion_gates.get(camera_id)
+        if gate is None:
+            options = self.motion_gate
+            gate = MotionGate(
+                camera_id,
+                self.workflow_id,
+                threshold=options.get('threshold', 0.01),
+                pixel_threshold=options.get('pixel_threshold', 25),
+                keepalive=options.get('keepalive', 10.0),
+                learning_rate=options.get('learning_rate', 0.05),
+                zones=options.get('zones')
+            )
+            self.motion_gates[camera_id] = gate
+        return gate.check(frame)
         
     async def _run_detection(self, frame: np.ndarray) -> List[dict]:
         """Run model detection on frame"""
@@ -285,18 +327,23 @@ class Workflow:
         
         logger.info(f"Recording {duration}s clip from {camera_id} to {recording_path}")
         
-        # Note: This is a basic implementation
-        # In production, this should pull from StreamManager's ring buffer
-        # and encode the buffered frames + future frames for the duration
-        
+        # Remux the stream's compressed packet ring (pre-event + live)
+        stream = self.stream_manager.streams.get(camera_id) if self.stream_manager else None
+        if stream is not None and hasattr(stream, 'record_clip'):
+            task = asyncio.create_task(
+                stream.record_clip(str(recording_path), pre_buffer=pre_buffer, duration=duration)
+            )
+            # Recording runs in the background so frame processing continues
+            self._recording_tasks.add(task)
+            task.add_done_callback(self._recording_tasks.discard)
+            return str(recording_path)
+            
+        # No stream to record from: save the triggering frame only
         try:
-            # For now, just save a single frame as a placeholder
-            # TODO: Integrate with StreamManager to get buffered frames
             height, width = frame.shape[:2]
             fourcc = cv2.VideoWriter_fourcc(*'mp4v')
             out = cv2.VideoWriter(str(recording_path), fourcc, 10.0, (width, height))
             
-            # Write the current frame (placeholder)
             out.write(frame)
             out.release()
             
@@ -376,6 +423,13 @@ class Workflow:
         
     async def cleanup(self):
         """Cleanup resources"""
+        # Cancelled recordings keep what they captured so far; wait for
+        # them to finish writing so the clips stay playable
+        tasks = list(self._recording_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+            
         if self.model:
             await self.model.cleanup()
 
@@ -0,0 +1,26 @@
+"""
+Shared test fixtures
+"""
+import cv2
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def make_video_file(tmp_path):
+    """Factory for small MJPG clips whose frames are solid, increasing grey levels"""
+    def make(frames: int = 20, step: int = 10) -> str:
+        path = str(tmp_path / 'clip.avi')
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+        if not writer.isOpened():
+            pytest.skip("MJPG writer not available")
+        for value in range(frames):
+            writer.write(np.full((48, 64, 3), value * step, dtype=np.uint8))
+        writer.release()
+        return path
+    return make
+
+
+@pytest.fixture
+def video_file(make_video_file):
+    return make_video_file()
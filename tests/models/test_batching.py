@@ -0,0 +1,146 @@
+"""
+Tests for dynamic batching of detect() calls
+"""
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+# The models package imports every plugin, and with them torch
+pytest.importorskip('torch')
+
+from models.batching import BatchingInferenceServer
+
+
+class FakeBatchModel:
+    """Returns each frame's value as its only detection"""
+    
+    model_id = 'fake'
+    
+    def __init__(self, delay: float = 0.0, error: Exception = None, max_results: int = None):
+        self.delay = delay
+        self.error = error
+        self.max_results = max_results
+        self.batch_sizes = []
+        
+    async def detect_batch(self, frames):
+        self.batch_sizes.append(len(frames))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [[{'value': int(frame[0])}] for frame in frames][:self.max_results]
+
+
+def frame(value: int) -> np.ndarray:
+    return np.full((1,), value)
+
+
+def test_batches_are_capped_at_max_batch():
+    """A burst of frames is split into batches of at most max_batch"""
+    async def run():
+        model = FakeBatchModel()
+        server = BatchingInferenceServer(model, max_batch=4, max_wait_ms=50.0)
+        await asyncio.gather(*(server.detect(frame(i)) for i in range(10)))
+        await server.stop()
+        return model.batch_sizes, server.get_stats()
+        
+    batch_sizes, stats = asyncio.run(run())
+    assert batch_sizes == [4, 4, 2]
+    assert stats['batches'] == 3
+    assert stats['avg_batch_size'] == round(10 / 3, 2)
+
+
+def test_lone_request_is_flushed_after_max_wait():
+    """A single frame does not wait for a full batch longer than max_wait_ms"""
+    async def run():
+        model = FakeBatchModel()
+        server = BatchingInferenceServer(model, max_batch=8, max_wait_ms=30.0)
+        started = time.monotonic()
+        detections = await asyncio.wait_for(server.detect(frame(7)), 1.0)
+        elapsed = time.monotonic() - started
+        await server.stop()
+        return model.batch_sizes, detections, elapsed
+        
+    batch_sizes, detections, elapsed = asyncio.run(run())
+    assert batch_sizes == [1]
+    assert detections == [{'value': 7}]
+    assert 0.025 <= elapsed < 0.5
+
+
+def test_results_go_to_their_caller():
+    """Each caller gets the detections of its own frame"""
+    async def run():
+        server = BatchingInferenceServer(FakeBatchModel(), max_batch=8, max_wait_ms=20.0)
+        
+        async def call(value):
+            # Stagger arrivals so the batch order differs from creation order
+            await asyncio.sleep((value % 3) * 0.002)
+            return value, await server.detect(frame(value))
+            
+        results = await asyncio.gather(*(call(value) for value in range(8)))
+        await server.stop()
+        return results
+        
+    for value, detections in asyncio.run(run()):
+        assert detections == [{'value': value}]
+
+
+def test_forward_pass_error_reaches_every_caller():
+    """A failed batch fails each request in it, and the server keeps serving"""
+    async def run():
+        model = FakeBatchModel(error=ValueError('out of memory'))
+        server = BatchingInferenceServer(model, max_batch=4, max_wait_ms=20.0)
+        results = await asyncio.gather(
+            *(server.detect(frame(i)) for i in range(3)),
+            return_exceptions=True
+        )
+        
+        model.error = None
+        after = await server.detect(frame(5))
+        await server.stop()
+        return model.batch_sizes, results, after
+        
+    batch_sizes, results, after = asyncio.run(run())
+    assert batch_sizes[0] == 3
+    assert all(isinstance(result, ValueError) for result in results)
+    assert after == [{'value': 5}]
+
+
+def test_missing_results_fail_their_callers():
+    """Frames the model returned no result for fail instead of waiting forever"""
+    async def run():
+        server = BatchingInferenceServer(FakeBatchModel(max_results=2), max_batch=4, max_wait_ms=20.0)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(server.detect(frame(i)) for i in range(3)), return_exceptions=True),
+            1.0
+        )
+        await server.stop()
+        return results
+        
+    results = asyncio.run(run())
+    assert results[:2] == [[{'value': 0}], [{'value': 1}]]
+    assert isinstance(results[2], RuntimeError)
+
+def test_stop_fails_pending_requests():
+    """stop() fails running, queued and still-collecting requests instead of leaving them waiting"""
+    async def run():
+        # One batch of two is running, the third frame is queued behind it
+        busy = BatchingInferenceServer(FakeBatchModel(delay=5.0), max_batch=2, max_wait_ms=1.0)
+        running = [asyncio.create_task(busy.detect(frame(i))) for i in range(3)]
+        
+        # A lone frame waiting for its batch to fill
+        idle = BatchingInferenceServer(FakeBatchModel(), max_batch=4, max_wait_ms=5000.0)
+        collecting = asyncio.create_task(idle.detect(frame(9)))
+        
+        await asyncio.sleep(0.05)
+        await busy.stop()
+        await idle.stop()
+        return await asyncio.wait_for(
+            asyncio.gather(*running, collecting, return_exceptions=True),
+            1.0
+        )
+        
+    results = asyncio.run(run())
+    assert len(results) == 4
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,187 @@
+"""
+Tests for the shared model pool
+"""
+import asyncio
+
+import pytest
+
+# The models package imports every plugin, and with them torch
+pytest.importorskip('torch')
+
+from models.pool import ModelPool
+
+
+class FakeWeights:
+    """Stands in for a torch tensor of nbytes one-byte elements"""
+    
+    def __init__(self, nbytes: int):
+        self.nbytes = nbytes
+        
+    def numel(self) -> int:
+        return self.nbytes
+        
+    def element_size(self) -> int:
+        return 1
+
+
+class FakeNet:
+    def __init__(self, nbytes: int):
+        self.weights = [FakeWeights(nbytes)]
+        
+    def parameters(self):
+        return list(self.weights)
+        
+    def buffers(self):
+        return []
+
+
+class FakeModel:
+    def __init__(self, model_id: str, nbytes: int):
+        self.model_id = model_id
+        self.model = FakeNet(nbytes)
+        self.unloaded = False
+        
+    async def detect(self, frame):
+        return [{'model': self.model_id}]
+        
+    async def cleanup(self):
+        self.unloaded = True
+
+
+class FakeLoader:
+    """Loader recording every model it creates"""
+    
+    def __init__(self, sizes: dict = None):
+        self.sizes = sizes or {}
+        self.loaded = []
+        
+    async def __call__(self, model_id: str, config: dict):
+        # Loading takes a while, so concurrent acquires overlap
+        await asyncio.sleep(0.01)
+        model = FakeModel(model_id, self.sizes.get(model_id, 0))
+        self.loaded.append((model_id, config, model))
+        return model
+
+
+def loaded_ids(pool: ModelPool) -> list:
+    return sorted(stats['model_id'] for stats in pool.get_stats())
+
+
+def test_concurrent_acquires_share_one_load():
+    """Two workflows asking for the same model at once get one loaded copy"""
+    async def run():
+        loader = FakeLoader()
+        pool = ModelPool(loader)
+        first, second = await asyncio.gather(pool.acquire('yolo'), pool.acquire('yolo'))
+        
+        assert len(loader.loaded) == 1
+        assert first.model is second.model
+        assert await first.detect(None) == [{'model': 'yolo'}]
+        assert pool.get_stats()[0]['references'] == 2
+        await pool.shutdown()
+        
+    asyncio.run(run())
+
+
+def test_released_model_is_evicted_after_idle_timeout():
+    """A model nobody holds stays warm for idle_timeout, then unloads"""
+    async def run():
+        loader = FakeLoader()
+        pool = ModelPool(loader, idle_timeout=0.05)
+        handle = await pool.acquire('yolo')
+        await handle.cleanup()
+        await handle.cleanup()
+        
+        # Still warm: reacquiring does not reload
+        assert pool.get_stats()[0]['references'] == 0
+        handle = await pool.acquire('yolo')
+        assert len(loader.loaded) == 1
+        await handle.cleanup()
+        
+        await asyncio.sleep(0.1)
+        assert pool.get_stats() == []
+        assert loader.loaded[0][2].unloaded
+        
+    asyncio.run(run())
+
+
+def test_least_recently_used_idle_model_is_evicted_over_budget():
+    """Loading past max_bytes unloads the longest idle model first"""
+    async def run():
+        loader = FakeLoader({'a': 100, 'b': 100, 'c': 100})
+        pool = ModelPool(loader, idle_timeout=60.0, max_bytes=250)
+        for model_id in ('a', 'b'):
+            handle = await pool.acquire(model_id)
+            await handle.cleanup()
+            await asyncio.sleep(0.01)
+            
+        held = await pool.acquire('c')
+        assert loaded_ids(pool) == ['b', 'c']
+        assert pool.total_bytes() == 200
+        
+        # Models in use are never evicted, even over budget
+        extra = await pool.acquire('b')
+        other = await pool.acquire('a')
+        assert loaded_ids(pool) == ['a', 'b', 'c']
+        
+        for handle in (held, extra, other):
+            await handle.cleanup()
+        await pool.shutdown()
+        
+    asyncio.run(run())
+
+
+def test_significant_config_keys_load_separate_copies():
+    """Configs differing in pool_config_keys get their own model"""
+    class Plugin:
+        pool_config_keys = ['weights']
+        
+    async def run():
+        loader = FakeLoader()
+        pool = ModelPool(loader)
+        small = await pool.acquire('yolo', {'weights': 'n.pt', 'confidence': 0.5}, Plugin)
+        same = await pool.acquire('yolo', {'weights': 'n.pt', 'confidence': 0.7}, Plugin)
+        large = await pool.acquire('yolo', {'weights': 'x.pt'}, Plugin)
+        
+        assert small.model is same.model
+        assert small.model is not large.model
+        assert [config['weights'] for _, config, _ in loader.loaded] == ['n.pt', 'x.pt']
+        await pool.shutdown()
+        
+    asyncio.run(run())
+
+
+def test_private_copy_is_unloaded_on_release():
+    """Non-shared plugins get a copy per holder, unloaded as soon as it is released"""
+    class Tracker:
+        shared = False
+        
+    async def run():
+        loader = FakeLoader()
+        pool = ModelPool(loader, idle_timeout=60.0)
+        first = await pool.acquire('tracker', {}, Tracker)
+        second = await pool.acquire('tracker', {}, Tracker)
+        assert first.model is not second.model
+        
+        await first.cleanup()
+        assert len(pool.get_stats()) == 1
+        assert loader.loaded[0][2].unloaded
+        await pool.shutdown()
+        
+    asyncio.run(run())
+
+
+def test_shutdown_unloads_models_still_held():
+    """shutdown() unloads every model regardless of references"""
+    async def run():
+        loader = FakeLoader()
+        pool = ModelPool(loader, idle_timeout=60.0)
+        await pool.acquire('a')
+        handle = await pool.acquire('b')
+        await handle.cleanup()
+        
+        await pool.shutdown()
+        assert pool.get_stats() == []
+        assert all(model.unloaded for _, _, model in loader.loaded)
+        
+    asyncio.run(run())
@@ -0,0 +1,60 @@
+"""
+Tests for the CPU kernel process pool
+"""
+import asyncio
+
+import cv2
+import numpy as np
+import pytest
+
+from stream.cpu_pool import CpuPool
+from stream.kernels import fire_color_detections
+
+
+def make_fire_frame() -> np.ndarray:
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    cv2.rectangle(frame, (40, 30), (100, 90), (0, 80, 255), -1)
+    return frame
+
+
+def test_process_and_thread_results_match():
+    """A kernel run in a worker process returns what it returns in a thread"""
+    frame = make_fire_frame()
+    pool = CpuPool(workers=1, kernels=['fire_color'], max_frame_bytes=frame.nbytes)
+    
+    async def run():
+        return await asyncio.gather(*(pool.run('fire_color', frame, min_area=100) for _ in range(3)))
+        
+    try:
+        results = asyncio.run(run())
+    finally:
+        pool.shutdown()
+        
+    expected = fire_color_detections(frame, min_area=100)
+    assert len(expected) == 1
+    assert all(result == expected for result in results)
+    assert pool.get_stats()['kernels']['fire_color'] == {'process': 3, 'thread': 0, 'fallback': 0}
+
+
+def test_oversized_frames_and_unlisted_kernels_use_threads():
+    """Only listed kernels on frames that fit shared memory go to processes"""
+    frame = make_fire_frame()
+    pool = CpuPool(workers=1, kernels=['fire_color'], max_frame_bytes=frame.nbytes - 1)
+    
+    async def run():
+        await pool.run('fire_color', frame)
+        return await pool.run('lighting', frame)
+        
+    brightness, saturation = asyncio.run(run())
+    
+    assert 0.0 < brightness < 1.0 and 0.0 < saturation < 1.0
+    stats = pool.get_stats()
+    assert not stats['started']
+    assert stats['kernels']['fire_color']['thread'] == 1
+    assert stats['kernels']['lighting']['thread'] == 1
+
+
+def test_unknown_kernel_is_rejected():
+    """Misspelled kernel names fail at construction"""
+    with pytest.raises(ValueError):
+        CpuPool(workers=1, kernels=['fire_colour'])
@@ -0,0 +1,206 @@
+"""
+Tests for per-camera decoder threads
+"""
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from stream.decoder import DecodeThread, get_decoder_stats
+from stream.frame_buffer import FrameBuffer
+
+
+def test_decoder_wakes_async_consumer(video_file):
+    """Consumers awaiting wait_for_frame() see frames from the reader thread"""
+    buffer = FrameBuffer(max_size=3)
+    decoder = DecodeThread('test', video_file, buffer, reconnect_delay=0.1)
+    
+    async def consume():
+        seqs = []
+        seq = 0
+        while len(seqs) < 5:
+            seq, frame = await decoder.wait_for_frame(seq, timeout=5.0)
+            assert frame is not None
+            assert not frame.flags.writeable
+            seqs.append(seq)
+        return seqs
+        
+    decoder.start()
+    try:
+        seqs = asyncio.run(consume())
+        assert seqs == sorted(set(seqs))
+        assert get_decoder_stats()['alive'] >= 1
+    finally:
+        decoder.stop()
+        
+    assert not decoder.is_alive()
+    assert decoder.get_status()['frames_decoded'] >= 5
+
+
+def test_wait_times_out_without_frames():
+    """wait_for_frame() returns no frame when nothing is published in time"""
+    decoder = DecodeThread('idle', 'unused', FrameBuffer(max_size=2))
+    
+    seq, frame = asyncio.run(decoder.wait_for_frame(0, timeout=0.05))
+    
+    assert (seq, frame) == (0, None)
+    assert decoder.notifier.waiter_count() == 0
+
+
+def test_target_fps_skips_decoding(video_file):
+    """Frames beyond the target rate are grabbed but never decoded"""
+    buffer = FrameBuffer(max_size=3)
+    decoder = DecodeThread('paced', video_file, buffer, reconnect_delay=0.1)
+    decoder.set_target_fps(1)
+    
+    decoder.start()
+    try:
+        seq, frame = asyncio.run(decoder.wait_for_frame(0, timeout=5.0))
+        assert frame is not None
+        deadline = time.time() + 5.0
+        while decoder.frames_skipped < 10 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        decoder.stop()
+        
+    # The clip is read much faster than 1 fps, so almost all frames are skipped
+    assert decoder.frames_skipped >= 10
+    assert decoder.frames_decoded < decoder.frames_skipped
+
+
+def test_standby_decoder_publishes_only_after_promote(video_file):
+    """A replacement decoder decodes in standby without touching the ring"""
+    buffer = FrameBuffer(max_size=3)
+    decoder = DecodeThread('standby', video_file, buffer, reconnect_delay=0.1)
+    decoder.standby = True
+    
+    decoder.start()
+    try:
+        assert decoder.ready.wait(5.0)
+        assert buffer.sequence == 0
+        
+        decoder.promote()
+        seq, frame = asyncio.run(decoder.wait_for_frame(0, timeout=5.0))
+    finally:
+        decoder.stop()
+        
+    assert frame is not None
+    assert seq >= 1
+
+
+def test_stopped_decoder_no_longer_writes():
+    """A thread unblocking after stop() leaves the ring to its replacement"""
+    buffer = FrameBuffer(max_size=3)
+    decoder = DecodeThread('stopped', 'unused', buffer)
+    decoder.stop()
+    
+    assert decoder._publish(np.zeros((4, 4, 3), dtype=np.uint8)) == 0
+    assert buffer.sequence == 0
+
+
+@pytest.fixture
+def av_file(tmp_path):
+    av = pytest.importorskip('av')
+    path = str(tmp_path / 'clip.mkv')
+    
+    container = av.open(path, 'w')
+    video = container.add_stream('mpeg4', rate=10)
+    video.width, video.height, video.pix_fmt = 64, 48, 'yuv420p'
+    audio = container.add_stream('mp2', rate=48000)
+    audio.layout = 'mono'
+    
+    for index in range(20):
+        # A moving square, so the encoder emits inter frames
+        image = np.full((48, 64, 3), 100, dtype=np.uint8)
+        image[10:20, index:index + 10] = 255
+        for packet in video.encode(av.VideoFrame.from_ndarray(image, format='bgr24')):
+            container.mux(packet)
+            
+    samples = np.zeros((1, 1152), dtype=np.int16)
+    for index in range(40):
+        frame = av.AudioFrame.from_ndarray(samples, format='s16', layout='mono')
+        frame.sample_rate = 48000
+        frame.pts = index * 1152
+        for packet in audio.encode(frame):
+            container.mux(packet)
+            
+    for stream in (video, audio):
+        for packet in stream.encode(None):
+            container.mux(packet)
+    container.close()
+    return path
+
+
+def test_pyav_demuxes_video_and_audio_together(av_file):
+    """One PyAV connection feeds both the frame ring and the audio buffer"""
+    from stream.audio_buffer import AudioBuffer
+    from stream.decoder import PyAVDecodeThread
+    
+    buffer = FrameBuffer(max_size=3)
+    audio_buffer = AudioBuffer(max_duration_seconds=10.0)
+    decoder = PyAVDecodeThread('av', av_file, buffer, reconnect_delay=0.1)
+    decoder.attach_audio(audio_buffer, sample_rate=16000, channels=1)
+    
+    decoder.start()
+    try:
+        seq, frame = asyncio.run(decoder.wait_for_frame(0, timeout=5.0))
+        deadline = time.time() + 5.0
+        while audio_buffer.size() == 0 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        decoder.stop()
+        
+    assert frame.shape == (48, 64, 3)
+    # seq may have been overwritten while waiting for audio; the latest frame is not
+    assert buffer.get_timestamp(buffer.sequence) is not None
+    assert decoder.has_audio
+    assert audio_buffer.size() > 0
+    
+    audio, sample_rate, _ = audio_buffer.get_chunk(0.01)
+    assert sample_rate == 16000
+    assert audio.ndim == 1
+
+
+def test_pyav_keyframe_only_skips_inter_frames(av_file):
+    """Keyframe-only mode never hands P/B frames to the decoder"""
+    from stream.decoder import PyAVDecodeThread
+    
+    buffer = FrameBuffer(max_size=3)
+    decoder = PyAVDecodeThread('kf', av_file, buffer, reconnect_delay=0.1)
+    decoder.set_keyframe_only(True)
+    
+    decoder.start()
+    try:
+        asyncio.run(decoder.wait_for_frame(0, timeout=5.0))
+        deadline = time.time() + 5.0
+        while decoder.frames_skipped < 15 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        decoder.stop()
+        
+    assert decoder.get_status()['decode_mode'] == 'keyframe'
+    assert decoder.frames_skipped >= 15
+    assert decoder.frames_decoded * 4 < decoder.frames_skipped
+
+
+def test_pyav_paced_decoding_fills_ring_slots(av_file):
+    """Frames beyond the target rate are dropped before conversion; due ones land in ring slots"""
+    from stream.decoder import PyAVDecodeThread
+    
+    buffer = FrameBuffer(max_size=3)
+    decoder = PyAVDecodeThread('paced-av', av_file, buffer, reconnect_delay=0.1)
+    decoder.set_target_fps(2)
+    
+    decoder.start()
+    try:
+        deadline = time.time() + 5.0
+        while (decoder.frames_decoded < 4 or decoder.frames_skipped < 20) and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        decoder.stop()
+        
+    assert decoder.frames_decoded >= 4
+    assert decoder.frames_decoded < decoder.frames_skipped
+    # The ring keeps reusing its preallocated slots
+    assert buffer.slot_allocations <= buffer.max_size
+    assert buffer.get_latest().shape == (48, 64, 3)
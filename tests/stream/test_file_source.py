@@ -0,0 +1,53 @@
+"""
+Tests for background video file readers
+"""
+import time
+
+from stream.file_source import FileFrameSource
+
+
+def read_frames(source: FileFrameSource, count: int, timeout: float = 5.0) -> list:
+    frames = []
+    deadline = time.time() + timeout
+    while len(frames) < count and time.time() < deadline:
+        frame = source.read()
+        if frame is None:
+            time.sleep(0.005)
+        else:
+            frames.append(frame)
+    return frames
+
+
+def test_frames_are_scaled_and_looped(make_video_file):
+    """Frames arrive in order, resized in the reader, restarting at end of file"""
+    video_file = make_video_file(frames=5, step=50)
+    source = FileFrameSource('video', video_file, scale=0.5, prefetch=2)
+    source.start()
+    try:
+        frames = read_frames(source, 8)
+    finally:
+        source.stop()
+        
+    assert len(frames) == 8
+    assert frames[0].shape == (24, 32, 3)
+    # Frame 5 is the first frame again
+    assert abs(int(frames[5][0, 0, 0]) - int(frames[0][0, 0, 0])) < 10
+    assert source.take_error() is None
+
+
+def test_unopenable_file_reports_error_once(tmp_path):
+    """A missing file is reported through take_error() and retried"""
+    source = FileFrameSource('missing', str(tmp_path / 'none.avi'), retry_delay=10.0)
+    source.start()
+    try:
+        deadline = time.time() + 5.0
+        error = None
+        while error is None and time.time() < deadline:
+            error = source.take_error()
+            time.sleep(0.01)
+    finally:
+        source.stop()
+        
+    assert 'Failed to open' in error
+    assert source.take_error() is None
+    assert source.read() is None
@@ -0,0 +1,149 @@
+"""
+Tests for the shared frame ring
+"""
+import numpy as np
+import pytest
+from stream.frame_buffer import FrameBuffer
+
+
+def make_frame(value: int, shape=(4, 6, 3)) -> np.ndarray:
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_sequence_numbers_increase():
+    """Each published frame gets the next sequence number"""
+    buffer = FrameBuffer(max_size=3)
+    
+    assert buffer.get_latest() is None
+    assert buffer.put(make_frame(1)) == 1
+    assert buffer.put(make_frame(2)) == 2
+    
+    seq, frame = buffer.get_latest_with_seq()
+    assert seq == 2
+    assert frame[0, 0, 0] == 2
+
+
+def test_latest_is_read_only_view():
+    """Consumers get read-only views, writable=True gives a private copy"""
+    buffer = FrameBuffer(max_size=3)
+    buffer.put(make_frame(7))
+    
+    view = buffer.get_latest()
+    assert not view.flags.writeable
+    with pytest.raises(ValueError):
+        view[0, 0, 0] = 1
+        
+    copy = buffer.get_latest(writable=True)
+    copy[0, 0, 0] = 1
+    assert buffer.get_latest()[0, 0, 0] == 7
+
+
+def test_decode_into_acquired_slot_is_zero_copy():
+    """Frames written into acquire_slot() are published without allocation"""
+    buffer = FrameBuffer(max_size=3)
+    assert buffer.acquire_slot() is None
+    
+    buffer.put(make_frame(0))
+    for value in range(1, 10):
+        slot = buffer.acquire_slot()
+        slot[:] = value
+        buffer.put(slot)
+        del slot
+        
+    assert buffer.slot_allocations == 3
+    assert buffer.get_latest()[0, 0, 0] == 9
+
+
+def test_acquired_slot_no_longer_serves_its_old_frame():
+    """The frame in a slot handed to the decoder cannot be read half-written"""
+    buffer = FrameBuffer(max_size=3)
+    for value in range(1, 4):
+        buffer.put(make_frame(value))
+        
+    slot = buffer.acquire_slot()
+    slot[:] = 99
+    
+    # Slot of frame 1 is being overwritten with frame 4
+    assert buffer.get_frame(1) is None
+    assert buffer.get_pyramid(1) is None
+    assert buffer.get_meta(1) is None
+    assert buffer.get_timestamp(1) is None
+    assert buffer.get()[0, 0, 0] == 2
+    assert buffer.size() == 2
+    
+    assert buffer.put(slot) == 4
+    assert buffer.get_frame(4)[0, 0, 0] == 99
+
+
+def test_pinned_slot_is_not_overwritten():
+    """A view held by a slow consumer survives the ring wrapping around"""
+    buffer = FrameBuffer(max_size=3)
+    buffer.put(make_frame(1))
+    held = buffer.get_latest()
+    
+    for value in range(2, 10):
+        buffer.put(make_frame(value))
+        
+    assert held[0, 0, 0] == 1
+    assert buffer.pinned_swaps == 1
+    assert buffer.get_latest()[0, 0, 0] == 9
+
+
+def test_get_frame_by_sequence():
+    """Frames can be looked up by sequence until they leave the ring"""
+    buffer = FrameBuffer(max_size=3)
+    for value in range(1, 6):
+        buffer.put(make_frame(value))
+        
+    assert buffer.get_frame(5)[0, 0, 0] == 5
+    assert buffer.get_frame(3)[0, 0, 0] == 3
+    assert buffer.get_frame(2) is None
+    assert buffer.get_frame(6) is None
+
+
+def test_shape_change_reallocates():
+    """Resolution changes reallocate the slot"""
+    buffer = FrameBuffer(max_size=2)
+    buffer.put(make_frame(1, shape=(4, 4, 3)))
+    buffer.put(make_frame(2, shape=(8, 8, 3)))
+    
+    assert buffer.get_latest().shape == (8, 8, 3)
+
+
+def test_get_returns_oldest_unread():
+    """get() walks forward through frames still held in the ring"""
+    buffer = FrameBuffer(max_size=3)
+    for value in range(1, 6):
+        buffer.put(make_frame(value))
+        
+    assert buffer.get()[0, 0, 0] == 3
+    assert buffer.get()[0, 0, 0] == 4
+    assert buffer.get()[0, 0, 0] == 5
+    assert buffer.get() is None
+
+
+def test_clear():
+    """clear() drops all frames"""
+    buffer = FrameBuffer(max_size=3)
+    seq = buffer.put(make_frame(1), ingest_time=100.0)
+    buffer.clear()
+    
+    assert buffer.get_latest() is None
+    assert buffer.get_meta(seq) is None
+    assert buffer._slot_ingest == [0.0] * 3
+    assert buffer.size() == 0
+
+
+def test_frames_carry_sequence_ids_and_ingest_time():
+    """Metadata follows a frame from put() to its pyramid"""
+    buffer = FrameBuffer(max_size=2, camera_id='cam1')
+    seq = buffer.put(make_frame(1), timestamp=1.5, ingest_time=100.0)
+    
+    meta = buffer.get_meta(seq)
+    assert meta.frame_id == f"cam1:{seq}"
+    assert (meta.pts, meta.ingest_time) == (1.5, 100.0)
+    assert buffer.get_latest_pyramid().meta.frame_id == meta.frame_id
+    
+    buffer.put(make_frame(2))
+    buffer.put(make_frame(3))
+    assert buffer.get_meta(seq) is None
@@ -0,0 +1,67 @@
+"""
+Tests for per-frame identity and stage latency
+"""
+import time
+
+from core.metrics import frame_stage_latency
+from stream import frame_meta
+from stream.frame_meta import FrameMeta, acknowledge, observe_stage, track_sent
+
+
+def observed(camera_id: str, stage: str) -> float:
+    """Total latency recorded for a camera and stage"""
+    return frame_stage_latency.labels(camera_id=camera_id, stage=stage)._sum.get()
+
+
+def test_frame_id_and_age():
+    """frame_id joins camera and sequence, age counts from ingest"""
+    meta = FrameMeta('front', 7, pts=1.5, ingest_time=time.monotonic() - 0.2)
+    
+    assert meta.frame_id == 'front:7'
+    assert 0.2 <= meta.age() < 1.0
+    
+    info = meta.to_dict()
+    assert info['frame_id'] == 'front:7'
+    assert info['pts'] == 1.5
+    assert info['age_ms'] >= 200
+
+
+def test_ingest_time_defaults_to_now():
+    """Frames without an ingest time are stamped on creation"""
+    before = time.monotonic()
+    meta = FrameMeta('front', 1)
+    
+    assert before <= meta.ingest_time <= time.monotonic()
+
+
+def test_observe_stage_records_latency():
+    """A finished stage lands in the histogram; frames without metadata are ignored"""
+    meta = FrameMeta('observe-cam', 1, ingest_time=time.monotonic() - 0.1)
+    
+    latency = observe_stage(meta, 'dispatch')
+    
+    assert latency >= 0.1
+    assert observed('observe-cam', 'dispatch') >= 0.1
+    assert observe_stage(None, 'dispatch') is None
+
+
+def test_acknowledge_times_sent_frames_once():
+    """A frame_ack of a sent frame records 'display'; unknown or repeated acks do not"""
+    meta = FrameMeta('ack-cam', 3, ingest_time=time.monotonic() - 0.05)
+    track_sent(meta)
+    
+    assert acknowledge('ack-cam:3') >= 0.05
+    assert acknowledge('ack-cam:3') is None
+    assert acknowledge('ack-cam:99') is None
+    assert observed('ack-cam', 'display') >= 0.05
+
+
+def test_pending_acks_are_bounded(monkeypatch):
+    """Frames never acknowledged are forgotten oldest first"""
+    monkeypatch.setattr(frame_meta, 'MAX_PENDING_ACKS', 3)
+    for seq in range(5):
+        track_sent(FrameMeta('bounded-cam', seq))
+        
+    assert acknowledge('bounded-cam:0') is None
+    assert acknowledge('bounded-cam:1') is None
+    assert acknowledge('bounded-cam:4') is not None
@@ -0,0 +1,49 @@
+"""
+Tests for shared per-frame resolution pyramids
+"""
+import numpy as np
+import pytest
+from stream.frame_buffer import FrameBuffer
+from stream.frame_pyramid import FramePyramid
+
+
+def test_levels_are_built_once_and_read_only():
+    """Each level is resized on first use and then reused"""
+    pyramid = FramePyramid(np.zeros((1080, 1920, 3), dtype=np.uint8))
+    
+    inference = pyramid.get('inference')
+    assert inference.shape == (360, 640, 3)
+    assert pyramid.get('inference') is inference
+    assert not inference.flags.writeable
+    assert pyramid.get('thumbnail').shape == (90, 160, 3)
+    assert pyramid.scale_factors('inference') == (3.0, 3.0)
+    
+    with pytest.raises(ValueError):
+        pyramid.get('huge')
+
+
+def test_small_frames_are_not_upscaled():
+    """Levels larger than the frame return the frame itself"""
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    pyramid = FramePyramid(frame)
+    
+    assert pyramid.get('inference') is frame
+    assert pyramid.get('thumbnail').shape == (120, 160, 3)
+
+
+def test_buffer_shares_one_pyramid_per_sequence():
+    """Consumers of the same frame get the same pyramid until it is overwritten"""
+    buffer = FrameBuffer(max_size=2)
+    seq = buffer.put(np.full((48, 64, 3), 1, dtype=np.uint8))
+    
+    pyramid = buffer.get_latest_pyramid()
+    assert pyramid is buffer.get_pyramid(seq)
+    assert pyramid.seq == seq
+    
+    buffer.put(np.full((48, 64, 3), 2, dtype=np.uint8))
+    buffer.put(np.full((48, 64, 3), 3, dtype=np.uint8))
+    
+    # The old slot was swapped out, not overwritten, while the pyramid is held
+    assert buffer.get_pyramid(seq) is None
+    assert pyramid.full[0, 0, 0] == 1
+    assert buffer.get_latest_pyramid().full[0, 0, 0] == 3
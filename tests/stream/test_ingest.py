@@ -0,0 +1,65 @@
+"""
+Tests for the main process handle of cameras decoded in ingest workers
+"""
+import asyncio
+
+import numpy as np
+from stream.ingest import RemoteStream
+
+
+class FakePool:
+    """Records commands instead of sending them to worker processes"""
+    
+    def __init__(self):
+        self.commands = []
+        
+    def assign(self, stream):
+        stream.worker_index = 0
+        
+    def release(self, stream):
+        pass
+        
+    def send(self, index, command):
+        self.commands.append(command)
+
+
+def test_wait_for_frame_copies_each_frame_once():
+    """The frame copied out for wait_for_frame() is the one consumers get"""
+    async def run():
+        stream = RemoteStream(FakePool(), 'cam1', 'rtsp://camera/main', [])
+        await stream.start()
+        try:
+            stream.ring.write(np.full((48, 64, 3), 3, dtype=np.uint8))
+            seq, frame = await stream.wait_for_frame(0, timeout=1.0)
+            pyramid = stream.get_latest_pyramid()
+            
+            assert seq == 1
+            assert frame is pyramid.full
+            assert not frame.flags.writeable
+            assert await stream.wait_for_frame(seq, timeout=0.05) == (seq, None)
+        finally:
+            await stream.stop()
+            
+    asyncio.run(run())
+
+
+def test_switch_url_reports_the_workers_result():
+    """switch_url() returns what the worker did, and keeps the old URL otherwise"""
+    async def run():
+        pool = FakePool()
+        stream = RemoteStream(pool, 'cam1', 'rtsp://camera/main', [])
+        await stream.start()
+        try:
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, stream.switch_done, 'rtsp://camera/sub', False)
+            assert not await stream.switch_url('rtsp://camera/sub', timeout=1.0)
+            assert stream.rtsp_url == 'rtsp://camera/main'
+            
+            loop.call_later(0.05, stream.switch_done, 'rtsp://camera/sub', True)
+            assert await stream.switch_url('rtsp://camera/sub', timeout=1.0)
+            assert stream.rtsp_url == 'rtsp://camera/sub'
+            assert pool.commands[-1] == ('url', 'cam1', 'rtsp://camera/sub', 1.0)
+        finally:
+            await stream.stop()
+            
+    asyncio.run(run())
@@ -0,0 +1,38 @@
+"""
+Tests for latest-frame-wins mailboxes
+"""
+import asyncio
+
+from stream.mailbox import LatestFrameMailbox
+
+
+def test_newer_posts_replace_unread_items():
+    """Only the newest item is kept; replaced ones count as stale drops"""
+    mailbox = LatestFrameMailbox('cam1', 'wf1')
+    
+    assert not mailbox.put(1)
+    assert mailbox.put(2)
+    assert mailbox.put(3)
+    
+    assert mailbox.take() == 3
+    assert mailbox.take() is None
+    assert mailbox.get_stats() == {'posted': 3, 'taken': 1, 'dropped_stale': 2}
+
+
+def test_consumer_waits_for_items_and_close():
+    """get() wakes on a post and returns None once closed"""
+    mailbox = LatestFrameMailbox('cam2')
+    
+    async def run():
+        waiter = asyncio.create_task(mailbox.get())
+        await asyncio.sleep(0)
+        mailbox.put('frame')
+        assert await waiter == 'frame'
+        
+        assert await mailbox.get(timeout=0.01) is None
+        waiter = asyncio.create_task(mailbox.get())
+        await asyncio.sleep(0)
+        mailbox.close()
+        assert await waiter is None
+        
+    asyncio.run(run())
@@ -0,0 +1,55 @@
+"""
+Tests for the motion gate in front of inference
+"""
+import numpy as np
+
+from stream.motion_gate import MotionGate
+
+
+def static_frame() -> np.ndarray:
+    return np.full((240, 320, 3), 80, dtype=np.uint8)
+
+
+def test_static_scene_is_gated():
+    """Only the first frame and motion pass while keepalive is off"""
+    gate = MotionGate('cam-motion', 'wf', threshold=0.01, keepalive=0)
+    frame = static_frame()
+
+    assert gate.check(frame)
+    assert not gate.check(frame)
+    assert not gate.check(frame)
+
+    moved = frame.copy()
+    moved[60:180, 80:240] = 255
+    assert gate.check(moved)
+
+    stats = gate.get_stats()
+    assert stats['hits'] == 2
+    assert stats['misses'] == 2
+
+
+def test_zones_ignore_motion_elsewhere():
+    """Motion outside every zone keeps the gate closed"""
+    left_half = [[0, 0], [0.45, 0], [0.45, 1], [0, 1]]
+    gate = MotionGate('cam-zone', 'wf', keepalive=0, zones=[left_half])
+    frame = static_frame()
+    gate.check(frame)
+
+    right = frame.copy()
+    right[:, 200:] = 255
+    assert not gate.check(right)
+
+    left = frame.copy()
+    left[:, :100] = 0
+    assert gate.check(left)
+
+
+def test_keepalive_passes_static_frames():
+    """A static frame still passes once the keepalive interval is due"""
+    gate = MotionGate('cam-keepalive', 'wf', keepalive=0.01)
+    frame = static_frame()
+    gate.check(frame)
+    gate._last_pass -= 1.0
+
+    assert gate.check(frame)
+    assert gate.get_stats()['keepalives'] == 1
@@ -0,0 +1,111 @@
+"""
+Tests for the compressed packet ring
+"""
+import asyncio
+
+import numpy as np
+import pytest
+from stream.packet_ring import PacketRing
+
+av = pytest.importorskip('av')
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = str(tmp_path / 'clip.mkv')
+    container = av.open(path, 'w')
+    stream = container.add_stream('mpeg4', rate=10)
+    stream.width, stream.height, stream.pix_fmt = 64, 48, 'yuv420p'
+    stream.gop_size = 5
+    
+    for index in range(30):
+        image = np.full((48, 64, 3), index * 5, dtype=np.uint8)
+        for packet in stream.encode(av.VideoFrame.from_ndarray(image, format='bgr24')):
+            container.mux(packet)
+    for packet in stream.encode(None):
+        container.mux(packet)
+    container.close()
+    return path
+
+
+def test_clip_is_remuxed_without_reencoding(video_file, tmp_path):
+    """Buffered plus live packets are written to MP4 as-is"""
+    ring = PacketRing(max_seconds=60.0)
+    container = av.open(video_file)
+    stream = container.streams.video[0]
+    ring.set_template(stream)
+    
+    packets = [p for p in container.demux(stream) if p.size]
+    for packet in packets[:15]:
+        ring.push(packet)
+        
+    output = str(tmp_path / 'out.mp4')
+    recorder = ring.start_clip(output, pre_buffer=60.0)
+    for packet in packets[15:]:
+        ring.push(packet)
+    ring.stop_clip(recorder)
+    container.close()
+    
+    assert recorder.finish() == output
+    
+    with av.open(output) as result:
+        frames = list(result.decode(video=0))
+    assert len(frames) == len(packets)
+    assert frames[0].width == 64
+
+
+def test_ring_starts_at_keyframe_and_is_bounded():
+    """Old GOPs are dropped once a newer GOP covers the window"""
+    class FakePacket:
+        def __init__(self, keyframe):
+            self.is_keyframe = keyframe
+            self.pts = self.dts = 0
+            self.duration = 1
+            
+        def __bytes__(self):
+            return b'x' * 10
+            
+    ring = PacketRing(max_seconds=0.0)
+    ring.push(FakePacket(False))
+    assert not ring.packets
+    
+    for keyframe in (True, False, False, True, False):
+        ring.push(FakePacket(keyframe))
+        
+    # With a zero window only the newest GOP survives
+    assert len(ring.packets) == 2
+    assert ring.packets[0].is_keyframe
+    assert ring.get_stats()['bytes'] == 20
+
+
+def test_first_clip_waits_for_the_decoder(video_file, tmp_path):
+    """Recording a stream without a ring waits for the first packet instead of giving up"""
+    from stream.rtsp import RTSPStream
+    
+    container = av.open(video_file)
+    source = container.streams.video[0]
+    packets = [p for p in container.demux(source) if p.size]
+    
+    stream = RTSPStream('cam1', video_file, None, [], backend='pyav')
+    stream.running = True
+    
+    async def decode():
+        # The decoder only reaches the ring after connecting
+        await asyncio.sleep(0.2)
+        stream.packet_ring.set_template(source)
+        for packet in packets:
+            stream.packet_ring.push(packet)
+            await asyncio.sleep(0.01)
+            
+    async def run():
+        feeder = asyncio.create_task(decode())
+        clip = await stream.record_clip(str(tmp_path / 'out.mp4'), pre_buffer=1.0, duration=0.5)
+        await feeder
+        return clip
+        
+    output = asyncio.run(run())
+    container.close()
+    
+    assert output == str(tmp_path / 'out.mp4')
+    with av.open(output) as result:
+        assert len(list(result.decode(video=0))) > 0
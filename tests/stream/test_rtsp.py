@@ -0,0 +1,126 @@
+"""
+Tests for the per-camera stream handler
+"""
+import asyncio
+import threading
+
+import pytest
+from stream.decoder import FrameNotifier
+from stream.rtsp import RTSPStream
+
+
+class FakeDecoder:
+    """Decoder stand-in that never connects"""
+    
+    def __init__(self):
+        self.ready = threading.Event()
+        self.notifier = FrameNotifier()
+        self.started = False
+        self.stopped = False
+        
+    def start(self):
+        self.started = True
+        
+    def stop(self, timeout=5.0):
+        self.stopped = True
+        
+    def is_alive(self):
+        return self.started and not self.stopped
+
+
+def test_keyframe_only_returns_to_configured_backend():
+    """Keyframe-only decoding borrows pyav and gives the camera back afterwards"""
+    stream = RTSPStream('cam1', 'rtsp://camera/stream', None, [], backend='opencv')
+    
+    stream.set_keyframe_only(True)
+    assert stream.backend == 'pyav'
+    
+    stream.set_keyframe_only(False)
+    assert stream.backend == 'opencv'
+    
+    # Other pyav features keep the camera on pyav
+    stream.audio_buffer = object()
+    stream.set_keyframe_only(True)
+    stream.set_keyframe_only(False)
+    assert stream.backend == 'pyav'
+
+
+def test_cancelled_switch_stops_standby_decoder():
+    """Cancelling a switch while it waits for the first frame closes the new connection"""
+    stream = RTSPStream('cam1', 'rtsp://camera/main', None, [], backend='opencv')
+    old_decoder, new_decoder = FakeDecoder(), FakeDecoder()
+    stream.running = True
+    stream.decoder = old_decoder
+    stream._create_decoder = lambda rtsp_url=None: new_decoder
+    
+    async def switch_and_cancel():
+        task = asyncio.ensure_future(stream.switch_url('rtsp://camera/sub', timeout=10.0))
+        await asyncio.sleep(0.1)
+        assert new_decoder.started
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+            
+    asyncio.run(switch_and_cancel())
+    
+    assert new_decoder.stopped
+    assert not old_decoder.stopped
+    assert stream.decoder is old_decoder
+    assert stream.rtsp_url == 'rtsp://camera/main'
+
+
+def test_keyframe_only_withdrawn_before_switch_keeps_backend():
+    """Turning keyframe-only off before the pyav switch runs leaves the camera alone"""
+    stream = RTSPStream('cam1', 'rtsp://camera/stream', None, [], backend='opencv')
+    stream.running = True
+    stream.decoder = FakeDecoder()
+    created = []
+    stream._create_decoder = lambda rtsp_url=None: created.append(FakeDecoder()) or created[-1]
+    
+    async def toggle():
+        stream.set_keyframe_only(True)
+        stream.set_keyframe_only(False)
+        await stream._backend_task
+        
+    asyncio.run(toggle())
+    
+    assert stream.backend == 'opencv'
+    assert created == []
+
+
+def test_stuck_decoder_marks_stream_unhealthy():
+    """A replaced decoder that does not exit is given up on and reported"""
+    stream = RTSPStream('cam1', 'rtsp://camera/stream', None, [], backend='opencv')
+    stuck = FakeDecoder()
+    stuck.started = True
+    stuck.stop = lambda timeout=5.0: None
+    
+    asyncio.run(stream._stop_replaced_decoder(stuck))
+    assert not stream.healthy
+    
+    # Healthy again once the blocked read returns and the thread exits
+    stuck.stopped = True
+    assert stream.healthy
+
+
+def test_releasing_audio_returns_to_configured_backend():
+    """A camera moved to pyav for audio goes back once the last consumer leaves"""
+    stream = RTSPStream('cam1', 'rtsp://camera/stream', None, [], backend='opencv')
+    stream.running = True
+    stream.decoder = FakeDecoder()
+    stream._create_decoder = lambda rtsp_url=None: FakeDecoder()
+    
+    async def use_audio():
+        await stream.enable_audio()
+        await stream.enable_audio()
+        assert stream.backend == 'pyav'
+        
+        stream.release_audio()
+        assert stream.backend == 'pyav'
+        stream.release_audio()
+        await stream._backend_task
+        
+    asyncio.run(use_audio())
+    
+    assert stream.audio_buffer is None
+    assert stream.backend == 'opencv'
@@ -0,0 +1,62 @@
+"""
+Tests for the shared memory frame ring
+"""
+import multiprocessing
+
+import numpy as np
+from stream.shm_ring import SharedFrameRing
+
+
+def _write_frames(name: str, count: int):
+    ring = SharedFrameRing.attach(name)
+    for value in range(1, count + 1):
+        ring.write(np.full((48, 64, 3), value, dtype=np.uint8))
+    ring.close()
+
+
+def test_write_and_read_latest():
+    """Frames round-trip through shared memory as private copies"""
+    ring = SharedFrameRing.create(num_slots=3, slot_bytes=48 * 64 * 3)
+    try:
+        assert ring.read_latest() == (0, None)
+        
+        ring.write(np.full((48, 64, 3), 5, dtype=np.uint8))
+        seq, frame = ring.read_latest()
+        
+        assert seq == 1
+        assert frame.shape == (48, 64, 3)
+        assert frame.flags.writeable
+        assert (frame == 5).all()
+    finally:
+        ring.close()
+
+
+def test_old_frames_leave_the_ring():
+    """Only the last num_slots frames can be read back"""
+    ring = SharedFrameRing.create(num_slots=2, slot_bytes=16)
+    try:
+        for value in range(1, 5):
+            ring.write(np.full((4, 4), value, dtype=np.uint8))
+            
+        assert ring.read(4)[0, 0] == 4
+        assert ring.read(3)[0, 0] == 3
+        assert ring.read(2) is None
+    finally:
+        ring.close()
+
+
+def test_reader_in_other_process():
+    """Frames written by a spawned process are visible to the creator"""
+    ring = SharedFrameRing.create(num_slots=3, slot_bytes=48 * 64 * 3)
+    try:
+        ctx = multiprocessing.get_context('spawn')
+        process = ctx.Process(target=_write_frames, args=(ring.name, 7))
+        process.start()
+        process.join(30)
+        
+        assert process.exitcode == 0
+        seq, frame = ring.read_latest()
+        assert seq == 7
+        assert (frame == 7).all()
+    finally:
+        ring.close()
@@ -0,0 +1,99 @@
+"""
+Tests for the headless workflow benchmark
+"""
+import json
+
+import pytest
+
+# The bench runs the realtime executor, which imports the model plugins and torch
+pytest.importorskip('torch')
+
+from workflows.bench import load_workflow, main, parse_videos, replace_inputs
+
+
+NODES = [
+    {'id': 'cam', 'type': 'camera', 'data': {'cameraId': 'front', 'fps': 5}},
+    {'id': 'yt', 'type': 'youtube', 'data': {'url': 'https://youtu.be/x'}},
+    {'id': 'preview', 'type': 'dataPreview', 'data': {}}
+]
+EDGES = [
+    {'id': 'e1', 'source': 'cam', 'target': 'preview'},
+    {'id': 'e2', 'source': 'yt', 'target': 'preview'}
+]
+
+
+def write_json(path, data) -> str:
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+def test_load_workflow_unwraps_envelope(tmp_path):
+    """Exports wrapped in a 'workflow' envelope load like bare workflows"""
+    bare = load_workflow(write_json(tmp_path / 'bare.json', {'nodes': NODES, 'edges': EDGES}))
+    wrapped = load_workflow(write_json(tmp_path / 'wrapped.json', {
+        'workflow': {'id': 'wf', 'nodes': NODES, 'edges': EDGES}
+    }))
+    
+    assert bare['nodes'] == NODES
+    assert wrapped['id'] == 'wf'
+    assert wrapped['edges'] == EDGES
+
+
+@pytest.mark.parametrize('data', [
+    {'nodes': NODES},
+    {'nodes': {}, 'edges': []},
+    {'workflow': {'nodes': NODES, 'edges': None}}
+])
+def test_load_workflow_requires_nodes_and_edges(tmp_path, data):
+    """Files without nodes/edges lists are rejected"""
+    with pytest.raises(ValueError):
+        load_workflow(write_json(tmp_path / 'bad.json', data))
+
+
+def test_inputs_become_video_inputs():
+    """Per-node videos override '*', and every input turns into a videoInput"""
+    videos = parse_videos(['all.mp4', 'yt=one.mp4'])
+    assert videos == {'*': 'all.mp4', 'yt': 'one.mp4'}
+    
+    nodes = {node['id']: node for node in replace_inputs(NODES, videos, fps=None)}
+    assert nodes['cam']['type'] == nodes['yt']['type'] == 'videoInput'
+    assert nodes['cam']['data']['videoPath'] == 'all.mp4'
+    assert nodes['yt']['data']['videoPath'] == 'one.mp4'
+    assert nodes['cam']['data']['fps'] == 5
+    assert nodes['preview'] == NODES[2]
+    
+    # The saved workflow is left untouched
+    assert NODES[0]['type'] == 'camera'
+    
+    unthrottled = replace_inputs(NODES, videos, fps=0)
+    assert [node['data'].get('fps') for node in unthrottled[:2]] == [0, 0]
+
+
+def test_input_without_video_is_rejected():
+    """Every input node needs a video unless '*' is given"""
+    with pytest.raises(ValueError, match='yt'):
+        replace_inputs(NODES, {'cam': 'one.mp4'}, fps=None)
+
+
+def test_bench_reports_per_node_latency(tmp_path, video_file):
+    """A short run stops after --frames and reports percentiles and drops per node"""
+    workflow = write_json(tmp_path / 'workflow.json', {
+        'nodes': NODES[:1] + NODES[2:],
+        'edges': EDGES[:1]
+    })
+    output = tmp_path / 'report.json'
+    
+    main([
+        workflow, '--video', video_file, '--fps', '0',
+        '--frames', '5', '--duration', '20', '--output', str(output)
+    ])
+    report = json.loads(output.read_text())
+    
+    assert report['rate'] == 'unthrottled'
+    assert report['duration_s'] < 20
+    cam = report['nodes']['cam']
+    assert cam['type'] == 'videoInput'
+    assert cam['frames'] >= 5
+    assert cam['dropped'] == 0
+    latency = cam['latency_ms']
+    assert latency['p50'] <= latency['p95'] <= latency['p99'] <= latency['max']
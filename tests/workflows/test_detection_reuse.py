@@ -0,0 +1,40 @@
+"""
+Tests for re-sending detections on frames skipped as similar
+"""
+import numpy as np
+
+from workflows.detection_reuse import DetectionReuseCache
+
+
+def test_reused_detections_are_marked_and_age_out():
+    """Stored results come back as marked copies for max_frames frames"""
+    cache = DetectionReuseCache()
+    detections = [{'class': 'person', 'confidence': 0.9, 'bbox': [10, 10, 50, 90]}]
+    cache.store(('cam', 'model'), detections)
+
+    first = cache.reuse(('cam', 'model'), max_frames=2)
+    assert first[0]['reused'] is True
+    assert first[0]['bbox'] == [10, 10, 50, 90]
+    assert 'reused' not in detections[0]
+
+    assert cache.reuse(('cam', 'model'), max_frames=2)[0]['reused_frames'] == 2
+    assert cache.reuse(('cam', 'model'), max_frames=2) is None
+    assert cache.reuse(('cam', 'other'), max_frames=2) is None
+
+    # A fresh result starts a new reuse window
+    cache.store(('cam', 'model'), detections)
+    assert cache.reuse(('cam', 'model'), max_frames=2) is not None
+
+
+def test_boxes_follow_global_motion():
+    """Boxes are shifted by the thumbnail translation, scaled to the full frame"""
+    rng = np.random.default_rng(0)
+    previous = rng.integers(0, 255, (120, 160), dtype=np.uint8)
+    current = np.roll(previous, 4, axis=1)
+
+    cache = DetectionReuseCache()
+    cache.store(('cam', 'model'), [{'bbox': [100, 100, 200, 200]}], previous)
+    bbox = cache.reuse(('cam', 'model'), 5, current, scale=(4.0, 4.0))[0]['bbox']
+
+    assert abs(bbox[0] - 116) < 2
+    assert abs(bbox[1] - 100) < 2
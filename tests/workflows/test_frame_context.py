@@ -0,0 +1,28 @@
+"""
+Tests for the per-tick frame context board
+"""
+import numpy as np
+
+from stream.frame_pyramid import FramePyramid
+from workflows.frame_context import FrameContextBoard
+
+
+def test_consumers_share_one_frame_per_tick():
+    """Each consumer takes a published frame once; ticks advance per input"""
+    board = FrameContextBoard()
+    first = board.publish('video', FramePyramid(np.zeros((64, 64, 3), dtype=np.uint8), 1))
+
+    assert first.tick == 1
+    assert board.take_new('dayNight', 'video') is first
+    assert board.take_new('other', 'video') is first
+    # Nothing new until the input publishes again
+    assert board.take_new('dayNight', 'video') is None
+    assert board.latest('video') is first
+
+    second = board.publish('video', FramePyramid(np.ones((64, 64, 3), dtype=np.uint8), 2))
+    assert second.tick == 2
+    assert board.take_new('dayNight', 'video') is second
+    assert board.take_new('dayNight', 'camera') is None
+
+    board.clear()
+    assert board.latest('video') is None
@@ -0,0 +1,47 @@
+"""
+Tests for the precompiled workflow graph index
+"""
+from workflows.graph_index import WorkflowGraph
+
+
+def make_graph() -> WorkflowGraph:
+    nodes = [
+        {'id': 'cam', 'type': 'camera'},
+        {'id': 'model', 'type': 'model'},
+        {'id': 'filter', 'type': 'detectionFilter'},
+        {'id': 'preview', 'type': 'dataPreview'},
+        {'id': 'debug', 'type': 'debug'},
+        {'id': 'far', 'type': 'debug'}
+    ]
+    edges = [
+        {'source': 'cam', 'target': 'model'},
+        {'source': 'model', 'target': 'filter'},
+        {'source': 'model', 'target': 'debug'},
+        {'source': 'filter', 'target': 'preview'},
+        {'source': 'preview', 'target': 'far'},
+        {'source': 'model', 'target': 'missing'}
+    ]
+    return WorkflowGraph(nodes, edges)
+
+
+def test_adjacency_lookups():
+    """Forward and reverse neighbours are filtered by type"""
+    graph = make_graph()
+    
+    assert [n['id'] for n in graph.successors('model')] == ['filter', 'debug']
+    assert [n['id'] for n in graph.successors('model', 'debug')] == ['debug']
+    assert [n['id'] for n in graph.predecessors('model', ['camera'])] == ['cam']
+    assert graph.successors('unknown') == []
+
+
+def test_downstream_search_is_depth_limited_and_memoized():
+    """Outputs are found through intermediate nodes within max_depth"""
+    graph = make_graph()
+    
+    found = graph.downstream('model', ['dataPreview', 'debug'])
+    assert [n['id'] for n in found] == ['preview', 'far', 'debug']
+    assert [n['id'] for n in graph.downstream('model', ['debug'], max_depth=1)] == ['debug']
+    
+    # Callers get their own list, not the cached one
+    found.clear()
+    assert len(graph.downstream('model', ['dataPreview', 'debug'])) == 3
@@ -0,0 +1,86 @@
+"""
+Tests for similar frame skipping and adaptive frame rates
+"""
+import numpy as np
+import pytest
+
+from stream.frame_pyramid import FramePyramid
+from workflows.performance import AdaptiveFpsController, CpuMonitor, FrameCache
+
+
+def make_frame(value: int = 100) -> np.ndarray:
+    return np.full((480, 640, 3), value, dtype=np.uint8)
+
+
+def test_similar_frames_are_skipped():
+    """Identical frames are skipped, changed ones processed"""
+    cache = FrameCache(similarity_threshold=0.95)
+    frame = make_frame()
+
+    assert cache.should_process(frame)
+    assert not cache.should_process(frame.copy())
+    assert cache.last_similarity == 1.0
+
+    changed = frame.copy()
+    changed[:, :320] = 255
+    assert cache.should_process(changed, FramePyramid(changed))
+
+
+def test_changed_regions_follow_the_change():
+    """Only blocks covering the changed area are reported"""
+    cache = FrameCache(similarity_threshold=0.99, grid=(4, 4))
+    frame = make_frame()
+    cache.should_process(frame)
+
+    changed = frame.copy()
+    changed[:120, :160] = 255
+    assert cache.should_process(changed)
+    assert cache.changed_regions() == [(0.0, 0.0, 0.25, 0.25)]
+
+
+def test_grid_must_divide_signature():
+    """A grid that does not tile the signature is rejected"""
+    with pytest.raises(ValueError):
+        FrameCache(grid=(5, 5))
+
+
+def test_adaptive_fps_backs_off_and_recovers():
+    """Rate is cut when work overruns the interval and grows back when idle"""
+    controller = AdaptiveFpsController(increase=1.0, decrease=0.5, adjust_interval=0)
+    assert controller.register('cam', 10, min_fps=2, max_fps=12) == 10
+
+    # 500ms of work per frame cannot keep up with 10 fps
+    assert controller.observe('cam', 0.5) == 5
+    assert controller.observe('cam', 0.5) == 2.5
+    assert controller.observe('cam', 0.5) == 2
+    assert controller.get_stats()['cam']['last_cut_reason'] == 'latency'
+
+    # Cheap frames let it climb back, up to max_fps
+    for _ in range(20):
+        fps = controller.observe('cam', 0.001)
+    assert fps == 12
+
+
+def test_adaptive_fps_backs_off_on_stale_frames():
+    """Frames that waited too long slow the node down even if work is cheap"""
+    controller = AdaptiveFpsController(decrease=0.5, max_frame_age=0.5, adjust_interval=0)
+    controller.register('cam', 8)
+
+    assert controller.observe('cam', 0.001, frame_age=1.0) == 4
+    assert controller.get_stats()['cam']['last_cut_reason'] == 'frame_age'
+
+
+def test_cpu_monitor_samples_on_read():
+    """Reading overloaded takes a fresh sample at most once per min_interval"""
+    readings = iter([95.0, 20.0])
+    monitor = CpuMonitor(high_percent=85, low_percent=60, smoothing=1.0, min_interval=0)
+    monitor._read_percent = lambda: next(readings)
+
+    assert monitor.overloaded
+    assert not monitor.overloaded
+
+    # Within min_interval the last reading is reused
+    monitor.min_interval = 60.0
+    monitor._read_percent = lambda: 99.0
+    assert not monitor.overloaded
+    assert monitor.percent == 20.0
@@ -0,0 +1,53 @@
+"""
+Tests for the hot-path trace ring
+"""
+import logging
+
+from workflows.trace import TraceRing, register_trace_ring, remove_trace_ring, trace
+
+
+def test_ring_keeps_newest_entries():
+    """Old entries are overwritten and dumps come out oldest first"""
+    ring = TraceRing('wf', capacity=4, log_interval=0)
+    for i in range(6):
+        ring.record('inference' if i % 2 else 'send', f'node-{i}', i)
+        
+    entries = ring.dump()
+    assert [entry['value'] for entry in entries] == [2, 3, 4, 5]
+    assert [entry['value'] for entry in ring.dump(event='send')] == [2, 4]
+    assert [entry['node_id'] for entry in ring.dump(limit=1)] == ['node-5']
+    
+    stats = ring.get_stats()
+    assert stats['recorded'] == 6 and stats['held'] == 4
+    assert stats['events']['inference'] == {'count': 3, 'avg_value': 3.0}
+
+
+def test_only_summaries_reach_the_log(caplog):
+    """Records are aggregated into one summary line per interval"""
+    ring = TraceRing('wf', capacity=16, log_interval=1.0)
+    with caplog.at_level(logging.INFO, logger='overwatch.workflows.trace'):
+        for _ in range(10):
+            ring.record('inference', 'model-1', 20.0)
+        assert not caplog.records
+        
+        ring._logged_at -= 1.0
+        ring.record('inference', 'model-1', 20.0)
+        
+    assert len(caplog.records) == 1
+    assert 'inference=11 (avg 20.0)' in caplog.records[0].getMessage()
+    assert ring.get_stats()['events']['inference']['count'] == 11
+
+
+def test_trace_records_only_for_registered_workflows():
+    """trace() is a no-op for workflows without a running ring"""
+    ring = TraceRing('running', log_interval=0)
+    register_trace_ring(ring)
+    try:
+        trace('running', 'broadcast', 'out-1', 2)
+        trace('stopped', 'broadcast', 'out-1', 2)
+        trace(None, 'broadcast')
+    finally:
+        remove_trace_ring(ring)
+    trace('running', 'broadcast')
+    
+    assert [entry['event'] for entry in ring.dump()] == ['broadcast']
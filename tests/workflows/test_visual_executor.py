@@ -1,6 +1,9 @@
 """
 Tests for Visual Workflow Executor
 """
+import asyncio
+
+import numpy as np
 import pytest
 from workflows.visual_executor import VisualWorkflowExecutor
 
@@ -221,3 +224,62 @@ def test_action_config_with_schema(executor):
     assert action['retries'] == 5
 
 
+def test_slow_input_does_not_stall_fast_input():
+    """Each input runs its own loop; model runs are bounded by maxConcurrency"""
+    # The realtime executor imports the model plugins, and with them torch
+    pytest.importorskip('torch')
+    from workflows.realtime_executor import RealtimeWorkflowExecutor
+    
+    class FakeModel:
+        def __init__(self):
+            self.in_flight = 0
+            self.peak = 0
+            
+        async def detect(self, frame):
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            # Holds the only slot for most of the fast input's interval
+            await asyncio.sleep(0.04)
+            self.in_flight -= 1
+            return []
+            
+    nodes = [
+        {'id': 'fast', 'type': 'videoInput', 'data': {'fps': 20}},
+        {'id': 'slow', 'type': 'videoInput', 'data': {'fps': 20}},
+        {'id': 'model1', 'type': 'model', 'data': {'modelId': 'fake', 'maxConcurrency': 1}}
+    ]
+    edges = [
+        {'id': 'e1', 'source': 'fast', 'target': 'model1'},
+        {'id': 'e2', 'source': 'slow', 'target': 'model1'}
+    ]
+    
+    async def run():
+        realtime = RealtimeWorkflowExecutor(nodes, edges, 'test-input-loops')
+        realtime.fps_controller = None
+        realtime.enable_profiling = False
+        model = FakeModel()
+        realtime.models['model1'] = model
+        reads = {'fast': 0, 'slow': 0}
+        
+        async def get_frame(input_node):
+            reads[input_node['id']] += 1
+            if input_node['id'] == 'slow':
+                # e.g. a stalled network source
+                await asyncio.sleep(0.3)
+            return np.zeros((48, 64, 3), dtype=np.uint8)
+            
+        realtime._get_frame_from_input = get_frame
+        realtime.running = True
+        tasks = [asyncio.create_task(realtime._input_loop(node)) for node in realtime.input_nodes]
+        await asyncio.sleep(1.0)
+        
+        realtime.running = False
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return reads, model.peak
+        
+    reads, peak = asyncio.run(run())
+    assert reads['fast'] >= 15
+    assert reads['slow'] <= 4
+    assert peak == 1
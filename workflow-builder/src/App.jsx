@@ -33,6 +33,7 @@ import AudioExtractorNode from './nodes/AudioExtractorNode'
 import AudioAINode from './nodes/AudioAINode'
 import AudioVUNode from './nodes/AudioVUNode'
 import DayNightDetectorNode from './nodes/DayNightDetectorNode'
+import MotionGateNode from './nodes/MotionGateNode'
 import DroneInputNode from './nodes/DroneInputNode'
 import DroneFilterNode from './nodes/DroneFilterNode'
 import DroneMapNode from './nodes/DroneMapNode'
@@ -74,6 +75,7 @@ const nodeTypes = {
   audioAI: AudioAINode,
   audioVU: AudioVUNode,
   dayNightDetector: DayNightDetectorNode,
+  motionGate: MotionGateNode,
   droneInput: DroneInputNode,
   droneFilter: DroneFilterNode,
   droneMap: DroneMapNode,
@@ -209,7 +211,7 @@ function App() {
       let edgeData = {}
       
       // Set edge type and data based on source/target types
-      if (sourceNode?.type === 'camera' || sourceNode?.type === 'videoInput' || sourceNode?.type === 'youtube') {
+      if (sourceNode?.type === 'camera' || sourceNode?.type === 'videoInput' || sourceNode?.type === 'youtube' || sourceNode?.type === 'motionGate') {
         edgeType = 'animated'
         edgeData = { type: 'video' }
       } else if (sourceNode?.type === 'model') {
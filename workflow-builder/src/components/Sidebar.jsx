@@ -65,6 +65,7 @@ const Sidebar = ({ cameras, models, actions, filters }) => {
       icon: '⚙️',
       items: [
         { type: 'zone', label: 'Zone Filter', icon: '📍', description: 'Define detection zones' },
+        { type: 'motionGate', label: 'Motion Gate', icon: '🏃', description: 'Skip inference on static scenes' },
         { type: 'detectionFilter', label: 'Detection Filter', icon: '🔍', description: 'Filter by count, class, confidence' },
         { type: 'parkingViolation', label: 'Parking Violation', icon: '🚗', description: 'Detect illegal parking' },
         { type: 'audioExtractor', label: 'Audio Extractor', icon: '🎵', description: 'Extract audio from video' },
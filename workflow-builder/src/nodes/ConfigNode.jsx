@@ -6,6 +6,7 @@ export default memo(({ data, id }) => {
   const [showEditor, setShowEditor] = useState(false)
   const [configJson, setConfigJson] = useState(data.config || {})
   const [configName, setConfigName] = useState(data.configName || 'Untitled Config')
+  const [currentType, setCurrentType] = useState(data.configType || 'generic')
   const [isValid, setIsValid] = useState(true)
   const [errorMsg, setErrorMsg] = useState('')
 
@@ -26,9 +27,18 @@ export default memo(({ data, id }) => {
     }
   }
 
-  const applyTemplate = (template) => {
+  const changeType = (type) => {
+    setCurrentType(type)
+    data.configType = type
+  }
+
+  const applyTemplate = (name) => {
+    const template = templates[name]
     setConfigJson(template)
     data.config = template
+    if (templateTypes[name]) {
+      changeType(templateTypes[name])
+    }
     setIsValid(true)
     setErrorMsg('')
   }
@@ -73,19 +83,32 @@ export default memo(({ data, id }) => {
       includeSnapshot: true,
       includeDetections: true,
       subject: 'Detection Alert - {{camera_name}}'
+    },
+    'Scheduling - Critical Workflow': {
+      priority: 'critical',
+      maxInferencesPerSecond: 20
+    },
+    'Scheduling - Low Priority Workflow': {
+      priority: 'low',
+      maxInferencesPerSecond: 2
     }
   }
 
+  // Templates that only make sense as a specific config type
+  const templateTypes = {
+    'Scheduling - Critical Workflow': 'scheduling',
+    'Scheduling - Low Priority Workflow': 'scheduling'
+  }
+
   const configTypes = {
     'model': 'AI Model Config',
     'webhook': 'Webhook Config',
     'record': 'Recording Config',
     'email': 'Email Config',
+    'scheduling': 'Workflow Scheduling (priority, inference budget)',
     'generic': 'Generic Config'
   }
 
-  const currentType = data.configType || 'generic'
-
   return (
     <div className="shadow-lg rounded-lg border-2 border-yellow-500 bg-gray-900 min-w-[280px] max-w-[400px]">
       <div className="px-4 py-3 bg-yellow-950/30 border-b border-yellow-800">
@@ -120,13 +143,27 @@ export default memo(({ data, id }) => {
 
       {showEditor && (
         <div className="p-3 border-b border-gray-800">
+          {/* Type Selector */}
+          <div className="mb-3">
+            <label className="text-xs text-gray-400 block mb-1">Config Type:</label>
+            <select
+              value={currentType}
+              onChange={(e) => changeType(e.target.value)}
+              className="w-full px-2 py-1 bg-gray-800 border border-gray-700 rounded text-xs"
+            >
+              {Object.entries(configTypes).map(([type, label]) => (
+                <option key={type} value={type}>{label}</option>
+              ))}
+            </select>
+          </div>
+
           {/* Template Selector */}
           <div className="mb-3">
             <label className="text-xs text-gray-400 block mb-1">Load Template:</label>
             <select
               onChange={(e) => {
                 if (e.target.value) {
-                  applyTemplate(templates[e.target.value])
+                  applyTemplate(e.target.value)
                 }
               }}
               className="w-full px-2 py-1 bg-gray-800 border border-gray-700 rounded text-xs"
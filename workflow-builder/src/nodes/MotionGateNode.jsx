@@ -0,0 +1,194 @@
+import { memo, useState, useEffect } from 'react'
+import { Handle, Position, useReactFlow } from '@xyflow/react'
+import NodeWrapper from '../components/NodeWrapper'
+
+// Zones are polygons of normalized [x, y] points (0-1), empty = whole frame
+const ZONE_PRESETS = [
+  { label: 'Whole Frame', zones: [] },
+  { label: 'Bottom Half', zones: [[[0, 0.5], [1, 0.5], [1, 1], [0, 1]]] },
+  { label: 'Center', zones: [[[0.25, 0.25], [0.75, 0.25], [0.75, 0.75], [0.25, 0.75]]] },
+]
+
+const parseZones = (text) => {
+  try {
+    const zones = JSON.parse(text)
+    if (!Array.isArray(zones)) return null
+    const valid = zones.every(zone =>
+      Array.isArray(zone) && zone.length >= 3 &&
+      zone.every(p => Array.isArray(p) && p.length === 2 && p.every(v => typeof v === 'number' && v >= 0 && v <= 1))
+    )
+    return valid ? zones : null
+  } catch {
+    return null
+  }
+}
+
+export default memo(({ data, id }) => {
+  const { setNodes } = useReactFlow()
+  const [showConfig, setShowConfig] = useState(false)
+
+  // Gate settings (same names and defaults as the backend MotionGate)
+  const [threshold, setThreshold] = useState(data.threshold ?? 0.01)
+  const [pixelThreshold, setPixelThreshold] = useState(data.pixelThreshold ?? 25)
+  const [keepalive, setKeepalive] = useState(data.keepalive ?? 10)
+  const [zones, setZones] = useState(data.zones || [])
+  const [zonesText, setZonesText] = useState(JSON.stringify(data.zones || []))
+  const [zonesError, setZonesError] = useState(false)
+
+  // Update node data in ReactFlow
+  useEffect(() => {
+    setNodes((nds) =>
+      nds.map((node) => {
+        if (node.id === id) {
+          return {
+            ...node,
+            data: {
+              ...node.data,
+              threshold,
+              pixelThreshold,
+              keepalive,
+              zones
+            }
+          }
+        }
+        return node
+      })
+    )
+  }, [threshold, pixelThreshold, keepalive, zones, id, setNodes])
+
+  const updateZones = (text) => {
+    setZonesText(text)
+    const parsed = parseZones(text)
+    setZonesError(parsed === null)
+    if (parsed !== null) {
+      setZones(parsed)
+    }
+  }
+
+  return (
+    <NodeWrapper nodeId={id}>
+      <div className="shadow-lg rounded-lg border-2 border-yellow-500 bg-gray-900 min-w-[260px] max-w-[320px]">
+        <Handle
+          type="target"
+          position={Position.Left}
+          className="w-3 h-3 bg-yellow-500"
+          id="video-input"
+        />
+
+        <div className="px-4 py-3">
+          <div className="flex items-center justify-between mb-2">
+            <div className="flex items-center space-x-2">
+              <span className="text-xl">🏃</span>
+              <div className="font-bold text-sm text-yellow-400">Motion Gate</div>
+            </div>
+            <button
+              onClick={() => setShowConfig(!showConfig)}
+              className="text-gray-400 hover:text-white"
+            >
+              ⚙️
+            </button>
+          </div>
+
+          <div className="text-xs text-gray-500">
+            Motion ≥ {(threshold * 100).toFixed(1)}% · {zones.length ? `${zones.length} zone${zones.length > 1 ? 's' : ''}` : 'whole frame'}
+            {keepalive > 0 ? ` · keepalive ${keepalive}s` : ''}
+          </div>
+
+          {showConfig && (
+          <div className="mt-3 pt-3 border-t border-gray-700 space-y-3">
+            {/* Motion Threshold */}
+            <div>
+              <label className="text-xs text-gray-400 block mb-1">
+                Motion Threshold: {(threshold * 100).toFixed(1)}%
+              </label>
+              <input
+                type="range"
+                min="1"
+                max="200"
+                value={Math.round(threshold * 1000)}
+                onChange={(e) => setThreshold(parseInt(e.target.value) / 1000)}
+                className="w-full"
+              />
+              <div className="text-[10px] text-gray-600">
+                Share of moving pixels that opens the gate
+              </div>
+            </div>
+
+            {/* Pixel Threshold */}
+            <div>
+              <label className="text-xs text-gray-400 block mb-1">
+                Pixel Sensitivity: {pixelThreshold}
+              </label>
+              <input
+                type="range"
+                min="1"
+                max="100"
+                value={pixelThreshold}
+                onChange={(e) => setPixelThreshold(parseInt(e.target.value))}
+                className="w-full"
+              />
+              <div className="text-[10px] text-gray-600">
+                Grey level change for a pixel to count as moving
+              </div>
+            </div>
+
+            {/* Keepalive */}
+            <div>
+              <label className="text-xs text-gray-400 block mb-1">
+                Keepalive: {keepalive > 0 ? `${keepalive}s` : 'off'}
+              </label>
+              <input
+                type="range"
+                min="0"
+                max="120"
+                value={keepalive}
+                onChange={(e) => setKeepalive(parseInt(e.target.value))}
+                className="w-full"
+              />
+              <div className="text-[10px] text-gray-600">
+                Pass a frame at least this often, even without motion
+              </div>
+            </div>
+
+            {/* Zones */}
+            <div>
+              <label className="text-xs text-gray-400 block mb-1">Zones</label>
+              <textarea
+                value={zonesText}
+                onChange={(e) => updateZones(e.target.value)}
+                placeholder="[[[x1,y1],[x2,y2],[x3,y3]], ...]"
+                className={`w-full px-2 py-1 bg-gray-800 border rounded text-xs text-white font-mono h-20 resize-none ${
+                  zonesError ? 'border-red-500' : 'border-gray-700'
+                }`}
+              />
+              <div className="text-[10px] text-gray-600 mt-1">
+                {zonesError
+                  ? 'Invalid zones: polygons of 3+ [x,y] points between 0 and 1'
+                  : 'Polygons of normalized [x,y] points; [] watches the whole frame'}
+              </div>
+              <div className="mt-2 flex gap-1">
+                {ZONE_PRESETS.map(preset => (
+                  <button
+                    key={preset.label}
+                    onClick={() => updateZones(JSON.stringify(preset.zones))}
+                    className="text-[10px] px-2 py-1 bg-gray-700 hover:bg-gray-600 rounded text-gray-300"
+                  >
+                    {preset.label}
+                  </button>
+                ))}
+              </div>
+            </div>
+          </div>
+          )}
+        </div>
+
+        <Handle
+          type="source"
+          position={Position.Right}
+          className="w-3 h-3 bg-yellow-500"
+          id="video-output"
+        />
+      </div>
+    </NodeWrapper>
+  )
+})
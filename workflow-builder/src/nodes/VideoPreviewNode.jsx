@@ -9,6 +9,9 @@ export default memo(({ data, id }) => {
   const [stats, setStats] = useState({ fps: 0, detections: 0, latency: 0 })
   const [showStats, setShowStats] = useState(true)
   const canvasRef = useRef(null)
+  // Socket and frame_id of the frame being drawn, for the frame_ack
+  const wsRef = useRef(null)
+  const frameIdRef = useRef(null)
   const [isConnected, setIsConnected] = useState(false)
   
   // Check if node has connections
@@ -38,6 +41,7 @@ export default memo(({ data, id }) => {
     }
     
     const ws = new WebSocket(`${wsBaseUrl}/api/ws`)
+    wsRef.current = ws
     
     ws.onopen = () => {
       console.log(`VideoPreview ${id}: WebSocket connected`)
@@ -63,11 +67,12 @@ export default memo(({ data, id }) => {
           console.log(`   Resolution: ${data.resolution?.width}x${data.resolution?.height}`)
           console.log(`   Detections: ${data.detections_count}`)
           
+          frameIdRef.current = data.frame_id || null
           setFrame(data.frame_data)  // Base64 encoded image
           setStats({
             fps: data.fps || 0,
             detections: data.detections_count || 0,
-            latency: data.processing_time_ms || 0
+            latency: data.frame_age_ms ?? data.processing_time_ms ?? 0
           })
           
           console.log(`✅ X-RAY View ${id}: Frame state updated`)
@@ -91,6 +96,7 @@ export default memo(({ data, id }) => {
     
     return () => {
       console.log(`X-RAY View ${id}: Cleaning up WebSocket`)
+      wsRef.current = null
       ws.close()
     }
   }, [id, isConnected])
@@ -114,6 +120,13 @@ export default memo(({ data, id }) => {
       canvas.height = img.height
       ctx.drawImage(img, 0, 0)
       console.log(`✅ X-RAY View ${id}: Frame drawn! Canvas: ${img.width}x${img.height}`)
+      
+      // Tell the backend the frame is on screen (capture-to-display latency)
+      const ws = wsRef.current
+      if (frameIdRef.current && ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ type: 'frame_ack', frame_id: frameIdRef.current }))
+        frameIdRef.current = null
+      }
     }
     
     img.onerror = (error) => {